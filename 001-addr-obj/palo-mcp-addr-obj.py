@@ -2,6 +2,9 @@ from mcp.server.fastmcp import FastMCP
 from panos import firewall, objects
 import urllib3
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 import logging
 import os
 
@@ -45,6 +48,21 @@ def get_firewall() -> firewall.Firewall:
     
     return _firewall_instance
 
+# pan-os-python calls are blocking, so run them on a bounded thread pool instead of
+# the event loop. The firewall object shares one XML API client, so calls to it are
+# serialized by default (MCP_FIREWALL_CONCURRENCY).
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("MCP_EXECUTOR_WORKERS", "4")))
+_firewall_slots: Optional[asyncio.Semaphore] = None
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking firewall call on the executor and await its result."""
+    global _firewall_slots
+    if _firewall_slots is None:
+        _firewall_slots = asyncio.Semaphore(int(os.getenv("MCP_FIREWALL_CONCURRENCY", "1")))
+    async with _firewall_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
 @server.tool()
 async def create_address_object(
     name: str, 
@@ -75,7 +93,7 @@ async def create_address_object(
         )
         
         fw.add(addr)
-        addr.create()
+        await run_blocking(addr.create)
         
         logger.info(f"Created address object: {name} -> {ip_address}")
         return f"✓ Successfully created address object '{name}' with IP {ip_address}"
@@ -96,7 +114,7 @@ async def list_address_objects() -> str:
         fw = get_firewall()
         
         # Fresh query each time - data may have changed outside Claude
-        addresses = objects.AddressObject.refreshall(fw)
+        addresses = await run_blocking(objects.AddressObject.refreshall, fw)
         
         if not addresses:
             return "No address objects found on the firewall."
@@ -133,13 +151,13 @@ async def delete_address_object(name: str) -> str:
         fw = get_firewall()
         
         # Refresh to get current state
-        objects.AddressObject.refreshall(fw)
+        await run_blocking(objects.AddressObject.refreshall, fw)
         addr = fw.find(name, objects.AddressObject)
         
         if addr is None:
             return f"✗ Address object '{name}' not found"
         
-        addr.delete()
+        await run_blocking(addr.delete)
         
         logger.info(f"Deleted address object: {name}")
         return f"✓ Successfully deleted address object '{name}'"
@@ -175,7 +193,7 @@ async def update_address_object(
         fw = get_firewall()
         
         # Refresh to get current state
-        objects.AddressObject.refreshall(fw)
+        await run_blocking(objects.AddressObject.refreshall, fw)
         addr = fw.find(name, objects.AddressObject)
         
         if addr is None:
@@ -186,7 +204,7 @@ async def update_address_object(
         if new_description is not None:
             addr.description = new_description
         
-        addr.apply()
+        await run_blocking(addr.apply)
         
         logger.info(f"Updated address object: {name}")
         return f"✓ Successfully updated address object '{name}'"
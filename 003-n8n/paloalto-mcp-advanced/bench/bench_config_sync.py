@@ -0,0 +1,104 @@
+"""
+Benchmark: traffic needed to keep cached config current, full reloads vs config sync.
+
+For each size, loads the address objects and security rules of the mock
+firewall once (what every MCP_CACHE_TTL expiry costs), then keeps them
+current for --seconds with config sync while another client edits objects
+at --changes-per-minute. Reports bytes per minute of both approaches and
+checks that the synced mirror matches a fresh load.
+
+    python bench/bench_config_sync.py --sizes 10000 50000 --seconds 20 --changes-per-minute 60
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from panos.objects import AddressObject
+
+from bench.mock_panos import MockPanos
+from core.cache import config_cache
+from core.config import get_address_objects, get_security_rules, load_address_objects, load_security_rules
+from core.sync import ConfigSync
+
+
+def edit(fw, i: int, count: int):
+    """One out-of-band change: edit an existing host, or add a new one every 5th change."""
+    name = f"bench-{i}" if i % 5 == 0 else f"host-{random.randrange(count)}"
+    obj = AddressObject(name, f"198.51.100.{i % 250 + 1}", description=f"bench change {i}")
+    fw.add(obj)
+    obj.apply()
+    fw.remove(obj)
+
+
+def snapshot(objects) -> list:
+    return [(obj.name, obj.value, obj.description) for obj in objects]
+
+
+async def run(count: int, seconds: float, per_minute: int, interval: float, ttl: float) -> dict:
+    with MockPanos(address_count=count, rule_count=max(count // 10, 1)) as mock:
+        fw = mock.firewall()
+        writer = mock.firewall()
+        loop = asyncio.get_running_loop()
+
+        mock.reset_stats()
+        started = time.perf_counter()
+        await loop.run_in_executor(None, load_address_objects, fw)
+        await loop.run_in_executor(None, load_security_rules, fw)
+        reload_seconds = time.perf_counter() - started
+        reload_bytes = mock.bytes_sent
+
+        sync = config_cache.sync = ConfigSync(interval=interval)
+        await get_address_objects(fw)
+        await get_security_rules(fw)
+        mock.reset_stats()
+        changes = int(seconds * per_minute / 60)
+        started = time.perf_counter()
+        for i in range(changes):
+            await asyncio.sleep(seconds / max(changes, 1))
+            await loop.run_in_executor(None, edit, writer, i, count)
+        await asyncio.sleep(max(seconds - (time.perf_counter() - started), 0) + interval * 2)
+        window = time.perf_counter() - started
+        # Only what the sync read: config log queries and object fetches, not the writer's edits
+        sync_bytes = sum(size for request, size in mock.bytes_by_request.items() if request.split("/")[0] == "log")
+        sync_bytes += mock.bytes_by_request.get("config/get", 0)
+
+        mirrored = snapshot(await get_address_objects(fw))
+        live = snapshot(await loop.run_in_executor(None, load_address_objects, mock.firewall()))
+        config_cache.sync = None
+        return {
+            "reload_kib": reload_bytes / 1024,
+            "reload_seconds": reload_seconds,
+            "ttl_kib_per_min": reload_bytes / 1024 * 60 / ttl,
+            "sync_kib_per_min": sync_bytes / 1024 * 60 / window,
+            "changes": changes,
+            "fetched": sync.stats["objects_fetched"],
+            "consistent": mirrored == live,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--changes-per-minute", type=int, default=60)
+    parser.add_argument("--interval", type=float, default=2.0, help="Config sync poll interval")
+    parser.add_argument("--ttl", type=float, default=60.0, help="Cache TTL the reloads are compared at")
+    args = parser.parse_args()
+
+    print(f"{'objects':>8}  {'reload KiB':>10}  {'reload s':>8}  {'TTL KiB/min':>11}  "
+          f"{'sync KiB/min':>12}  {'changes':>7}  {'fetched':>7}  consistent")
+    for count in args.sizes:
+        row = asyncio.run(run(count, args.seconds, args.changes_per_minute, args.interval, args.ttl))
+        print(f"{count:>8}  {row['reload_kib']:>10.0f}  {row['reload_seconds']:>8.2f}  {row['ttl_kib_per_min']:>11.0f}  "
+              f"{row['sync_kib_per_min']:>12.1f}  {row['changes']:>7}  {row['fetched']:>7}  {row['consistent']}")
+        if not row["consistent"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: API calls spent following concurrent jobs.
+
+Starts N commits on the mock firewall and waits for all of them, once with
+one `show jobs id` poll loop per job and once through the shared job
+tracker (one `show jobs all` per interval).
+
+    python bench/bench_job_polling.py --jobs 1 10 50 --job-seconds 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.mock_panos import MockPanos
+from core.executor import run_blocking
+from core.jobs import FINISHED, JobTracker, commit, show_job
+
+
+async def per_job(fw, job_ids, interval):
+    async def follow(job_id):
+        while (await run_blocking(fw, show_job, fw, job_id))["status"] != FINISHED:
+            await asyncio.sleep(interval)
+    await asyncio.gather(*(follow(job_id) for job_id in job_ids))
+
+
+async def tracked(fw, job_ids, interval):
+    tracker = JobTracker(interval=interval)
+    jobs = [tracker.track(fw, "mock", job_id) for job_id in job_ids]
+    await asyncio.gather(*(tracker.wait(job) for job in jobs))
+
+
+async def run(count, job_seconds, interval):
+    row = [count]
+    with MockPanos(address_count=10, rule_count=1, job_seconds=job_seconds) as mock:
+        fw = mock.firewall()
+        for follow in (per_job, tracked):
+            job_ids = [await run_blocking(fw, commit, fw) for _ in range(count)]
+            mock.reset_stats()
+            start = time.perf_counter()
+            await follow(fw, job_ids, interval)
+            row += [mock.requests.get("op", 0), time.perf_counter() - start]
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--job-seconds", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{'jobs':>5}  {'per-job calls':>13}  {'per-job s':>9}  {'tracker calls':>13}  {'tracker s':>9}")
+    for count in args.jobs:
+        jobs, per_job_calls, per_job_time, tracker_calls, tracker_time = asyncio.run(
+            run(count, args.job_seconds, args.interval)
+        )
+        print(f"{jobs:>5}  {per_job_calls:>13}  {per_job_time:>9.2f}  {tracker_calls:>13}  {tracker_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
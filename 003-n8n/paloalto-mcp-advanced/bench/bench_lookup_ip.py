@@ -0,0 +1,62 @@
+"""
+Benchmark: IP index lookups vs a linear scan over the cached config.
+
+Loads address objects, groups and rules from the mock XML API, builds the
+IpIndex and compares lookup_ip's query time with scanning every object.
+
+    python bench/bench_lookup_ip.py --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.mock_panos import MockPanos
+from core.config import load_address_groups, load_address_objects, load_security_rules
+from core.ipindex import IpIndex
+from core.query import address_range, covers, network_span
+
+
+def linear_scan(addresses, value):
+    query = network_span(value)
+    return [addr.name for addr in addresses if covers(address_range(addr.type, addr.value), query)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'objects':>8}  {'build ms':>9}  {'lookup us':>10}  {'scan ms':>9}  {'speedup':>8}")
+    for size in args.sizes:
+        with MockPanos(address_count=size, rule_count=size // 10, group_count=size // 10) as mock:
+            fw = mock.firewall()
+            addresses = load_address_objects(fw)
+            groups = load_address_groups(fw)
+            rules = load_security_rules(fw)
+
+            start = time.perf_counter()
+            index = IpIndex.build(addresses, groups, rules)
+            build = time.perf_counter() - start
+
+            queries = [f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}" for i in random.sample(range(size), min(args.queries, size))]
+            lookups, scans = [], []
+            for value in queries:
+                start = time.perf_counter()
+                found = index.lookup(value, include_any=True)
+                lookups.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                scanned = linear_scan(addresses, value)
+                scans.append(time.perf_counter() - start)
+                assert [name for name, _ in found["addresses"]] == sorted(scanned)
+            lookup, scan = statistics.median(lookups), statistics.median(scans)
+            print(f"{size:>8}  {build * 1000:>9.0f}  {lookup * 1e6:>10.1f}  {scan * 1000:>9.1f}  {scan / lookup:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
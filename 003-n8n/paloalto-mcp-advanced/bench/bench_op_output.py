@@ -0,0 +1,45 @@
+"""
+Benchmark: raw vs structured run_op_command output for large op responses.
+
+Measures how many bytes reach the client for `show session all` with the old
+str() dump versus one structured page (optionally narrowed to a few fields).
+
+    python bench/bench_op_output.py --sessions 1000 10000 50000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.mock_panos import MockPanos
+from core.output import shape_output
+
+COMMAND = "show session all"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--fields", default="source,dst,dport,application")
+    args = parser.parse_args()
+    fields = args.fields.split(",")
+
+    print(f"{'sessions':>9}  {'raw bytes':>11}  {'page bytes':>11}  {'fields bytes':>12}  {'shape ms':>9}")
+    for count in args.sessions:
+        with MockPanos(address_count=10, rule_count=10, session_count=count) as mock:
+            fw = mock.firewall()
+            raw = fw.op(COMMAND, xml=True)
+            root = ET.fromstring(raw)
+            start = time.perf_counter()
+            page = json.dumps(shape_output(root))
+            elapsed = time.perf_counter() - start
+            narrowed = json.dumps(shape_output(root, xpath="entry", fields=fields))
+            print(f"{count:>9}  {len(str(raw)):>11}  {len(page):>11}  {len(narrowed):>12}  {elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
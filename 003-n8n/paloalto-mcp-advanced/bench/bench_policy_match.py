@@ -0,0 +1,80 @@
+"""
+Benchmark: simulate_policy_match throughput on the cached rulebase.
+
+Compiles the mock config into a PolicyModel and times batches of random
+flows through the zone-pair prefix indexes, against a first-match scan over
+every compiled rule.
+
+    python bench/bench_policy_match.py --rules 1000 5000 10000 --flows 5000
+"""
+import argparse
+import ipaddress
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.mock_panos import MockPanos
+from core.config import (
+    load_address_groups, load_address_objects, load_application_groups, load_security_rules,
+    load_service_groups, load_service_objects,
+)
+from core.policy import PolicyModel
+
+
+def scan(model, flow):
+    source = int(ipaddress.ip_address(flow["source"]))
+    destination = int(ipaddress.ip_address(flow["destination"]))
+    for rule in model.rules:
+        if (not rule.disabled and rule.matches_zones(flow["source_zone"], flow["destination_zone"])
+                and rule.source.matches(4, source) and rule.destination.matches(4, destination)):
+            return rule.name
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--flows", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'rules':>7}  {'compile ms':>10}  {'indexed flows/s':>16}  {'scan flows/s':>13}  {'speedup':>8}")
+    for count in args.rules:
+        addresses = count * 4
+        with MockPanos(address_count=addresses, rule_count=count, group_count=count // 2) as mock:
+            fw = mock.firewall()
+            sources = [load(fw) for load in (
+                load_address_objects, load_address_groups, load_service_objects,
+                load_service_groups, load_application_groups, load_security_rules,
+            )]
+        start = time.perf_counter()
+        model = PolicyModel(*sources)
+        compile_time = time.perf_counter() - start
+
+        def host(i):
+            return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+        flows = [
+            {"source": host(random.randrange(addresses)), "destination": host(random.randrange(addresses)),
+             "source_zone": "trust", "destination_zone": "untrust"}
+            for _ in range(args.flows)
+        ]
+        model.match(flows[0])  # build the zone-pair bucket outside the timing
+        start = time.perf_counter()
+        indexed = [model.match(flow)["rule"] for flow in flows]
+        indexed_time = time.perf_counter() - start
+        sample = flows[:max(args.flows // 20, 1)]
+        start = time.perf_counter()
+        scanned = [scan(model, flow) for flow in sample]
+        scan_time = (time.perf_counter() - start) * len(flows) / len(sample)
+        assert [r if r not in ("interzone-default",) else None for r in indexed[:len(sample)]] == scanned
+        print(
+            f"{count:>7}  {compile_time * 1000:>10.0f}  {len(flows) / indexed_time:>16.0f}  "
+            f"{len(flows) / scan_time:>13.0f}  {scan_time / indexed_time:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: analyze_rulebase on generated rulebases.
+
+Generates rulebases with a mix of host, /24 and /16 rules over a few zones,
+including broad rules, duplicates and conflicting actions. Times the indexed
+analysis and compares it with a pairwise comparison of every rule against
+every earlier rule (run on a sample of rules and extrapolated).
+
+    python bench/bench_rulebase_analysis.py --rules 1000 5000 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from panos.objects import AddressObject, ServiceObject
+from panos.policies import SecurityRule
+
+from core.analysis import MAX_RELATED, OVERLAP, analyze_rules
+from core.policy import PolicyModel
+
+ZONES = ["trust", "untrust", "dmz", "guest", "vpn", "mgmt"]
+APPS = ["web-browsing", "ssl", "dns", "ssh", "smtp", "ntp"]
+
+
+def network(rng, prefix: str):
+    kind = rng.random()
+    if kind < 0.02:
+        return f"{prefix}.0.0/16"
+    if kind < 0.3:
+        return f"{prefix}.{rng.randrange(256)}.0/24"
+    return f"{prefix}.{rng.randrange(256)}.{rng.randrange(256)}"
+
+
+def build_rules(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    addresses = [AddressObject(f"net-{i}", network(rng, "10.1")) for i in range(count // 4)]
+    services = [ServiceObject(f"svc-{p}", "tcp", destination_port=str(p)) for p in range(8000, 8050)]
+    rules = []
+    for i in range(count):
+        if rules and rng.random() < 0.03:
+            # Copy of an earlier rule
+            twin = rng.choice(rules)
+            rules.append(SecurityRule(f"rule-{i}", **{k: getattr(twin, k) for k in (
+                "fromzone", "tozone", "source", "destination", "application", "service", "action")}))
+            continue
+        rules.append(SecurityRule(
+            f"rule-{i}",
+            fromzone=[rng.choice(ZONES)],
+            tozone=[rng.choice(ZONES)] if rng.random() < 0.9 else ["any"],
+            source=[rng.choice(addresses).name if rng.random() < 0.5 else network(rng, "10.1")],
+            destination=[network(rng, "172.16")] if rng.random() < 0.97 else ["any"],
+            application=rng.sample(APPS, 2) if rng.random() < 0.8 else ["any"],
+            service=[f"svc-{rng.randrange(8000, 8050)}"] if rng.random() < 0.5 else ["application-default"],
+            action="allow" if rng.random() < 0.8 else "deny",
+        ))
+    return PolicyModel(addresses, [], services, [], [], rules)
+
+
+def pairwise(model, rule):
+    for earlier in model.rules[:rule.position]:
+        if not earlier.disabled and earlier.covers(rule):
+            return earlier.name
+    related = [
+        earlier.name for earlier in model.rules[:rule.position]
+        if not earlier.disabled and earlier.action != rule.action and earlier.intersects(rule)
+    ]
+    return related[:MAX_RELATED] or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--sample", type=int, default=200, help="rules compared pairwise per size")
+    args = parser.parse_args()
+
+    print(f"{'rules':>7}  {'compile ms':>10}  {'analyze s':>9}  {'pairwise s':>10}  {'speedup':>8}  findings")
+    for count in args.rules:
+        start = time.perf_counter()
+        model = build_rules(count)
+        compile_time = time.perf_counter() - start
+
+        result = analyze_rules(model)
+        findings = {f.position: f for f in result["findings"]}
+
+        sample = random.Random(2).sample(model.rules, min(args.sample, count))
+        start = time.perf_counter()
+        for rule in sample:
+            expected = pairwise(model, rule)
+            finding = findings.get(rule.position)
+            got = None if finding is None else (finding.related if finding.kind == OVERLAP else finding.related[0])
+            assert got == expected, (rule.name, got, expected)
+        pairwise_time = (time.perf_counter() - start) * count / len(sample)
+
+        counts = ", ".join(f"{n} {kind}" for kind, n in result["counts"].items())
+        print(
+            f"{count:>7}  {compile_time * 1000:>10.0f}  {result['seconds']:>9.2f}  {pairwise_time:>10.1f}  "
+            f"{pairwise_time / result['seconds']:>7.0f}x  {counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: server cold start, and a check that the runtime is created once.
+
+Each run is a fresh interpreter that executes main.py the way `python main.py`
+does (as __main__, without starting the HTTP listener), loads the tools, then
+imports `main` again as a module, which is what tool modules used to do.
+Reports interpreter-to-ready time, runtime init, tool loading and cold start
+(process start to tools registered), with the tools registered from a freshly
+built tool manifest (lazy) and imported at boot (eager). Exits with status 1
+if more than one runtime or FastMCP server was built.
+
+    python bench/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, runpy, sys, time
+started = time.perf_counter()
+import fastmcp
+created = []
+_init = fastmcp.FastMCP.__init__
+def counting_init(self, *args, **kwargs):
+    created.append(1)
+    _init(self, *args, **kwargs)
+fastmcp.FastMCP.__init__ = counting_init
+
+namespace = runpy.run_path("main.py", run_name="__bench__")
+namespace["load_tools"]()
+ready = time.perf_counter()
+import main
+main.load_tools()
+
+from core.runtime import Runtime
+runtime = namespace["runtime"]
+print(json.dumps({
+    "ready_seconds": ready - started,
+    "init_seconds": runtime.stats["init_seconds"],
+    "tools_seconds": runtime.stats["tools_seconds"],
+    "cold_start_seconds": runtime.stats["cold_start_seconds"],
+    "tool_modules": runtime.stats["tool_modules"],
+    "lazy_tools": runtime.stats["lazy_tools"],
+    "runtimes": Runtime.instances,
+    "servers": len(created),
+    "same_server": main.server is runtime.server,
+}))
+"""
+
+
+ENV = {"MCP_TARGETS_FILE": "", "FIREWALL_IP": "127.0.0.1", "FIREWALL_API_KEY": "bench"}
+
+
+def probe(**env) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BASE_DIR, env={**os.environ, **ENV, **env},
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def build_manifest(path: str):
+    subprocess.run(
+        [sys.executable, "-m", "core.manifest"], cwd=BASE_DIR, env={**os.environ, **ENV, "MCP_TOOL_MANIFEST": path},
+        capture_output=True, check=True
+    )
+
+
+def report(mode: str, results: list):
+    print(f"{mode}:")
+    for field in ("ready_seconds", "init_seconds", "tools_seconds", "cold_start_seconds"):
+        values = [result[field] for result in results if result[field] is not None]
+        if values:
+            print(f"  {field:<18} median {statistics.median(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms")
+    last = results[-1]
+    print(f"  tool modules       {last['tool_modules']} ({last['lazy_tools']} tools from the manifest)")
+    print(f"  runtimes           {last['runtimes']}, FastMCP servers {last['servers']}, shared server {last['same_server']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = os.path.join(tmp, "manifest.json")
+        build_manifest(manifest)
+        results = {
+            "lazy": [probe(MCP_TOOL_MANIFEST=manifest) for _ in range(args.runs)],
+            "eager": [probe(MCP_LAZY_TOOLS="false") for _ in range(args.runs)],
+        }
+    for mode, runs in results.items():
+        report(mode, runs)
+    runs = [r for mode_runs in results.values() for r in mode_runs]
+    if any(r["runtimes"] != 1 or r["servers"] != 1 or not r["same_server"] for r in runs):
+        print("FAIL: server state was initialized more than once")
+        sys.exit(1)
+    if not all(r["lazy_tools"] for r in results["lazy"]):
+        print("FAIL: no tools were registered from the manifest")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: one buffered response vs streamed chunks for large list and op results over HTTP.
+
+Starts the mock firewall and, for each call, a fresh `python main.py` over
+streamable HTTP. It then asks for every address object and every
+`show session all` row in one call: buffered (a single result) or with
+stream=True (progress notification chunks). Reports the time until the
+first rows reach the client, the total time, and the server's peak resident
+memory (a separate server per call, so the peaks don't mix).
+
+    python bench/bench_streaming.py --addresses 50000 --sessions 50000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client
+
+from bench.bench_tools import free_port, memory, start_server
+from bench.mock_panos import MockPanos
+
+
+async def call(url: str, tool: str, args: dict) -> dict:
+    started = time.perf_counter()
+    first = []
+    received = {"chunks": 0, "bytes": 0}
+
+    async def on_progress(progress, total, message):
+        if not first:
+            first.append(time.perf_counter() - started)
+        received["chunks"] += 1
+        received["bytes"] += len((message or "").encode())
+
+    async with Client(url, timeout=600) as client:
+        result = await client.call_tool(tool, args, progress_handler=on_progress)
+    elapsed = time.perf_counter() - started
+    text = result.content[0].text if result.content else ""
+    return {
+        "first_ms": (first[0] if first else elapsed) * 1000,
+        "total_ms": elapsed * 1000,
+        "chunks": received["chunks"],
+        "kib": (received["bytes"] + len(text.encode())) / 1024,
+    }
+
+
+def run_call(mock: MockPanos, tool: str, args: dict) -> dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        server = start_server(mock, port, workdir, tracing=False)
+        try:
+            url = f"http://127.0.0.1:{port}/mcp"
+            # Warm the config cache so both modes time the response, not the first load
+            asyncio.run(call(url, "list_address_objects", {"limit": 1}))
+            baseline = memory(server.pid)[0]
+            row = asyncio.run(call(url, tool, args))
+            return {**row, "baseline_mb": baseline, "peak_mb": memory(server.pid)[1]}
+        finally:
+            server.terminate()
+            server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--addresses", type=int, default=50000)
+    parser.add_argument("--sessions", type=int, default=50000, help="rows in `show session all`")
+    args = parser.parse_args()
+
+    calls = [
+        ("list_address_objects", "list_address_objects", {"limit": args.addresses}),
+        ("show session all", "run_op_command", {
+            "command": "show session all", "xpath": "entry", "limit": args.sessions, "max_bytes": 2 ** 31,
+        }),
+    ]
+    mock = MockPanos(address_count=args.addresses, rule_count=10, session_count=args.sessions)
+    print(f"{args.addresses} addresses, {args.sessions} sessions")
+    print(f"{'call':<22} {'mode':<9} {'first ms':>9} {'total ms':>9} {'chunks':>7} {'KiB':>8} {'base MB':>8} {'peak MB':>8}")
+    with mock:
+        for label, tool, call_args in calls:
+            for mode in ("buffered", "stream"):
+                row = run_call(mock, tool, {**call_args, "stream": mode == "stream"})
+                print(
+                    f"{label:<22} {mode:<9} {row['first_ms']:>9.0f} {row['total_ms']:>9.0f} "
+                    f"{row['chunks']:>7} {row['kib']:>8.0f} {row['baseline_mb']:>8.0f} {row['peak_mb']:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
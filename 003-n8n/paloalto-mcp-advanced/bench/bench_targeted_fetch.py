@@ -0,0 +1,75 @@
+"""
+Benchmark: full refresh vs targeted XPath fetch for update/delete lookups.
+
+Compares the old lookup path (refreshall / Rulebase.refresh + find) with
+fetch_address_object / fetch_security_rule against the mock XML API.
+
+    python bench/bench_targeted_fetch.py --sizes 1000 10000 50000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from panos import objects
+from panos.policies import Rulebase, SecurityRule
+
+from bench.mock_panos import MockPanos
+from core.config import fetch_address_object, fetch_security_rule
+
+
+def full_address_lookup(fw, name):
+    objects.AddressObject.refreshall(fw)
+    return fw.find(name, objects.AddressObject)
+
+
+def full_rule_lookup(fw, name):
+    rulebase = Rulebase()
+    fw.add(rulebase)
+    rulebase.refresh()
+    rule = rulebase.find(name, SecurityRule)
+    fw.remove(rulebase)
+    return rule
+
+
+def measure(mock, func, name, iterations):
+    # Fresh firewall per measurement so earlier refreshes don't bloat its object tree
+    fw = mock.firewall()
+    fw.refresh_system_info()
+    timings = []
+    mock.reset_stats()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        assert func(fw, name) is not None
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), mock.bytes_sent // iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected API latency in seconds")
+    args = parser.parse_args()
+
+    print(f"{'objects':>8}  {'kind':<8}  {'full ms':>10}  {'targeted ms':>12}  {'speedup':>8}  {'full bytes':>11}  {'targeted bytes':>14}")
+    for size in args.sizes:
+        with MockPanos(address_count=size, rule_count=size, latency=args.latency) as mock:
+            name_index = size - 1
+            for kind, full, targeted, name in (
+                ("address", full_address_lookup, fetch_address_object, f"host-{name_index}"),
+                ("rule", full_rule_lookup, fetch_security_rule, f"rule-{name_index}"),
+            ):
+                full_time, full_bytes = measure(mock, full, name, args.iterations)
+                targeted_time, targeted_bytes = measure(mock, targeted, name, args.iterations)
+                print(
+                    f"{size:>8}  {kind:<8}  {full_time * 1000:>10.1f}  {targeted_time * 1000:>12.2f}  "
+                    f"{full_time / targeted_time:>7.0f}x  {full_bytes:>11}  {targeted_bytes:>14}"
+                )
+
+
+if __name__ == "__main__":
+    main()
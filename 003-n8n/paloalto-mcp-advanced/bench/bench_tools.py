@@ -0,0 +1,341 @@
+"""
+Benchmark: every MCP tool over the FastMCP HTTP transport against the mock XML API.
+
+Starts the mock firewall, runs `python main.py` as a separate process pointed
+at it (so its memory can be measured on its own) and calls each tool in
+tools/objects, tools/op and tools/security_policies over streamable HTTP at
+each concurrency level. Reports throughput, latency percentiles, tool errors
+and the server's resident / peak memory after each tool.
+
+    python bench/bench_tools.py --addresses 10000 --rules 1000 --concurrency 1 8 32 --requests 50
+    python bench/bench_tools.py --save baseline.json
+    python bench/bench_tools.py --compare baseline.json --tolerance 0.25
+
+Read-only tools run first and destructive ones (deletes) last, since write
+tools change the mock config. With --compare, a tool / concurrency row whose
+p50 or p99 is worse than the baseline by more than the tolerance (and by at
+least 1 ms) is reported and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from fastmcp import Client
+
+from bench.mock_panos import MockPanos
+
+JOB_ID = re.compile(r"job (\d+)")
+CHANGE_SET_ID = re.compile(r"change set ([0-9a-f]{12})", re.IGNORECASE)
+
+
+def _ip(i: int) -> str:
+    return f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+
+
+def _text(result) -> str:
+    return result.content[0].text if result.content else ""
+
+
+async def _change_set(client, i: int, stage: int = 0) -> str:
+    """Open a change set (its own session, so a fresh one) and stage a few address objects."""
+    session = f"bench-{i}-{random.random()}"
+    text = _text(await client.call_tool("begin_change_set", {"sessionId": session}, raise_on_error=False))
+    change_set_id = CHANGE_SET_ID.search(text).group(1)
+    for k in range(stage):
+        await client.call_tool("create_address_object", {
+            "name": f"cs-{i}-{k}", "ip_address": _ip(200000 + i * 10 + k), "change_set_id": change_set_id,
+        }, raise_on_error=False)
+    return change_set_id
+
+
+async def _job(client, i: int) -> str:
+    text = _text(await client.call_tool("start_commit", {"partial": False}, raise_on_error=False))
+    return JOB_ID.search(text).group(1)
+
+
+def scenarios(args):
+    """
+    (tool, make_args) in run order. make_args(client, i) returns the arguments of
+    call i; any calls it makes to set up state are not timed. Deletes use the
+    names the creates used for the same i.
+    """
+    n = args.addresses
+    r = args.rules
+    flows = [
+        {"source": _ip(random.randrange(n)), "destination": "203.0.113.10",
+         "source_zone": "trust", "destination_zone": "untrust", "protocol": "tcp", "port": 443}
+        for _ in range(50)
+    ]
+
+    async def static(value):
+        return value
+
+    return [
+        # Read-only
+        ("list_targets", lambda c, i: static({})),
+        ("get_server_stats", lambda c, i: static({})),
+        ("list_address_objects", lambda c, i: static({"name": f"host-{i % 10}*"})),
+        ("list_security_policies", lambda c, i: static({"zone": "trust"})),
+        ("lookup_ip", lambda c, i: static({"ip": _ip(random.randrange(n))})),
+        ("simulate_policy_match", lambda c, i: static({"flows": flows})),
+        ("analyze_rulebase", lambda c, i: static({})),
+        ("run_op_command", lambda c, i: static({"command": "show session all", "limit": 50})),
+        ("run_op_command_fleet", lambda c, i: static({"command": "show system info", "tags": ["bench"]})),
+        ("get_job_status", lambda c, i: static({})),
+        ("get_change_set", lambda c, i: static({})),
+        ("export_traces", lambda c, i: static({})),
+        # Writes
+        ("create_address_object", lambda c, i: static({"name": f"bench-{i}", "ip_address": _ip(100000 + i)})),
+        ("update_address_object", lambda c, i: static({"name": f"host-{i % n}", "new_description": f"bench {i}"})),
+        ("bulk_create_address_objects", lambda c, i: static({"payload": [
+            {"name": f"bulk-{i}-{k}", "ip_address": _ip(300000 + i * 10 + k)} for k in range(10)
+        ]})),
+        ("bulk_update_address_objects", lambda c, i: static({"payload": [
+            {"name": f"bulk-{i}-{k}", "new_description": f"bench {i}"} for k in range(10)
+        ]})),
+        ("create_security_policy", lambda c, i: static({
+            "name": f"bench-rule-{i}", "source_zone": "trust", "destination_zone": "untrust",
+            "source_address": f"host-{i % n}", "destination_address": "any",
+        })),
+        ("bulk_create_security_policies", lambda c, i: static({"payload": [
+            {"name": f"bulk-rule-{i}-{k}", "source_zone": "trust", "destination_zone": "untrust",
+             "source_address": "any", "destination_address": "any"} for k in range(10)
+        ]})),
+        ("update_security_policy", lambda c, i: static({"name": f"rule-{i % r}", "description": f"bench {i}"})),
+        ("begin_change_set", lambda c, i: static({"sessionId": f"bench-begin-{i}-{random.random()}"})),
+        ("discard_change_set", lambda c, i: _with(_change_set(c, i, 2), lambda cs: {"change_set_id": cs})),
+        ("commit_change_set", lambda c, i: _with(_change_set(c, i, 2), lambda cs: {"change_set_id": cs, "wait": 0})),
+        ("start_commit", lambda c, i: static({"description": f"bench {i}"})),
+        ("wait_job", lambda c, i: _with(_job(c, i), lambda job: {"job_id": job, "timeout": 30})),
+        # Destructive
+        ("bulk_delete_address_objects", lambda c, i: static({"payload": [f"bulk-{i}-{k}" for k in range(10)]})),
+        ("delete_address_object", lambda c, i: static({"name": f"bench-{i}"})),
+        ("delete_security_policy", lambda c, i: static({"name": f"bench-rule-{i}"})),
+    ]
+
+
+async def _with(setup, make):
+    return make(await setup)
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def memory(pid: int) -> tuple:
+    """(resident MB, peak resident MB) of pid, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mock: MockPanos, port: int, workdir: str, tracing: bool) -> subprocess.Popen:
+    target = {"hostname": mock.host, "port": mock.port, "use_http": True, "api_key": "mock-key"}
+    targets_file = os.path.join(workdir, "targets.json")
+    with open(targets_file, "w") as f:
+        json.dump({"default": "mock", "targets": {
+            "mock": {**target, "tags": ["bench"]},
+            # Same mock under a second name, for the fleet tool
+            "mock-2": {**target, "tags": ["bench"]},
+        }}, f)
+    env = {
+        **os.environ,
+        "MCP_TARGETS_FILE": targets_file,
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(port),
+        "MCP_JOB_POLL_INTERVAL": "0.2",
+        "MCP_TRACING": "true" if tracing else "false",
+        "MCP_TRACE_DIR": os.path.join(workdir, "traces"),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"MCP server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("MCP server did not start within 30s")
+
+
+async def run_tool(clients, tool, make_args, concurrency, requests, offset):
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(offset + i)
+
+    async def worker(client):
+        nonlocal errors
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            call_args = await make_args(client, i)
+            started = time.perf_counter()
+            result = await client.call_tool(tool, call_args, raise_on_error=False)
+            latencies.append(time.perf_counter() - started)
+            if result.is_error or _text(result).startswith("✗"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients[:concurrency]))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args, url, pid):
+    rows = []
+    clients = [Client(url) for _ in range(max(args.concurrency))]
+    for client in clients:
+        await client.__aenter__()
+    try:
+        for tool, make_args in scenarios(args):
+            # Same call indexes for every tool, so deletes find what the creates made
+            offset = 0
+            if args.tools and tool not in args.tools:
+                continue
+            if tool == "export_traces" and not args.tracing:
+                continue
+            # Warm-up call: cold config cache loads are not part of the steady state
+            await clients[0].call_tool(tool, await make_args(clients[0], offset), raise_on_error=False)
+            offset += 1
+            for concurrency in args.concurrency:
+                latencies, errors, elapsed = await run_tool(
+                    clients, tool, make_args, concurrency, args.requests, offset
+                )
+                offset += args.requests
+                rss, peak = memory(pid)
+                row = {
+                    "tool": tool,
+                    "concurrency": concurrency,
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "rps": len(latencies) / elapsed if elapsed else 0.0,
+                    "p50_ms": percentile(latencies, 0.50) * 1000,
+                    "p90_ms": percentile(latencies, 0.90) * 1000,
+                    "p99_ms": percentile(latencies, 0.99) * 1000,
+                    "max_ms": max(latencies, default=0.0) * 1000,
+                    "rss_mb": rss,
+                    "peak_mb": peak,
+                }
+                rows.append(row)
+                print_row(row)
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+    return rows
+
+
+def _mb(value) -> str:
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def print_row(row):
+    print(
+        f"{row['tool']:<30} {row['concurrency']:>4} {row['requests']:>5} {row['errors']:>4} "
+        f"{row['rps']:>8.1f} {row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+        f"{row['max_ms']:>8.1f} {_mb(row['rss_mb']):>6} {_mb(row['peak_mb']):>6}",
+        flush=True,
+    )
+
+
+def compare(rows, baseline_file, tolerance):
+    """Rows slower than the baseline by more than tolerance, as printable lines."""
+    with open(baseline_file) as f:
+        baseline = {(row["tool"], row["concurrency"]): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in rows:
+        before = baseline.get((row["tool"], row["concurrency"]))
+        if before is None:
+            continue
+        for field in ("p50_ms", "p99_ms"):
+            if row[field] > before[field] * (1 + tolerance) and row[field] - before[field] >= 1.0:
+                regressions.append(
+                    f"{row['tool']} c={row['concurrency']}: {field} {before[field]:.1f} -> {row[field]:.1f}"
+                )
+        if row["errors"] > before["errors"]:
+            regressions.append(f"{row['tool']} c={row['concurrency']}: errors {before['errors']} -> {row['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--addresses", type=int, default=5000)
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--sessions", type=int, default=1000, help="rows in `show session all`")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock seconds per API request")
+    parser.add_argument("--job-seconds", type=float, default=0.5, help="mock commit job duration")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=50, help="calls per tool and concurrency level")
+    parser.add_argument("--tools", nargs="+", help="only these tools")
+    parser.add_argument("--tracing", action="store_true", help="run the server with MCP_TRACING=true")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from --save")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    mock = MockPanos(
+        address_count=args.addresses, rule_count=args.rules, group_count=args.groups,
+        session_count=args.sessions, latency=args.latency, job_seconds=args.job_seconds,
+    )
+    port = free_port()
+    with mock, tempfile.TemporaryDirectory() as workdir:
+        server = start_server(mock, port, workdir, args.tracing)
+        try:
+            print(
+                f"{args.addresses} addresses, {args.rules} rules, {args.latency * 1000:g} ms mock latency, "
+                f"server pid {server.pid}"
+            )
+            print(
+                f"{'tool':<30} {'conc':>4} {'reqs':>5} {'errs':>4} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+                f"{'p99 ms':>8} {'max ms':>8} {'rss MB':>6} {'peak':>6}"
+            )
+            rows = asyncio.run(run(args, f"http://127.0.0.1:{port}/mcp", server.pid))
+        finally:
+            server.terminate()
+            server.wait(10)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": rows}, f, indent=1)
+    if args.compare:
+        regressions = compare(rows, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
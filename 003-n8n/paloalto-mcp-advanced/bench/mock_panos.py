@@ -0,0 +1,443 @@
+"""
+Mock PAN-OS XML API server for benchmarks.
+
+Serves a generated candidate config (address objects and security rules in
+vsys1) over plain HTTP and answers the subset of the XML API the tools use:
+keygen, config get/show/set/edit/delete/move/multi-config, a few op
+commands (show system info, show session all) and config log queries (every
+config change is logged with its seqno and full-path). An optional
+per-request latency simulates a busy management plane.
+"""
+import ipaddress
+import itertools
+import re
+import socket
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEVICE_XPATH = "/config/devices/entry[@name='localhost.localdomain']"
+VSYS_XPATH = DEVICE_XPATH + "/vsys/entry[@name='vsys1']"
+
+SYSTEM_INFO = (
+    "<system><hostname>mock-fw</hostname><ip-address>127.0.0.1</ip-address>"
+    "<model>PA-VM</model><serial>007000000000001</serial><sw-version>10.2.0</sw-version>"
+    "<app-version>8700-0000</app-version><multi-vsys>off</multi-vsys></system>"
+)
+
+# Splits an XPath on "/" outside of [...] predicates
+_SEGMENT = re.compile(r"[^/\[]+(?:\[[^\]]*\])*")
+_PREDICATE = re.compile(r"^([\w-]+)\[@name='([^']*)'\]$")
+_NAME_LIST = re.compile(r"@name='([^']*)'")
+
+
+def build_sessions(count: int) -> str:
+    """`show session all` result with count sessions."""
+    entries = []
+    for i in range(count):
+        entries.append(
+            f"<entry><idx>{i + 1}</idx><vsys>vsys1</vsys><type>FLOW</type><state>ACTIVE</state>"
+            f"<application>ssl</application><proto>6</proto><from>trust</from><to>untrust</to>"
+            f"<source>10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}</source><sport>{1024 + i % 60000}</sport>"
+            f"<dst>203.0.113.{i % 250 + 1}</dst><dport>443</dport><security-rule>rule-{i % 100}</security-rule>"
+            f"<start-time>Mon Jan  1 00:00:00 2024</start-time><total-byte-count>{i * 97}</total-byte-count></entry>"
+        )
+    return "".join(entries)
+
+
+def build_config(address_count: int = 1000, rule_count: int = 100, group_count: int = 0) -> ET.Element:
+    """
+    Generate a candidate config with the given number of objects.
+    Groups hold 10 consecutive hosts each; with groups, every rule's destination is a group.
+    """
+    config = ET.Element("config")
+    devices = ET.SubElement(config, "devices")
+    device = ET.SubElement(devices, "entry", name="localhost.localdomain")
+    vsys = ET.SubElement(ET.SubElement(device, "vsys"), "entry", name="vsys1")
+
+    address = ET.SubElement(vsys, "address")
+    for i in range(address_count):
+        entry = ET.SubElement(address, "entry", name=f"host-{i}")
+        ET.SubElement(entry, "ip-netmask").text = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}/32"
+        ET.SubElement(entry, "description").text = f"Generated host {i}"
+
+    groups = ET.SubElement(vsys, "address-group")
+    for g in range(group_count):
+        static = ET.SubElement(ET.SubElement(groups, "entry", name=f"group-{g}"), "static")
+        for k in range(10):
+            ET.SubElement(static, "member").text = f"host-{(g * 10 + k) % max(address_count, 1)}"
+
+    rules = ET.SubElement(ET.SubElement(ET.SubElement(vsys, "rulebase"), "security"), "rules")
+    for i in range(rule_count):
+        entry = ET.SubElement(rules, "entry", name=f"rule-{i}")
+        for tag, values in (
+            ("from", ["trust"]),
+            ("to", ["untrust"]),
+            ("source", [f"host-{i % max(address_count, 1)}"]),
+            ("destination", [f"group-{i % group_count}"] if group_count else ["any"]),
+            ("source-user", ["any"]),
+            ("category", ["any"]),
+            ("application", ["web-browsing", "ssl"]),
+            ("service", ["application-default"]),
+        ):
+            node = ET.SubElement(entry, tag)
+            for value in values:
+                ET.SubElement(node, "member").text = value
+        ET.SubElement(entry, "action").text = "allow" if i % 5 else "deny"
+        ET.SubElement(entry, "description").text = f"Generated rule {i}"
+    return config
+
+
+class MockPanos:
+    """
+    Threaded mock firewall.
+
+    Usage:
+        with MockPanos(address_count=10000) as mock:
+            fw = mock.firewall()
+    """
+
+    def __init__(self, address_count: int = 1000, rule_count: int = 100, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, session_count: int = 100, group_count: int = 0,
+                 job_seconds: float = 1.0):
+        self.config = build_config(address_count, rule_count, group_count)
+        self.session_count = session_count
+        self.job_seconds = job_seconds
+        self.jobs: list = []
+        self.config_log: list = []
+        self.log_jobs: dict = {}
+        self._log_job_ids = itertools.count(1000)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests: dict = {}
+        self.bytes_sent = 0
+        self.bytes_by_request: dict = {}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def firewall(self):
+        """A core.device.Firewall pointed at this mock."""
+        from core.device import Firewall
+        return Firewall(self.host, api_key="mock-key", port=self.port, use_http=True)
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = {}
+            self.bytes_sent = 0
+            self.bytes_by_request = {}
+
+    # XPath helpers
+
+    def _find(self, xpath: str) -> list:
+        if xpath.endswith("/@name"):
+            return [ET.Element("entry", name=e.get("name")) for e in self._find(xpath[:-len("/@name")])]
+        found = []
+        for part in xpath.split("|"):
+            path = part.strip()
+            if path.startswith("/config"):
+                path = path[len("/config"):]
+            path = path.strip("/")
+            found.extend(self.config.findall("./" + path) if path else [self.config])
+        return found
+
+    def _ensure(self, xpath: str) -> ET.Element:
+        node = self.config
+        path = xpath[len("/config"):] if xpath.startswith("/config") else xpath
+        for segment in _SEGMENT.findall(path):
+            match = _PREDICATE.match(segment)
+            tag, name = match.groups() if match else (segment, None)
+            child = next(
+                (c for c in node if c.tag == tag and (name is None or c.get("name") == name)), None
+            )
+            if child is None:
+                child = ET.SubElement(node, tag, name=name) if name else ET.SubElement(node, tag)
+            node = child
+        return node
+
+    @staticmethod
+    def _merge(dst: ET.Element, src: ET.Element):
+        for child in src:
+            if child.tag == "member":
+                if not any(m.text == child.text for m in dst.findall("member")):
+                    dst.append(child)
+                continue
+            name = child.get("name")
+            existing = next(
+                (c for c in dst if c.tag == child.tag and c.get("name") == name), None
+            )
+            if existing is None:
+                dst.append(child)
+            elif len(child) == 0:
+                existing.text = child.text
+            else:
+                MockPanos._merge(existing, child)
+
+    @staticmethod
+    def _validate(element: ET.Element):
+        for node in element.iter("ip-netmask"):
+            try:
+                ipaddress.ip_network(node.text or "", strict=False)
+            except ValueError:
+                raise ValueError(f"ip-netmask '{node.text}' is not a valid IP address or netmask")
+
+    def _parent_of(self, node: ET.Element):
+        return next((p for p in self.config.iter() if node in list(p)), None)
+
+    def _log_change(self, cmd: str, xpath: str, element: str = ""):
+        """Config log entries for a change: one per entry named in the element or the xpath."""
+        paths = [xpath]
+        match = re.match(r"^(.*)/entry\[(.*)\]$", xpath)
+        if match and " or " in match.group(2):
+            paths = [f"{match.group(1)}/entry[@name='{name}']" for name in _NAME_LIST.findall(match.group(2))]
+        elif cmd == "set" and not xpath.endswith("]") and element:
+            names = [e.get("name") for e in ET.fromstring(f"<root>{element}</root>") if e.get("name")]
+            paths = [f"{xpath}/entry[@name='{name}']" for name in names] or paths
+        for path in paths:
+            self.config_log.append({"seqno": len(self.config_log) + 1, "cmd": cmd, "full-path": path})
+
+    def log_query(self, query: dict) -> str:
+        """type=log: config log entries, newest first, as a finished log job."""
+        if query.get("action") == "get":
+            job_id = query.get("job-id", "")
+            entries = self.log_jobs.pop(job_id, [])
+            body = "".join(
+                f"<entry><seqno>{e['seqno']}</seqno><cmd>{e['cmd']}</cmd>"
+                f"<full-path>{e['full-path'].replace('&', '&amp;').replace('<', '&lt;')}</full-path></entry>"
+                for e in entries
+            )
+            return (
+                f"<result><job><id>{job_id}</id><status>FIN</status></job>"
+                f'<log><logs count="{len(entries)}" progress="100">{body}</logs></log></result>'
+            )
+        if query.get("log-type") != "config":
+            raise ValueError(f"Unsupported log type {query.get('log-type')}")
+        since = re.search(r"seqno geq (\d+)", query.get("query", ""))
+        entries = [e for e in reversed(self.config_log) if not since or e["seqno"] >= int(since.group(1))]
+        job_id = str(next(self._log_job_ids))
+        self.log_jobs[job_id] = entries[:int(query.get("nlogs", 20))]
+        return f"<result><msg><line>query job enqueued with jobid {job_id}</line></msg><job>{job_id}</job></result>"
+
+    # Actions
+
+    def config_get(self, xpath: str) -> str:
+        nodes = self._find(xpath)
+        body = "".join(ET.tostring(n, encoding="unicode") for n in nodes)
+        return f'<result total-count="{len(nodes)}" count="{len(nodes)}">{body}</result>'
+
+    def config_set(self, xpath: str, element: str) -> str:
+        new = ET.fromstring(f"<root>{element}</root>")
+        self._validate(new)
+        self._merge(self._ensure(xpath), new)
+        self._log_change("set", xpath, element)
+        return "<msg>command succeeded</msg>"
+
+    def config_edit(self, xpath: str, element: str) -> str:
+        new = ET.fromstring(element)
+        self._validate(new)
+        nodes = self._find(xpath)
+        if nodes:
+            parent = self._parent_of(nodes[0])
+            index = list(parent).index(nodes[0])
+            parent.remove(nodes[0])
+            parent.insert(index, new)
+        else:
+            parent_xpath = xpath.rsplit("/", 1)[0]
+            self._ensure(parent_xpath).append(new)
+        self._log_change("edit", xpath)
+        return "<msg>command succeeded</msg>"
+
+    def config_delete(self, xpath: str) -> str:
+        match = re.match(r"^(.*)/entry\[(.*)\]$", xpath)
+        if match and " or " in match.group(2):
+            names = set(_NAME_LIST.findall(match.group(2)))
+            for container in self._find(match.group(1)):
+                for entry in [e for e in container.findall("entry") if e.get("name") in names]:
+                    container.remove(entry)
+        else:
+            for node in self._find(xpath):
+                parent = self._parent_of(node)
+                if parent is not None:
+                    parent.remove(node)
+        self._log_change("delete", xpath)
+        return "<msg>command succeeded</msg>"
+
+    def config_move(self, xpath: str, where: str, dst: str = None) -> str:
+        nodes = self._find(xpath)
+        if not nodes:
+            raise ValueError(f"No such node: {xpath}")
+        node = nodes[0]
+        parent = self._parent_of(node)
+        parent.remove(node)
+        if where == "top":
+            parent.insert(0, node)
+        elif where == "bottom":
+            parent.append(node)
+        else:
+            ref = next((e for e in parent if e.get("name") == dst), None)
+            if ref is None:
+                parent.append(node)
+                raise ValueError(f"Move destination '{dst}' does not exist")
+            index = list(parent).index(ref)
+            parent.insert(index if where == "before" else index + 1, node)
+        self._log_change("move", xpath)
+        return "<msg>command succeeded</msg>"
+
+    def multi_config(self, element: str) -> str:
+        root = ET.fromstring(element)
+        # Validate everything first so the request is all-or-nothing, like PAN-OS
+        for node in root:
+            if node.tag not in ("set", "edit", "delete", "move"):
+                raise ValueError(f"Unsupported multi-config action '{node.tag}'")
+            for child in node:
+                self._validate(child)
+        responses = []
+        for node in root:
+            xpath = node.get("xpath")
+            body = "".join(ET.tostring(child, encoding="unicode") for child in node)
+            if node.tag == "set":
+                self.config_set(xpath, body)
+            elif node.tag == "edit":
+                self.config_edit(xpath, body)
+            elif node.tag == "move":
+                self.config_move(xpath, node.get("where"), node.get("dst"))
+            else:
+                self.config_delete(xpath)
+            responses.append(
+                f'<response status="success" id="{node.get("id")}"><msg>command succeeded</msg></response>'
+            )
+        return "".join(responses)
+
+    def commit(self, cmd: str) -> str:
+        root = ET.fromstring(cmd)
+        admins = [m.text for m in root.iterfind("partial/admin/member")]
+        job_id = len(self.jobs) + 1
+        self.jobs.append({"id": job_id, "type": "Commit", "started": time.monotonic(), "admins": admins})
+        return f"<result><msg><line>Commit job enqueued with jobid {job_id}</line></msg><job>{job_id}</job></result>"
+
+    def _job_xml(self, job: dict) -> str:
+        """Jobs finish job_seconds after they start, progressing linearly."""
+        elapsed = time.monotonic() - job["started"]
+        done = elapsed >= self.job_seconds
+        progress = 100 if done else int(100 * elapsed / self.job_seconds)
+        return (
+            f"<job><id>{job['id']}</id><type>{job['type']}</type><user>{','.join(job['admins']) or 'admin'}</user>"
+            f"<status>{'FIN' if done else 'ACT'}</status><result>{'OK' if done else 'PEND'}</result>"
+            f"<progress>{progress}</progress>"
+            f"<details>{'<line>Configuration committed successfully</line>' if done else ''}</details></job>"
+        )
+
+    def op(self, cmd: str) -> str:
+        root = ET.fromstring(cmd)
+        job_id = root.find("jobs/id")
+        if job_id is not None:
+            job = next((j for j in self.jobs if j["id"] == int(job_id.text)), None)
+            if job is None:
+                raise ValueError(f"job {job_id.text} not found")
+            return f"<result>{self._job_xml(job)}</result>"
+        if root.find("jobs/all") is not None:
+            return f"<result>{''.join(self._job_xml(job) for job in self.jobs)}</result>"
+        if root.find("system/info") is not None:
+            return f"<result>{SYSTEM_INFO}</result>"
+        if root.find("session/all") is not None:
+            return f"<result>{build_sessions(self.session_count)}</result>"
+        return "<result></result>"
+
+    def handle(self, query: dict) -> str:
+        qtype = query.get("type", "")
+        action = query.get("action", "")
+        with self.lock:
+            self.requests[f"{qtype}/{action}" if action else qtype] = (
+                self.requests.get(f"{qtype}/{action}" if action else qtype, 0) + 1
+            )
+            if qtype == "keygen":
+                return "<result><key>mock-key</key></result>"
+            if qtype == "op":
+                return self.op(query.get("cmd", "<none/>"))
+            if qtype == "log":
+                return self.log_query(query)
+            if qtype == "commit":
+                return self.commit(query.get("cmd", "<commit/>"))
+            if qtype == "config":
+                xpath = query.get("xpath", "/config")
+                if action in ("get", "show"):
+                    return self.config_get(xpath)
+                if action == "set":
+                    return self.config_set(xpath, query.get("element", ""))
+                if action == "edit":
+                    return self.config_edit(xpath, query.get("element", ""))
+                if action == "delete":
+                    return self.config_delete(xpath)
+                if action == "move":
+                    return self.config_move(xpath, query.get("where"), query.get("dst"))
+                if action == "multi-config":
+                    return self.multi_config(query.get("element", "<multi-config/>"))
+        raise ValueError(f"Unsupported request type={qtype} action={action}")
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; avoid Nagle/delayed-ACK stalls on keep-alive
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, query: dict):
+                if mock.latency:
+                    time.sleep(mock.latency)
+                try:
+                    body = f'<response status="success">{mock.handle(query)}</response>'
+                except Exception as e:
+                    body = f'<response status="error"><msg><line>{e}</line></msg></response>'
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                request = f"{query.get('type', '')}/{query.get('action', '')}".rstrip("/")
+                with mock.lock:
+                    mock.bytes_sent += len(data)
+                    mock.bytes_by_request[request] = mock.bytes_by_request.get(request, 0) + len(data)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                self._respond({k: v[0] for k, v in query.items()})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                query = parse_qs(self.rfile.read(length).decode("utf-8"))
+                self._respond({k: v[0] for k, v in query.items()})
+
+        return Handler
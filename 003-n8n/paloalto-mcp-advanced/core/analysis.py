@@ -0,0 +1,120 @@
+"""
+Shadowed, redundant and overlapping rule detection over the compiled policy model.
+
+For every enabled rule, in rulebase order:
+- shadowed: an earlier rule with a different action matches every flow it
+  matches, so the rule never takes effect
+- redundant: an earlier rule with the same action matches every flow it
+  matches, so removing it changes nothing (duplicate when both rules match
+  exactly the same flows)
+- overlap: earlier rules with a different action match some of its flows,
+  so part of its traffic is decided by them
+
+Comparisons use the interval sets of core.policy. Candidates come from the
+zone-pair buckets and their address indexes, so each rule is only compared
+with earlier rules that can share its zones and addresses, not with the
+whole rulebase. Only single-rule coverage is detected; a rule shadowed by
+the union of several earlier rules is reported as an overlap.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from core.cache import ConfigCache
+from core.policy import CompiledRule, PolicyModel, get_policy_model
+
+RULEBASE_ANALYSIS = "rulebase-analysis"
+SHADOWED = "shadowed"
+REDUNDANT = "redundant"
+DUPLICATE = "duplicate"
+OVERLAP = "overlap"
+KINDS = (SHADOWED, REDUNDANT, DUPLICATE, OVERLAP)
+# Earlier rules named per overlap finding; the count covers all of them
+MAX_RELATED = 5
+
+
+@dataclass
+class Finding:
+    rule: str
+    position: int
+    kind: str
+    related: List[str] = field(default_factory=list)   # covering rule, or overlapping rules
+    related_count: int = 0
+
+
+def _analyze_rule(model: PolicyModel, rule: CompiledRule) -> Optional[Finding]:
+    pairs = rule.zone_pairs()
+    # A covering rule applies to every zone pair of rule, so one bucket has all candidates
+    covering = sorted(p for p in model.zone_pair_rules(*pairs[0]).covering_candidates(rule) if p < rule.position)
+    for position in covering:
+        earlier = model.rules[position]
+        if earlier.covers(rule):
+            if earlier.action != rule.action:
+                kind = SHADOWED
+            else:
+                kind = DUPLICATE if rule.covers(earlier) else REDUNDANT
+            return Finding(rule.name, rule.position, kind, [earlier.name], 1)
+
+    overlapping = set()
+    for pair in pairs:
+        overlapping |= model.zone_pair_rules(*pair).overlapping_candidates(rule)
+    related = [
+        model.rules[position].name
+        for position in sorted(overlapping)
+        if position < rule.position
+        and model.rules[position].action != rule.action
+        and model.rules[position].intersects(rule)
+    ]
+    if related:
+        return Finding(rule.name, rule.position, OVERLAP, related[:MAX_RELATED], len(related))
+    return None
+
+
+def analyze_rules(model: PolicyModel) -> dict:
+    """
+    Findings for every enabled rule of a compiled rulebase.
+
+    Returns:
+        dict: {"findings": [Finding, ...] in rulebase order, "counts": {kind: n},
+               "rules": total rules, "analyzed": enabled rules, "seconds": elapsed}
+    """
+    started = time.perf_counter()
+    findings = []
+    analyzed = 0
+    for rule in model.rules:
+        if rule.disabled:
+            continue
+        analyzed += 1
+        finding = _analyze_rule(model, rule)
+        if finding is not None:
+            findings.append(finding)
+    counts: Dict[str, int] = {kind: 0 for kind in KINDS}
+    for finding in findings:
+        counts[finding.kind] += 1
+    return {
+        "findings": findings,
+        "counts": counts,
+        "rules": len(model.rules),
+        "analyzed": analyzed,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+_analyses: dict = {}
+_lock = threading.Lock()
+
+
+async def get_rulebase_analysis(fw, refresh: bool = False) -> dict:
+    """analyze_rules() result for fw's cached rulebase, recomputed when the policy model changes."""
+    model = await get_policy_model(fw, refresh=refresh)
+    key = ConfigCache.key(fw, RULEBASE_ANALYSIS)
+    entry = _analyses.get(key)
+    if entry is not None and entry[0] is model:
+        return entry[1]
+    # CPU-bound, keep it off the event loop
+    result = await asyncio.to_thread(analyze_rules, model)
+    with _lock:
+        _analyses[key] = (model, result)
+    return result
@@ -0,0 +1,171 @@
+"""
+Chunked multi-config writes for bulk tools.
+
+PAN-OS applies a multi-config request atomically, so a chunk either fully
+succeeds or fully fails. A failed chunk is split in halves and retried until
+the failing items are isolated, which keeps the request count close to
+len(items) / chunk_size when most items are valid.
+"""
+import csv
+import io
+import json
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+from core.device import api_device
+from core.executor import run_blocking
+
+# Bulk configuration - env
+BULK_CHUNK_SIZE = int(os.getenv("MCP_BULK_CHUNK_SIZE", "500"))
+
+
+@dataclass
+class BulkAction:
+    name: str
+    action: str                 # set / edit / delete / move
+    xpath: str
+    element: Optional[str] = None
+    attrs: Optional[dict] = None    # extra attributes, e.g. where/dst for move
+
+
+def set_action(obj) -> BulkAction:
+    """Action equivalent to obj.create()."""
+    return BulkAction(obj.uid, "set", obj.xpath_short(), obj.element_str().decode())
+
+
+def edit_action(obj) -> BulkAction:
+    """Action equivalent to obj.apply()."""
+    return BulkAction(obj.uid, "edit", obj.xpath(), obj.element_str().decode())
+
+
+def update_action(obj, variable: str) -> BulkAction:
+    """Action equivalent to obj.update(variable): edit only that param's XPath (delete when None)."""
+    path, _, value, var_path = obj._get_param_specific_info(variable)
+    xpath = f"{obj.xpath()}/{path}"
+    if value is None:
+        return BulkAction(obj.uid, "delete", xpath)
+    element = ET.Element(path.split("/")[-1])
+    var_path._set_inner_xml_tag_text(element, value)
+    return BulkAction(obj.uid, "edit", xpath, ET.tostring(element, encoding="unicode"))
+
+
+def delete_action(obj) -> BulkAction:
+    """Action equivalent to obj.delete()."""
+    return BulkAction(obj.uid, "delete", obj.xpath())
+
+
+def move_action(obj, where: str, dst: Optional[str] = None) -> BulkAction:
+    """Action equivalent to obj.move(where, dst)."""
+    attrs = {"where": where}
+    if dst:
+        attrs["dst"] = dst
+    return BulkAction(obj.uid, "move", obj.xpath(), attrs=attrs)
+
+
+def parse_payload(payload: Union[str, list], columns: List[str]) -> List[dict]:
+    """
+    Parse a bulk payload into a list of dicts.
+
+    Accepts a list, a JSON array, or CSV text. CSV may have a header row; without
+    one, values are mapped onto columns in order. Bare strings become {columns[0]: value}.
+    """
+    if isinstance(payload, str):
+        text = payload.strip()
+        if text.startswith("[") or text.startswith("{"):
+            payload = json.loads(text)
+            if isinstance(payload, dict):
+                payload = [payload]
+        else:
+            rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+            if rows and rows[0] and rows[0][0].strip().lower() in columns:
+                header = [cell.strip().lower() for cell in rows.pop(0)]
+            else:
+                header = columns
+            payload = [
+                {key: value.strip() for key, value in zip(header, row)}
+                for row in rows
+            ]
+    items = []
+    for item in payload or []:
+        if isinstance(item, str):
+            item = {columns[0]: item}
+        items.append(dict(item))
+    return items
+
+
+def chunked(items: list, size: int):
+    size = max(size, 1)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def multi_config(fw, actions: List[BulkAction]):
+    """
+    Push actions as one multi-config request.
+    Blocking - call through run_blocking().
+    """
+    root = ET.Element("multi-config")
+    for index, action in enumerate(actions, 1):
+        node = ET.SubElement(root, action.action, id=str(index), xpath=action.xpath, **(action.attrs or {}))
+        if action.element:
+            node.append(ET.fromstring(action.element))
+    device = api_device(fw)
+    device.set_config_changed()
+    return device.xapi.ad_hoc(
+        qs={
+            "type": "config",
+            "action": "multi-config",
+            "element": ET.tostring(root, encoding="unicode"),
+        },
+        modify_qs=True,
+    )
+
+
+async def push_in_chunks(fw, actions: List[BulkAction], chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """
+    Push actions in chunks of chunk_size, isolating failures.
+
+    Returns:
+        dict: {"results": {name: error or None}, "api_calls": int}
+    """
+    results: dict = {}
+    calls = 0
+
+    async def push(chunk: List[BulkAction]):
+        nonlocal calls
+        if not chunk:
+            return
+        calls += 1
+        try:
+            await run_blocking(fw, multi_config, fw, chunk)
+        except Exception as e:
+            if len(chunk) == 1:
+                results[chunk[0].name] = str(e)
+                return
+            middle = len(chunk) // 2
+            await push(chunk[:middle])
+            await push(chunk[middle:])
+            return
+        for action in chunk:
+            # An object may have several actions; keep the error if one of them failed
+            results.setdefault(action.name, None)
+
+    for chunk in chunked(actions, chunk_size):
+        await push(chunk)
+    return {"results": results, "api_calls": calls}
+
+
+def format_results(verb: str, noun: str, results: List[tuple], api_calls: int, verbose: bool = False) -> str:
+    """Summary line plus one line per failure (and per success when verbose) from (name, error) pairs."""
+    failed = sum(1 for _, error in results if error)
+    ok = len(results) - failed
+    mark = "✓" if not failed else ("✗" if not ok else "⚠")
+    lines = [f"{mark} {verb} {ok}/{len(results)} {noun} in {api_calls} API call(s)"]
+    for name, error in results:
+        if error:
+            lines.append(f"  ✗ {name}: {error}")
+        elif verbose:
+            lines.append(f"  ✓ {name}")
+    return "\n".join(lines)
@@ -0,0 +1,185 @@
+"""
+Read-through cache for firewall configuration.
+
+Entries are keyed by (device, vsys or device group, object type) and expire after a TTL.
+Our own write tools invalidate the entries they touch. With revalidation
+enabled, an expired entry is first checked against a cheap config
+fingerprint and kept if the firewall config has not changed. With config sync
+(core.sync), entries are kept current from the config log instead, and only
+expire when syncing stops working.
+
+Concurrent misses for the same entry share one load. A load that was already
+running when an entry was invalidated still answers its callers, but its
+result is not stored.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from core.device import api_device, endpoint
+from core.executor import run_blocking
+from core.singleflight import SingleFlight
+
+logger = logging.getLogger("palo_mcp")
+
+# Cache configuration - env
+CACHE_TTL = float(os.getenv("MCP_CACHE_TTL", "60"))
+CACHE_REVALIDATE = os.getenv("MCP_CACHE_REVALIDATE", "false").lower() in ("1", "true", "yes")
+
+# Cheap op commands whose output changes whenever candidate or running config does
+FINGERPRINT_COMMANDS = ("show config diff", "show config audit info")
+
+
+def device_id(fw) -> str:
+    """Identity of the device holding fw's config (firewalls behind Panorama by serial)."""
+    try:
+        device = api_device(fw)
+    except Exception:
+        device = fw
+    if getattr(device, "hostname", None):
+        return endpoint(device)
+    return str(getattr(device, "serial", None) or device)
+
+
+def config_fingerprint(fw) -> Optional[str]:
+    """
+    Hash of the config diff and audit info, or None if the device can't provide it.
+    Blocking - call through run_blocking().
+    """
+    digest = hashlib.sha1()
+    try:
+        device = api_device(fw)
+        for command in FINGERPRINT_COMMANDS:
+            digest.update(device.op(command, xml=True))
+    except Exception as e:
+        logger.debug(f"Config fingerprint unavailable: {str(e)}")
+        return None
+    return digest.hexdigest()
+
+
+class ConfigCache:
+    def __init__(self, ttl: float = CACHE_TTL, revalidate: bool = CACHE_REVALIDATE):
+        self.ttl = ttl
+        self.revalidate = revalidate
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        # Per key, bumped by invalidate() and sync updates; loads started before aren't stored
+        self._generations: dict = {}
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "invalidations": 0}
+        # core.sync.ConfigSync when MCP_CONFIG_SYNC_INTERVAL is set
+        self.sync = None
+
+    @staticmethod
+    def key(fw, kind: str) -> tuple:
+        # DeviceGroup.vsys is the device group name, so device groups get their own entries
+        return (device_id(fw), getattr(fw, "vsys", None) or "vsys1", kind)
+
+    async def get(self, fw, kind: str, loader: Callable, refresh: bool = False):
+        """
+        Return the cached value for (fw, vsys, kind), loading it with loader(fw) on a miss.
+
+        Args:
+            fw: Firewall the config belongs to
+            kind: Object type name, e.g. "address"
+            loader: Blocking callable returning the fresh value
+            refresh: Skip the cache and reload
+        """
+        key = self.key(fw, kind)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry and not refresh and self.ttl > 0:
+            if now - entry["loaded_at"] < self.ttl:
+                self.stats["hits"] += 1
+                return entry["value"]
+            if self.revalidate and entry["fingerprint"] is not None:
+                fingerprint = await run_blocking(fw, config_fingerprint, fw)
+                if fingerprint == entry["fingerprint"]:
+                    entry["loaded_at"] = time.monotonic()
+                    self.stats["revalidated"] += 1
+                    return entry["value"]
+
+        self.stats["misses"] += 1
+        with self._lock:
+            generation = self._generations.setdefault(key, 0)
+        return await self._loads.do((key, generation), lambda: self._load(fw, key, loader, generation))
+
+    async def _load(self, fw, key: tuple, loader: Callable, generation: int):
+        # Fingerprint before loading so a change during the load forces a later reload
+        fingerprint = await run_blocking(fw, config_fingerprint, fw) if self.revalidate else None
+        # Likewise the config log position the sync continues from
+        sync = self.sync
+        position = await sync.position(fw) if sync else None
+        value = await run_blocking(fw, loader, fw)
+        with self._lock:
+            if generation == self._generations.get(key):
+                self._entries[key] = {
+                    "value": value,
+                    "loaded_at": time.monotonic(),
+                    "fingerprint": fingerprint,
+                    "position": position,
+                    "fw": fw,
+                }
+        if sync and position is not None:
+            sync.watch()
+        return value
+
+    def synced(self) -> dict:
+        """Entries the config sync follows, grouped by device id: {device: [(key, entry), ...]}."""
+        devices: dict = {}
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry["position"] is not None:
+                    devices.setdefault(key[0], []).append((key, entry))
+        return devices
+
+    def update(self, key: tuple, entry: dict, position: int, value=None) -> bool:
+        """
+        Mark an entry synced up to a config log position, replacing its value if given.
+        Returns False if the entry was reloaded or invalidated meanwhile.
+        """
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return False
+            if value is not None:
+                # Loads of this key that started before this change must not overwrite it
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._entries[key] = entry = {**entry, "value": value}
+            entry["position"] = position
+            entry["loaded_at"] = time.monotonic()
+        return True
+
+    def invalidate(self, fw, kind: Optional[str] = None):
+        """Drop cached entries for fw (all object types if kind is None)."""
+        fw_id, vsys, _ = self.key(fw, kind or "")
+        self.drop(fw_id, vsys, kind)
+
+    def drop(self, fw_id: str, vsys: Optional[str] = None, kind: Optional[str] = None):
+        """Drop cached entries of a device id, optionally only one vsys / device group and object type."""
+        with self._lock:
+            # Every key that was ever requested has a generation, including loads still in flight
+            for key in self._generations:
+                if key[0] == fw_id and vsys in (None, key[1]) and kind in (None, key[2]):
+                    self._generations[key] += 1
+                    if self._entries.pop(key, None) is not None:
+                        self.stats["invalidations"] += 1
+
+    def info(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["revalidated"]
+        hit_ratio = (self.stats["hits"] + self.stats["revalidated"]) / lookups if lookups else 0.0
+        return {
+            **self.stats,
+            "loads": self._loads.stats["calls"],
+            "coalesced": self._loads.stats["coalesced"],
+            "entries": len(self._entries),
+            "hit_ratio": hit_ratio,
+            "ttl": self.ttl,
+            "revalidate": self.revalidate,
+        }
+
+
+config_cache = ConfigCache()
@@ -0,0 +1,165 @@
+"""
+Change sets: candidate config edits staged on the server and applied together.
+
+Write tools called with a change_set_id stage their set / edit / delete
+action instead of calling the API. commit_change_set then pushes every
+staged action in one multi-config request, which PAN-OS applies atomically,
+and starts one commit. The commit is partial, limited to the target's admin,
+when an admin is known. The commit job is followed by the job tracker, so
+the tool call can return while the commit is still running.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from core.bulk import BulkAction, multi_config
+from core.cache import config_cache
+from core.executor import run_blocking
+from core.jobs import TrackedJob, commit, job_tracker
+
+logger = logging.getLogger("palo_mcp")
+
+# Change set configuration - env
+CHANGE_SET_TTL = float(os.getenv("MCP_CHANGE_SET_TTL", "3600"))
+
+OPEN = "open"
+PUSHING = "pushing"         # multi-config request in flight; no more changes accepted
+PUSHED = "pushed"           # in candidate config, not committed
+COMMITTING = "committing"
+COMMITTED = "committed"
+FAILED = "failed"
+DISCARDED = "discarded"
+
+
+@dataclass
+class StagedChange:
+    summary: str
+    kind: str                   # config cache kind the change touches
+    action: BulkAction
+
+
+@dataclass
+class ChangeSet:
+    id: str
+    target: str
+    session_id: Optional[str] = None
+    description: str = ""
+    created: float = field(default_factory=time.time)
+    changes: List[StagedChange] = field(default_factory=list)
+    state: str = OPEN
+    admin: Optional[str] = None
+    job_id: Optional[str] = None
+    job: Optional[dict] = None
+    error: Optional[str] = None
+    updated: float = field(default_factory=time.time)
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def stage(self, action: BulkAction, kind: str, summary: str):
+        if self.state != OPEN:
+            raise ValueError(f"Change set {self.id} is {self.state}, start a new one with begin_change_set")
+        self.changes.append(StagedChange(summary, kind, action))
+        self.updated = time.time()
+
+
+class ChangeSetStore:
+    def __init__(self, ttl: float = CHANGE_SET_TTL):
+        self.ttl = ttl
+        self._sets: Dict[str, ChangeSet] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, target: str, session_id: Optional[str] = None, description: str = "") -> ChangeSet:
+        """New change set for target, or the session's change set for target that is still open."""
+        self.prune()
+        with self._lock:
+            if session_id:
+                for change_set in self._sets.values():
+                    if change_set.session_id == session_id and change_set.target == target and change_set.state == OPEN:
+                        return change_set
+            change_set = ChangeSet(uuid.uuid4().hex[:12], target, session_id, description)
+            self._sets[change_set.id] = change_set
+            return change_set
+
+    def get(self, change_set_id: str, target: Optional[str] = None) -> ChangeSet:
+        """Change set by id; target, when given, must be the change set's target."""
+        change_set = self._sets.get((change_set_id or "").strip())
+        if change_set is None:
+            raise ValueError(f"Unknown change set '{change_set_id}'")
+        if target and target != change_set.target:
+            raise ValueError(f"Change set {change_set.id} belongs to target '{change_set.target}', not '{target}'")
+        return change_set
+
+    def for_session(self, session_id: Optional[str] = None) -> List[ChangeSet]:
+        self.prune()
+        return [cs for cs in self._sets.values() if not session_id or cs.session_id == session_id]
+
+    def prune(self):
+        """Forget change sets untouched for longer than the TTL, unless a commit is still running."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for change_set_id, change_set in list(self._sets.items()):
+                if change_set.updated < cutoff and change_set.state not in (PUSHING, COMMITTING):
+                    del self._sets[change_set_id]
+
+
+change_sets = ChangeSetStore()
+
+
+async def push_change_set(fw, change_set: ChangeSet):
+    """
+    Apply every staged change to the candidate config in one multi-config request.
+    The change set is PUSHING meanwhile, so it can't be staged to, discarded or pushed
+    again; it goes back to OPEN if the request is rejected.
+    """
+    if change_set.state != OPEN:
+        raise ValueError(f"Change set {change_set.id} is {change_set.state}")
+    change_set.state = PUSHING
+    change_set.updated = time.time()
+    try:
+        await run_blocking(fw, multi_config, fw, [change.action for change in change_set.changes])
+    except BaseException:
+        change_set.state = OPEN
+        raise
+    finally:
+        for kind in {change.kind for change in change_set.changes}:
+            config_cache.invalidate(fw, kind)
+    change_set.state = PUSHED
+    change_set.updated = time.time()
+
+
+async def _follow_commit(change_set: ChangeSet, job: TrackedJob):
+    await job.done.wait()
+    change_set.job = job.status
+    change_set.error = job.error
+    change_set.state = COMMITTED if job.ok else FAILED
+    change_set.updated = time.time()
+    logger.info(f"Change set {change_set.id} commit job {change_set.job_id}: {change_set.state}")
+
+
+async def start_commit(fw, change_set: ChangeSet, admin: Optional[str] = None):
+    """
+    Commit the pushed change set and follow the job in the background.
+    A commit limited to admin when given, otherwise a full commit.
+    """
+    if change_set.state != PUSHED:
+        raise ValueError(f"Change set {change_set.id} is {change_set.state}")
+    change_set.admin = admin
+    # Claimed before the API call so a concurrent commit_change_set doesn't start a second commit
+    change_set.state = COMMITTING
+    try:
+        job_id = await run_blocking(fw, commit, fw, admin, change_set.description or None)
+    except BaseException:
+        change_set.state = PUSHED
+        raise
+    change_set.updated = time.time()
+    if job_id is None:
+        # Nothing to commit, e.g. the changes were already in running config
+        change_set.state = COMMITTED
+        return
+    change_set.job_id = job_id
+    job = job_tracker.track(fw, change_set.target, job_id, "commit", f"change set {change_set.id}")
+    change_set.task = asyncio.create_task(_follow_commit(change_set, job))
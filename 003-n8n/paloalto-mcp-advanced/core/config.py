@@ -0,0 +1,188 @@
+"""
+Cached access to firewall configuration objects.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from panos import objects
+from panos.errors import PanNoSuchNode
+from panos.panorama import DeviceGroup, Panorama
+from panos.policies import PreRulebase, Rulebase, SecurityRule
+
+from core.cache import config_cache
+from core.device import api_device
+
+ADDRESS_OBJECTS = "address"
+ADDRESS_GROUPS = "address-group"
+SERVICE_OBJECTS = "service"
+SERVICE_GROUPS = "service-group"
+APPLICATION_GROUPS = "application-group"
+SECURITY_RULES = "security-rule"
+
+# pan-os-python class of each cached object type
+OBJECT_CLASSES = {
+    ADDRESS_OBJECTS: objects.AddressObject,
+    ADDRESS_GROUPS: objects.AddressGroup,
+    SERVICE_OBJECTS: objects.ServiceObject,
+    SERVICE_GROUPS: objects.ServiceGroup,
+    APPLICATION_GROUPS: objects.ApplicationGroup,
+    SECURITY_RULES: SecurityRule,
+}
+# Names per XPath union in fetch_objects()
+FETCH_BATCH = 50
+
+
+def get_rulebase(fw):
+    """
+    The target's rulebase node, created once instead of per call.
+    Panorama and device group targets use their pre-rulebase.
+    """
+    if isinstance(fw, (DeviceGroup, Panorama)):
+        return fw.find_or_create(None, PreRulebase)
+    return fw.find_or_create(None, Rulebase)
+
+
+# add=False: the cache holds the loaded objects, so attaching them to fw.children
+# as well would only keep every previous load alive (and duplicated) in the tree.
+def load_address_objects(fw) -> list:
+    return objects.AddressObject.refreshall(fw, add=False)
+
+
+def load_address_groups(fw) -> list:
+    return objects.AddressGroup.refreshall(fw, add=False)
+
+
+def load_service_objects(fw) -> list:
+    return objects.ServiceObject.refreshall(fw, add=False)
+
+
+def load_service_groups(fw) -> list:
+    return objects.ServiceGroup.refreshall(fw, add=False)
+
+
+def load_application_groups(fw) -> list:
+    return objects.ApplicationGroup.refreshall(fw, add=False)
+
+
+def load_security_rules(fw) -> list:
+    return SecurityRule.refreshall(get_rulebase(fw), add=False)
+
+
+async def get_address_objects(fw, refresh: bool = False) -> list:
+    return await config_cache.get(fw, ADDRESS_OBJECTS, load_address_objects, refresh=refresh)
+
+
+async def get_address_groups(fw, refresh: bool = False) -> list:
+    return await config_cache.get(fw, ADDRESS_GROUPS, load_address_groups, refresh=refresh)
+
+
+async def get_service_objects(fw, refresh: bool = False) -> list:
+    return await config_cache.get(fw, SERVICE_OBJECTS, load_service_objects, refresh=refresh)
+
+
+async def get_service_groups(fw, refresh: bool = False) -> list:
+    return await config_cache.get(fw, SERVICE_GROUPS, load_service_groups, refresh=refresh)
+
+
+async def get_application_groups(fw, refresh: bool = False) -> list:
+    return await config_cache.get(fw, APPLICATION_GROUPS, load_application_groups, refresh=refresh)
+
+
+async def get_security_rules(fw, refresh: bool = False) -> list:
+    return await config_cache.get(fw, SECURITY_RULES, load_security_rules, refresh=refresh)
+
+
+def _fetch(obj):
+    """
+    Refresh obj from its own XPath, or return None if it doesn't exist.
+
+    obj.refresh() reports connection errors as PanObjectMissing, so the get is
+    done here to let those propagate instead of looking like "not found".
+    """
+    device = obj.nearest_pandevice()
+    try:
+        root = device.xapi.get(obj.xpath(), retry_on_peer=obj.HA_SYNC)
+    except PanNoSuchNode:
+        return None
+    element = root.find("result/entry")
+    if element is None:
+        return None
+    obj.refresh(xml=element)
+    return obj
+
+
+def fetch_address_object(fw, name: str):
+    """
+    Fetch a single address object by XPath, or None if it doesn't exist.
+    Blocking - call through run_blocking().
+    """
+    addr = objects.AddressObject(name)
+    # Attach without adding to fw.children so repeated fetches don't grow the tree
+    addr.parent = fw
+    return _fetch(addr)
+
+
+def fetch_security_rule(fw, name: str):
+    """
+    Fetch a single security rule by XPath, or None if it doesn't exist.
+    Blocking - call through run_blocking().
+    """
+    rule = SecurityRule(name)
+    rule.parent = get_rulebase(fw)
+    return _fetch(rule)
+
+
+def _detached(fw, kind: str, name: str):
+    """Object of a cached type, attached to its parent without adding it to the tree."""
+    obj = OBJECT_CLASSES[kind](name)
+    obj.parent = get_rulebase(fw) if kind == SECURITY_RULES else fw
+    return obj
+
+
+def fetch_objects(fw, kind: str, names: Iterable[str]) -> Dict[str, Optional[object]]:
+    """
+    Fetch objects of a cached type by name, FETCH_BATCH names per API call.
+    Blocking - call through run_blocking().
+
+    Returns:
+        name -> object, or None for names that no longer exist
+    """
+    names = list(dict.fromkeys(names))
+    found: Dict[str, Optional[object]] = dict.fromkeys(names)
+    device = api_device(fw)
+    for start in range(0, len(names), FETCH_BATCH):
+        batch = {name: _detached(fw, kind, name) for name in names[start:start + FETCH_BATCH]}
+        xpath = "|".join(obj.xpath() for obj in batch.values())
+        try:
+            root = device.xapi.get(xpath)
+        except PanNoSuchNode:
+            continue
+        for element in root.iterfind("result/entry"):
+            obj = batch.get(element.get("name"))
+            if obj is not None:
+                obj.refresh(xml=element)
+                found[obj.name] = obj
+    return found
+
+
+def fetch_names(fw, kind: str) -> List[str]:
+    """
+    Names of all objects of a cached type, in config order (e.g. rule order).
+    Blocking - call through run_blocking().
+    """
+    parent_xpath = _detached(fw, kind, "_").xpath().rsplit("/entry", 1)[0]
+    device = api_device(fw)
+    try:
+        root = device.xapi.get(parent_xpath + "/entry/@name")
+    except PanNoSuchNode:
+        return []
+    return [element.get("name") for element in root.iterfind("result/entry")]
+
+
+def delete_object(obj):
+    """
+    Delete a fetched object from the device.
+    Blocking - call through run_blocking().
+    """
+    # delete() removes the object from its parent's children afterwards
+    obj.parent.add(obj)
+    obj.delete()
@@ -0,0 +1,74 @@
+"""
+Firewall and Panorama device wrappers safe to share across executor threads.
+"""
+import threading
+from panos import firewall, panorama
+from panos.base import PanDevice
+
+from core import metrics, tracing
+from core.transport import attach
+
+
+class ThreadLocalXapi:
+    """
+    Mixin giving a pan-os-python device one XML API client per thread.
+
+    PanXapi keeps the last response on the instance (element_root, status, ...),
+    so two executor threads sharing one client would read each other's results.
+    Each worker thread gets its own client instead. All clients share the
+    keep-alive connection pool from core.transport and are timed by core.metrics
+    (and core.tracing when enabled). Devices built from a config snapshot
+    (core.snapshot) are answered from it instead of the network.
+    """
+
+    def __init__(self, *args, use_http: bool = False, snapshot=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_http = use_http
+        self.snapshot = snapshot
+        self._xapi_local = threading.local()
+
+    @property
+    def xapi(self):
+        xapi = getattr(self._xapi_local, "xapi", None)
+        if xapi is None:
+            xapi = self.generate_xapi()
+            self._xapi_local.xapi = xapi
+        return xapi
+
+    def generate_xapi(self):
+        xapi = super().generate_xapi()
+        if self.snapshot is not None:
+            return tracing.instrument(metrics.instrument(self.snapshot.attach(xapi)))
+        if self.use_http:
+            # Plain HTTP is only meant for lab / mock API endpoints
+            xapi.uri = xapi.uri.replace("https://", "http://", 1)
+        return tracing.instrument(metrics.instrument(attach(xapi)))
+
+    def update_connection_method(self):
+        self._xapi_local = threading.local()
+        return self.xapi
+
+
+class Firewall(ThreadLocalXapi, firewall.Firewall):
+    pass
+
+
+class Panorama(ThreadLocalXapi, panorama.Panorama):
+    pass
+
+
+def api_device(obj):
+    """
+    The device that executes API calls for obj: obj itself for a Firewall or
+    Panorama, otherwise the nearest device above it (Panorama for a device group).
+
+    PanDevice.nearest_pandevice() returns the *parent* device, which would send
+    calls for a firewall managed through Panorama to Panorama itself.
+    """
+    return obj if isinstance(obj, PanDevice) else obj.nearest_pandevice()
+
+
+def endpoint(device) -> str:
+    """host, or host:port for a non-default API port (several devices may share a host)."""
+    port = getattr(device, "port", 443)
+    return device.hostname if port in (None, 443) else f"{device.hostname}:{port}"
@@ -0,0 +1,167 @@
+"""
+Bounded executor for blocking pan-os-python calls.
+
+Every XML API round-trip (refreshall, refresh, create, apply, op, ...) is
+blocking, so tools hand them to run_blocking() instead of calling them on the
+event loop. Calls run on a shared thread pool and are capped per firewall so
+one busy device cannot take every worker.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import tracing
+from core.device import api_device, endpoint
+from core.singleflight import SingleFlight
+
+# Executor configuration - env
+MAX_WORKERS = int(os.getenv("MCP_EXECUTOR_WORKERS", "16"))
+PER_FIREWALL_LIMIT = int(os.getenv("MCP_FIREWALL_CONCURRENCY", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="panos")
+_semaphores: dict = {}
+_stats_lock = threading.Lock()
+_stats = {
+    "waiting": 0,      # blocked on a per-firewall slot
+    "pending": 0,      # holding a slot, queued for a worker thread
+    "running": 0,      # executing on a worker thread
+    "completed": 0,
+    "failed": 0,
+    "max_queue_depth": 0,
+    "total_wait_seconds": 0.0,
+}
+_per_firewall: dict = {}
+# Identical concurrent read-only op commands share one API call
+op_reads = SingleFlight()
+
+
+def firewall_key(fw) -> str:
+    """
+    Key used for the per-firewall concurrency cap: the host that serves fw's API calls.
+
+    Device groups and firewalls reached through Panorama share Panorama's key,
+    since their requests all land on Panorama's management plane.
+    """
+    try:
+        device = api_device(fw)
+    except Exception:
+        device = fw
+    if getattr(device, "hostname", None) is None and getattr(device, "parent", None) is not None:
+        return firewall_key(device.parent)
+    return endpoint(device) if getattr(device, "hostname", None) else str(device)
+
+
+def _semaphore(key: str) -> asyncio.Semaphore:
+    sem = _semaphores.get(key)
+    if sem is None:
+        sem = _semaphores[key] = asyncio.Semaphore(PER_FIREWALL_LIMIT)
+    return sem
+
+
+def _bump(key: str, field: str, delta: int):
+    with _stats_lock:
+        _stats[field] += delta
+        device = _per_firewall.setdefault(key, {"waiting": 0, "pending": 0, "running": 0, "calls": 0})
+        device[field] += delta
+        depth = _stats["waiting"] + _stats["pending"]
+        if depth > _stats["max_queue_depth"]:
+            _stats["max_queue_depth"] = depth
+
+
+async def run_blocking(fw, func, *args, **kwargs):
+    """
+    Run a blocking call against fw on the shared executor.
+
+    Args:
+        fw: Firewall the call talks to (used for the per-firewall cap)
+        func: Blocking callable, e.g. objects.AddressObject.refreshall
+        *args, **kwargs: Passed through to func
+
+    Returns:
+        Whatever func returns; exceptions propagate to the caller.
+    """
+    key = firewall_key(fw)
+    queued_at = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    loop_thread = threading.current_thread()
+    sem = _semaphore(key)
+    _bump(key, "waiting", 1)
+    try:
+        await sem.acquire()
+    finally:
+        _bump(key, "waiting", -1)
+
+    def _release():
+        try:
+            loop.call_soon_threadsafe(sem.release)
+        except RuntimeError:
+            # Event loop already closed (shutdown); nobody is waiting for the slot
+            pass
+
+    def _call():
+        started = time.perf_counter()
+        _bump(key, "pending", -1)
+        _bump(key, "running", 1)
+        with _stats_lock:
+            _stats["total_wait_seconds"] += started - queued_at
+            _per_firewall[key]["calls"] += 1
+        tracing.record("executor.wait", queued_at, started, loop_thread, firewall=key)
+        try:
+            with tracing.span("executor.run", call=getattr(func, "__qualname__", str(func))):
+                return func(*args, **kwargs)
+        finally:
+            _bump(key, "running", -1)
+            # The slot is held until the device call ends, even if the caller was cancelled
+            _release()
+
+    _bump(key, "pending", 1)
+    try:
+        # Copy contextvars so per-call context follows the work into the thread
+        ctx = contextvars.copy_context()
+        future = _executor.submit(ctx.run, _call)
+    except BaseException:
+        _bump(key, "pending", -1)
+        sem.release()
+        raise
+    try:
+        result = await asyncio.wrap_future(future)
+        with _stats_lock:
+            _stats["completed"] += 1
+        return result
+    except asyncio.CancelledError:
+        # Not started yet: _call will never run, so undo what it would have
+        if future.cancel():
+            _bump(key, "pending", -1)
+            sem.release()
+        raise
+    except Exception:
+        with _stats_lock:
+            _stats["failed"] += 1
+        raise
+
+
+def executor_stats() -> dict:
+    """Snapshot of executor counters, including current queue depth."""
+    with _stats_lock:
+        stats = dict(_stats)
+        stats["queue_depth"] = stats["waiting"] + stats["pending"]
+        stats["max_workers"] = MAX_WORKERS
+        stats["per_firewall_limit"] = PER_FIREWALL_LIMIT
+        stats["firewalls"] = {k: dict(v) for k, v in _per_firewall.items()}
+    stats["op_reads"] = dict(op_reads.stats)
+    return stats
+
+
+async def run_op(fw, command: str):
+    """
+    Raw XML output of an op command on fw's API device.
+    Identical concurrent `show` commands against the same device and vsys share one call.
+    """
+    device = api_device(fw)
+    if not command.strip().lower().startswith("show "):
+        return await run_blocking(fw, device.op, command, xml=True)
+    key = (firewall_key(fw), getattr(fw, "serial", None), getattr(fw, "vsys", None), " ".join(command.split()))
+    return await op_reads.do(key, lambda: run_blocking(fw, device.op, command, xml=True))
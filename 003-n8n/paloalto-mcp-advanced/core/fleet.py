@@ -0,0 +1,77 @@
+"""
+Concurrent fan-out of one call across many registry targets.
+
+Each target runs under a per-device timeout. A fleet-wide semaphore bounds
+how many targets are in flight at once. The per-firewall cap and the worker
+pool in core.executor still apply underneath. Results come back in target
+order, and an optional callback sees each one as soon as it finishes.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional
+
+# Fleet configuration - env
+FLEET_CONCURRENCY = int(os.getenv("MCP_FLEET_CONCURRENCY", "32"))
+FLEET_TIMEOUT = float(os.getenv("MCP_FLEET_TIMEOUT", "30"))
+
+
+@dataclass
+class FleetResult:
+    target: str
+    value: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(
+    targets: List[str],
+    resolve: Callable[[str], Any],
+    call: Callable[[Any], Awaitable[Any]],
+    concurrency: int = FLEET_CONCURRENCY,
+    timeout: float = FLEET_TIMEOUT,
+    on_result: Optional[Callable[[FleetResult, int, int], Awaitable[None]]] = None,
+) -> List[FleetResult]:
+    """
+    Run call(device) for every target concurrently.
+
+    Args:
+        targets: Registry target names
+        resolve: Maps a target name to its device, e.g. main.get_firewall
+        call: Async callable taking the device, e.g. lambda fw: run_blocking(fw, ...)
+        concurrency: Max targets in flight
+        timeout: Seconds per target before it is reported as timed out
+        on_result: Awaited with (result, finished count, total) as each target finishes
+
+    Returns:
+        List[FleetResult]: One result per target, in the order given
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    results: List[Optional[FleetResult]] = [None] * len(targets)
+    finished = 0
+
+    async def run(index: int, name: str):
+        nonlocal finished
+        async with semaphore:
+            started = time.perf_counter()
+            result = FleetResult(name)
+            try:
+                # A timed-out call keeps its executor thread until the device answers
+                result.value = await asyncio.wait_for(call(resolve(name)), timeout)
+            except asyncio.TimeoutError:
+                result.error = f"timed out after {timeout:g}s"
+            except Exception as e:
+                result.error = str(e)
+            result.elapsed = time.perf_counter() - started
+        results[index] = result
+        finished += 1
+        if on_result is not None:
+            await on_result(result, finished, len(targets))
+
+    await asyncio.gather(*(run(index, name) for index, name in enumerate(targets)))
+    return results
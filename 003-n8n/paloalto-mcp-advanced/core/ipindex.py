@@ -0,0 +1,223 @@
+"""
+In-memory IP index over address objects, address groups and security rules.
+
+Every ip-netmask / ip-range value is stored as CIDR prefixes in one hash
+table per prefix length. IP ranges are split into their covering CIDRs
+first. Finding everything that covers an IP or CIDR is then one dict lookup
+per prefix length in use, instead of a scan over every object. Reverse maps
+then resolve matched objects to groups (static members, nested) and to the
+rules that reference them in source or destination.
+
+The index is built from the cached config and rebuilt whenever the
+config cache hands out a new object list.
+"""
+import asyncio
+import ipaddress
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from core.cache import ConfigCache
+from core.config import get_address_groups, get_address_objects, get_security_rules
+from core.query import address_range
+
+IP_INDEX = "ip-index"
+SIDES = ("source", "destination")
+BITS = {4: 32, 6: 128}
+
+
+def span_prefixes(span: Tuple[int, int, int]) -> List[Tuple[int, int]]:
+    """(prefix length, network int) CIDR blocks exactly covering a (version, first, last) span."""
+    version, first, last = span
+    bits = BITS[version]
+    prefixes = []
+    while first <= last:
+        # Largest block aligned on first that still ends within the span
+        size = min((first & -first).bit_length() - 1 if first else bits, (last - first + 1).bit_length() - 1)
+        prefixes.append((bits - size, first))
+        first += 1 << size
+    return prefixes
+
+
+def literal_range(value: str) -> Optional[Tuple[int, int, int]]:
+    """Span of a literal rule address (IP, CIDR or a-b range), or None."""
+    return address_range("ip-range" if "-" in value else "ip-netmask", value)
+
+
+class PrefixTable:
+    """Keys stored under CIDR prefixes, one hash table per (version, prefix length)."""
+
+    def __init__(self):
+        # version -> prefix length -> network >> host bits -> keys
+        self._tables: Dict[int, Dict[int, Dict[int, set]]] = {4: {}, 6: {}}
+        self._prefix_lengths: Dict[int, List[int]] = {4: [], 6: []}
+        self.prefixes = 0
+
+    def insert(self, key, span: Tuple[int, int, int]):
+        version = span[0]
+        tables = self._tables[version]
+        for prefixlen, network in span_prefixes(span):
+            table = tables.get(prefixlen)
+            if table is None:
+                table = tables[prefixlen] = {}
+                self._prefix_lengths[version] = sorted(tables)
+            table.setdefault(network >> (BITS[version] - prefixlen), set()).add(key)
+            self.prefixes += 1
+
+    def covering(self, version: int, start: int, prefixlen: int) -> set:
+        """Keys whose prefixes contain the block start/prefixlen."""
+        keys = set()
+        bits = BITS[version]
+        tables = self._tables[version]
+        for length in self._prefix_lengths[version]:
+            if length > prefixlen:
+                break
+            found = tables[length].get(start >> (bits - length))
+            if found:
+                keys |= found
+        return keys
+
+
+class IpIndex:
+    def __init__(self):
+        # ("address", name) | ("literal", value) keys by prefix
+        self._prefixes = PrefixTable()
+        self.address_values: Dict[str, str] = {}
+        self.groups_of: Dict[str, Set[str]] = {}        # address name -> groups containing it (nested)
+        self.rule_names: List[str] = []
+        self.rule_refs = {side: {} for side in SIDES}   # ref -> rule positions
+        self.rule_any = {side: [] for side in SIDES}    # positions of rules with "any"
+        self.rule_negated = {side: set() for side in SIDES}
+        self.counts = {"addresses": 0, "indexed": 0, "groups": 0, "dynamic_groups": 0, "rules": 0, "prefixes": 0}
+
+    def _insert(self, key: tuple, span: Tuple[int, int, int]):
+        self._prefixes.insert(key, span)
+        self.counts["prefixes"] = self._prefixes.prefixes
+
+    @classmethod
+    def build(cls, addresses: list, groups: list, rules: list) -> "IpIndex":
+        index = cls()
+        address_names = set()
+        for addr in addresses:
+            address_names.add(addr.name)
+            index.counts["addresses"] += 1
+            span = address_range(addr.type, addr.value)
+            if span is None:
+                continue
+            index.address_values[addr.name] = addr.value
+            index._insert(("address", addr.name), span)
+            index.counts["indexed"] += 1
+
+        # Resolve static groups to member addresses, following nested groups
+        members = {}
+        for group in groups:
+            index.counts["groups"] += 1
+            if group.dynamic_value:
+                index.counts["dynamic_groups"] += 1
+            members[group.name] = list(group.static_value or [])
+
+        def resolve(name: str, seen: Set[str]) -> Set[str]:
+            resolved = set()
+            for member in members.get(name, []):
+                if member in members and member not in seen:
+                    resolved |= resolve(member, seen | {member})
+                elif member in address_names:
+                    resolved.add(member)
+            return resolved
+
+        for group in members:
+            for addr in resolve(group, {group}):
+                index.groups_of.setdefault(addr, set()).add(group)
+
+        for position, rule in enumerate(rules):
+            index.rule_names.append(rule.name)
+            index.counts["rules"] += 1
+            for side, negate in (("source", rule.negate_source), ("destination", rule.negate_destination)):
+                if negate:
+                    index.rule_negated[side].add(position)
+                for entry in getattr(rule, side) or []:
+                    if entry == "any":
+                        index.rule_any[side].append(position)
+                        continue
+                    if entry in members:
+                        ref = ("group", entry)
+                    elif entry in address_names:
+                        ref = ("address", entry)
+                    else:
+                        span = literal_range(entry)
+                        if span is None:
+                            continue    # fqdn / wildcard objects or regions are not indexed
+                        ref = ("literal", entry)
+                        index._insert(ref, span)
+                    index.rule_refs[side].setdefault(ref, []).append(position)
+        return index
+
+    def covering(self, value: str) -> Set[tuple]:
+        """Index keys whose prefixes contain the whole IP / CIDR value."""
+        network = ipaddress.ip_network(value.strip(), strict=False)
+        return self._prefixes.covering(network.version, int(network.network_address), network.prefixlen)
+
+    def lookup(self, value: str, side: str = "any", include_any: bool = False) -> dict:
+        """
+        Address objects, groups and rules covering an IP or CIDR.
+
+        Returns:
+            dict: {"addresses": [...], "groups": [...], "rules": [(name, [sides], [via refs])]}
+        """
+        keys = self.covering(value)
+        addresses = sorted(name for kind, name in keys if kind == "address")
+        groups = sorted({group for name in addresses for group in self.groups_of.get(name, ())})
+        refs = keys | {("group", group) for group in groups}
+
+        matched: Dict[int, dict] = {}
+        for rule_side in (SIDES if side == "any" else (side,)):
+            hits: Dict[int, List[str]] = {}
+            for ref in refs:
+                for position in self.rule_refs[rule_side].get(ref, ()):
+                    hits.setdefault(position, []).append(ref[1])
+            if include_any:
+                for position in self.rule_any[rule_side]:
+                    hits.setdefault(position, []).append("any")
+            # Negated sides match when none of their entries do
+            for position in self.rule_negated[rule_side]:
+                if position in hits:
+                    del hits[position]
+                else:
+                    hits[position] = ["negated"]
+            for position, via in hits.items():
+                entry = matched.setdefault(position, {"sides": [], "via": []})
+                entry["sides"].append(rule_side)
+                entry["via"].extend(v for v in via if v not in entry["via"])
+
+        return {
+            "addresses": [(name, self.address_values[name]) for name in addresses],
+            "groups": groups,
+            "rules": [
+                (self.rule_names[position], matched[position]["sides"], sorted(matched[position]["via"]))
+                for position in sorted(matched)
+            ],
+        }
+
+
+_indexes: dict = {}
+_lock = threading.Lock()
+
+
+async def get_ip_index(fw, refresh: bool = False) -> IpIndex:
+    """IpIndex for fw's cached config, rebuilt when any of the cached lists changed."""
+    addresses = await get_address_objects(fw, refresh=refresh)
+    groups = await get_address_groups(fw, refresh=refresh)
+    rules = await get_security_rules(fw, refresh=refresh)
+    key = ConfigCache.key(fw, IP_INDEX)
+    sources = (id(addresses), id(groups), id(rules))
+    entry = _indexes.get(key)
+    if entry is not None and entry[0] == sources:
+        return entry[1]
+    started = time.perf_counter()
+    # CPU-bound, keep it off the event loop
+    index = await asyncio.to_thread(IpIndex.build, addresses, groups, rules)
+    index.build_seconds = time.perf_counter() - started
+    with _lock:
+        # Holding the source lists keeps their ids from being reused while cached
+        _indexes[key] = (sources, index, (addresses, groups, rules))
+    return index
@@ -0,0 +1,215 @@
+"""
+PAN-OS job tracking.
+
+Commits and long op commands (software downloads, content updates, ...) run
+as jobs on the device: the API call returns a job id right away and the job
+is followed with `show jobs`. Tracked jobs are polled by one background task.
+Each interval it sends a single `show jobs all` per device, however many jobs
+are outstanding there, and updates every tracked job from that response.
+Tools wait on a job's completion event, so waiting holds no executor thread
+and no API call of its own.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.cache import device_id
+from core.device import api_device
+from core.executor import run_blocking
+
+logger = logging.getLogger("palo_mcp")
+
+# Job configuration - env
+JOB_POLL_INTERVAL = float(os.getenv("MCP_JOB_POLL_INTERVAL", "2"))
+JOB_TIMEOUT = float(os.getenv("MCP_JOB_TIMEOUT", "3600"))
+
+FINISHED = "FIN"
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION = 3600
+
+
+def parse_job(job: ET.Element) -> dict:
+    """<job> element of a `show jobs` response as a dict."""
+    def text(tag: str) -> Optional[str]:
+        node = job.find(tag)
+        return node.text.strip() if node is not None and node.text else None
+
+    progress = text("progress")
+    return {
+        "id": text("id"),
+        "type": text("type"),
+        "user": text("user"),
+        "status": text("status"),           # ACT / PEND / FIN
+        "result": text("result"),           # PEND / OK / FAIL
+        "progress": int(progress) if progress and progress.isdigit() else None,
+        "details": [line.text for line in job.iterfind("details/line") if line.text],
+        "warnings": [line.text for line in job.iterfind("warnings/line") if line.text],
+    }
+
+
+def show_job(fw, job_id: str) -> dict:
+    """
+    Current status of one job.
+    Blocking - call through run_blocking().
+    """
+    response = api_device(fw).op(f"<show><jobs><id>{int(job_id)}</id></jobs></show>", cmd_xml=False)
+    job = response.find("./result/job")
+    if job is None:
+        raise ValueError(f"Job {job_id} not found")
+    return parse_job(job)
+
+
+def show_jobs(fw) -> Dict[str, dict]:
+    """
+    Status of every job the device still lists, by job id.
+    Blocking - call through run_blocking().
+    """
+    response = api_device(fw).op("<show><jobs><all></all></jobs></show>", cmd_xml=False)
+    jobs = (parse_job(job) for job in response.iterfind("./result/job"))
+    return {job["id"]: job for job in jobs if job["id"]}
+
+
+def commit(fw, admin: Optional[str] = None, description: Optional[str] = None) -> Optional[str]:
+    """
+    Start a commit, partial to admin's changes when given.
+    Blocking - call through run_blocking().
+
+    Returns:
+        Job id, or None when there was nothing to commit
+    """
+    cmd = ET.Element("commit")
+    if admin:
+        ET.SubElement(ET.SubElement(ET.SubElement(cmd, "partial"), "admin"), "member").text = admin
+    if description:
+        ET.SubElement(cmd, "description").text = description
+    job_id = api_device(fw).commit(cmd=ET.tostring(cmd, encoding="unicode"))
+    return str(job_id) if job_id is not None else None
+
+
+@dataclass
+class TrackedJob:
+    id: str
+    target: str
+    kind: str
+    description: str = ""
+    status: dict = field(default_factory=dict)
+    started: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    error: Optional[str] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.finished is not None and self.error is None and self.status.get("result") == "OK"
+
+    def finish(self, error: Optional[str] = None):
+        self.error = error
+        self.finished = time.time()
+        self.done.set()
+
+
+class JobTracker:
+    def __init__(self, interval: float = JOB_POLL_INTERVAL, timeout: float = JOB_TIMEOUT):
+        self.interval = interval
+        self.timeout = timeout
+        self._jobs: Dict[Tuple[str, str], TrackedJob] = {}
+        self._devices: dict = {}        # device id -> fw used to poll it
+        self._poller: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.stats = {"tracked": 0, "polls": 0, "api_calls": 0, "finished": 0}
+
+    def track(self, fw, target: str, job_id: str, kind: str = "", description: str = "") -> TrackedJob:
+        """Start following a job (or return it if already tracked)."""
+        key = (device_id(fw), str(job_id))
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = TrackedJob(str(job_id), target, kind, description)
+                self._devices[key[0]] = fw
+                self.stats["tracked"] += 1
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._run())
+        return job
+
+    def get(self, fw, job_id: str) -> Optional[TrackedJob]:
+        return self._jobs.get((device_id(fw), str(job_id)))
+
+    def jobs(self, target: Optional[str] = None) -> List[TrackedJob]:
+        self._prune()
+        return [job for job in self._jobs.values() if not target or job.target == target]
+
+    async def wait(self, job: TrackedJob, timeout: Optional[float] = None) -> TrackedJob:
+        """Wait up to timeout seconds for the job to finish; returns it either way."""
+        try:
+            # Shield so a cancelled or timed-out wait leaves the event intact for other waiters
+            await asyncio.wait_for(asyncio.shield(job.done.wait()), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        with self._lock:
+            for key, job in list(self._jobs.items()):
+                if job.finished is not None and job.finished < cutoff:
+                    del self._jobs[key]
+
+    async def _poll_device(self, device: str, jobs: List[TrackedJob]):
+        fw = self._devices[device]
+        try:
+            listed = await run_blocking(fw, show_jobs, fw)
+            self.stats["api_calls"] += 1
+        except Exception as e:
+            # Device unreachable or busy - keep the jobs and try again next interval
+            logger.warning(f"Job poll on {device} failed: {str(e)}")
+            listed = None
+        for job in jobs:
+            status = None
+            if listed is not None:
+                status = listed.get(job.id)
+                if status is None:
+                    # Not in `show jobs all` (old or unknown) - ask for it directly
+                    try:
+                        status = await run_blocking(fw, show_job, fw, job.id)
+                        self.stats["api_calls"] += 1
+                    except Exception as e:
+                        # A failed lookup says nothing about the job itself - keep it and let the timeout decide
+                        logger.warning(f"Job {job.id} lookup on {device} failed: {str(e)}")
+            if status is not None:
+                job.status = status
+                if status.get("status") == FINISHED:
+                    job.finish()
+                    self.stats["finished"] += 1
+                    continue
+            if time.time() - job.started > self.timeout:
+                job.finish(f"job {job.id} did not finish within {self.timeout:.0f}s")
+
+    async def _run(self):
+        """Poll every device with outstanding jobs until none are left."""
+        while True:
+            await asyncio.sleep(self.interval)
+            outstanding: Dict[str, List[TrackedJob]] = {}
+            with self._lock:
+                for (device, _), job in self._jobs.items():
+                    if job.finished is None:
+                        outstanding.setdefault(device, []).append(job)
+            if not outstanding:
+                self._poller = None
+                return
+            self.stats["polls"] += 1
+            await asyncio.gather(*(self._poll_device(device, jobs) for device, jobs in outstanding.items()))
+
+    def info(self) -> dict:
+        return {
+            **self.stats,
+            "outstanding": sum(1 for job in self._jobs.values() if job.finished is None),
+            "interval": self.interval,
+        }
+
+
+job_tracker = JobTracker()
@@ -0,0 +1,163 @@
+"""
+Tool manifest: tool schemas generated ahead of time, so the server can list
+tools without importing their modules.
+
+Building a tool's schema from its signature (pydantic) is most of the cost of
+loading the tools. The manifest records, per tool module, a hash of the
+module's source and the name, description and input / output schema of each
+tool it registers. At boot, a module whose hash still matches is registered
+as LazyTool placeholders. The module is imported, and its real tools built,
+on the first call to any of them. Modules without an entry, or whose source
+changed since the manifest was built, are loaded eagerly as before.
+
+Generate it at image build time:
+
+    python -m core.manifest
+
+Defaults shown in the schemas are the ones in effect when the manifest was
+built (e.g. MCP_LIST_PAGE_SIZE); calls always use the running server's.
+"""
+import hashlib
+import importlib
+import json
+import os
+import pkgutil
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from fastmcp.tools import FunctionTool, Tool, ToolResult
+from pydantic import PrivateAttr
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS_DIR = os.path.join(BASE_DIR, "tools")
+# Subdirectories of tools/ holding tool modules
+TOOL_DIRS = ("objects", "op", "security_policies")
+
+# Manifest configuration - env
+MANIFEST_FILE = os.getenv("MCP_TOOL_MANIFEST", os.path.join(TOOLS_DIR, "manifest.json"))
+LAZY_TOOLS = os.getenv("MCP_LAZY_TOOLS", "true").lower() in ("1", "true", "yes")
+
+MANIFEST_VERSION = 1
+# Tool fields kept in the manifest and passed back to LazyTool
+TOOL_FIELDS = ("name", "title", "description", "parameters", "output_schema", "annotations", "meta")
+
+
+def tool_modules() -> Dict[str, str]:
+    """Tool module name -> source file, for every module under TOOL_DIRS."""
+    modules = {}
+    for tool_dir in TOOL_DIRS:
+        tools_path = os.path.join(TOOLS_DIR, tool_dir)
+        if not os.path.isdir(tools_path):
+            continue
+        for module in pkgutil.iter_modules([tools_path]):
+            if not module.ispkg:
+                modules[f"tools.{tool_dir}.{module.name}"] = os.path.join(tools_path, f"{module.name}.py")
+    return modules
+
+
+def source_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+class ToolCollector:
+    """
+    Stand-in for the server in register(server, runtime): builds each tool the
+    way @server.tool() does, but keeps it instead of adding it to a server.
+    """
+
+    def __init__(self):
+        self.tools: Dict[str, FunctionTool] = {}
+
+    def tool(self, *args, **kwargs):
+        def decorator(fn):
+            tool = FunctionTool.from_function(fn, **kwargs)
+            self.tools[tool.name] = tool
+            return fn
+        return decorator
+
+
+class LazyTool(Tool):
+    """Placeholder with a tool's manifest schema; runs the real tool, loading its module on first call."""
+
+    module: str
+    _loader: Optional[Callable[[str], Dict[str, FunctionTool]]] = PrivateAttr(default=None)
+
+    async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+        tool = self._loader(self.module).get(self.name)
+        if tool is None:
+            raise RuntimeError(f"{self.module} no longer registers tool '{self.name}', rebuild the tool manifest")
+        return await tool.run(arguments)
+
+
+def lazy_tool(entry: dict, module: str, loader: Callable[[str], Dict[str, FunctionTool]]) -> LazyTool:
+    tool = LazyTool(module=module, **{field: entry.get(field) for field in TOOL_FIELDS})
+    tool._loader = loader
+    return tool
+
+
+def load_manifest(path: str = MANIFEST_FILE) -> Optional[dict]:
+    """The manifest at path, or None if it is missing or from another manifest version."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+class ModuleLoader:
+    """Imports tool modules on demand and keeps the tools each one registers."""
+
+    def __init__(self, runtime):
+        self.runtime = runtime
+        self._modules: Dict[str, Dict[str, FunctionTool]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> int:
+        return len(self._modules)
+
+    def __call__(self, module_name: str) -> Dict[str, FunctionTool]:
+        tools = self._modules.get(module_name)
+        if tools is not None:
+            return tools
+        with self._lock:
+            if module_name not in self._modules:
+                collector = ToolCollector()
+                importlib.import_module(module_name).register(collector, self.runtime)
+                self._modules[module_name] = collector.tools
+                self.runtime.logger.info(f"Imported tool module {module_name}")
+        return self._modules[module_name]
+
+
+def build_manifest(runtime) -> dict:
+    """Import every tool module and record its tools' schemas."""
+    loader = ModuleLoader(runtime)
+    modules = {}
+    for module_name, path in sorted(tool_modules().items()):
+        tools = loader(module_name)
+        modules[module_name] = {
+            "hash": source_hash(path),
+            "tools": [
+                tool.model_dump(mode="json", include=set(TOOL_FIELDS)) for tool in tools.values()
+            ],
+        }
+    return {"version": MANIFEST_VERSION, "modules": modules}
+
+
+def write_manifest(runtime, path: str = MANIFEST_FILE) -> dict:
+    manifest = build_manifest(runtime)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+if __name__ == "__main__":
+    from core.runtime import get_runtime
+
+    manifest = write_manifest(get_runtime())
+    tools = sum(len(module["tools"]) for module in manifest["modules"].values())
+    print(f"Wrote {tools} tools from {len(manifest['modules'])} modules to {MANIFEST_FILE}")
@@ -0,0 +1,261 @@
+"""
+Prometheus metrics for tool calls and PAN-OS API calls.
+
+Two histograms are recorded on the hot path, each a bisect and a few counter
+increments under a lock:
+- tool call latency per tool name and outcome (FastMCP middleware)
+- XML API call latency per call type (config get/set/edit/delete/multi-config,
+  op, commit, ...), with request and response sizes, recorded around the xapi
+  client's request function
+
+Everything else (cache, executor, job tracker, connection pools) is already
+counted by its module and is only read when /metrics is scraped. The text
+exposition format is rendered here, so no prometheus_client is needed.
+"""
+import bisect
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from fastmcp.server.middleware import Middleware
+
+# Metrics configuration - env
+METRICS_ENABLED = os.getenv("MCP_METRICS", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}    # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(snapshot.items()):
+            base = _labels(zip(self.labels, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_labels(zip(self.labels, labels), le=le)} {cumulative}")
+            lines.append(f"{self.name}_sum{base} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = dict(self._series)
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_labels(zip(self.labels, labels))} {_value(value)}")
+        return lines
+
+
+def _value(value) -> str:
+    """Sample value: integers exactly (":g" would round counters to 6 digits), floats in full."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable[Tuple[str, str]], **extra) -> str:
+    items = [f'{name}="{_escape(value)}"' for name, value in pairs]
+    items += [f'{name}="{_escape(value)}"' for name, value in extra.items()]
+    return "{" + ",".join(items) + "}" if items else ""
+
+
+tool_seconds = Histogram(
+    "mcp_tool_call_seconds", "MCP tool call latency.", ("tool", "status"), LATENCY_BUCKETS
+)
+api_seconds = Histogram(
+    "panos_api_request_seconds", "PAN-OS XML API request latency.", ("endpoint", "type", "action"), LATENCY_BUCKETS
+)
+api_request_bytes = Histogram(
+    "panos_api_request_bytes", "PAN-OS XML API request payload size.", ("type", "action"), SIZE_BUCKETS
+)
+api_response_bytes = Histogram(
+    "panos_api_response_bytes", "PAN-OS XML API response body size.", ("type", "action"), SIZE_BUCKETS
+)
+api_errors = Counter(
+    "panos_api_request_errors_total", "PAN-OS XML API requests that failed at the HTTP level.", ("endpoint", "type", "action")
+)
+
+
+def call_type(query: dict) -> Tuple[str, str]:
+    """(type, action) label pair of an XML API query, e.g. ("config", "get") or ("op", "")."""
+    kind = query.get("type", "")
+    return kind, query.get("action", "") if kind == "config" else ""
+
+
+def instrument(xapi):
+    """Time every request an xapi client sends (pooled or plain urllib)."""
+    if not METRICS_ENABLED:
+        return xapi
+    send = xapi._PanXapi__api_request
+    host = xapi.hostname if xapi.port in (None, 443) else f"{xapi.hostname}:{xapi.port}"
+
+    def api_request(query: dict):
+        kind, action = call_type(query)
+        started = time.perf_counter()
+        try:
+            response = send(query)
+        except Exception:
+            api_errors.inc(host, kind, action)
+            raise
+        finally:
+            api_seconds.observe(time.perf_counter() - started, host, kind, action)
+        # Values are what gets urlencoded; close enough to the body size without encoding it again
+        api_request_bytes.observe(sum(len(k) + len(str(v)) + 2 for k, v in query.items() if k != "key"), kind, action)
+        if response is False:
+            api_errors.inc(host, kind, action)
+            return response
+        body = getattr(response, "_body", None)
+        size = len(body) if body is not None else response.getheader("Content-Length")
+        if size is not None:
+            api_response_bytes.observe(int(size), kind, action)
+        return response
+
+    xapi._PanXapi__api_request = api_request
+    return xapi
+
+
+class ToolMetricsMiddleware(Middleware):
+    """Record the latency of every tool call by tool name and outcome."""
+
+    async def on_call_tool(self, context, call_next):
+        started = time.perf_counter()
+        status = "exception"
+        try:
+            result = await call_next(context)
+            # Tools report failures as a "✗ ..." message rather than raising
+            content = getattr(result, "content", None) or []
+            text = getattr(content[0], "text", "") if content else ""
+            status = "error" if text.startswith("✗") else "ok"
+            return result
+        finally:
+            tool_seconds.observe(time.perf_counter() - started, context.message.name, status)
+
+
+def _samples(name: str, help: str, samples: Iterable[Tuple[dict, float]], kind: str = "gauge") -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels.items())} {_value(value)}")
+    return lines
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    # Imported here so instrumenting a client never pulls in the executor / cache modules
+    from core.cache import config_cache
+    from core.executor import executor_stats
+    from core.jobs import job_tracker
+    from core.sync import config_sync
+    from core.transport import transport_stats
+
+    lines: List[str] = []
+    for metric in (tool_seconds, api_seconds, api_request_bytes, api_response_bytes, api_errors):
+        lines += metric.render()
+
+    cache = config_cache.info()
+    lines += _samples("mcp_config_cache_lookups_total", "Config cache lookups by result.", (
+        ({"result": result}, cache[result]) for result in ("hits", "misses", "revalidated")
+    ), "counter")
+    lines += _samples("mcp_config_cache_hit_ratio", "Config cache hit ratio since start.", [({}, cache["hit_ratio"])])
+    lines += _samples("mcp_config_cache_entries", "Config cache entries.", [({}, cache["entries"])])
+    lines += _samples("mcp_config_cache_loads_total", "Config loads sent to firewalls.", [({}, cache["loads"])], "counter")
+    lines += _samples("mcp_config_cache_coalesced_total", "Config loads that joined an in-flight load.",
+                    [({}, cache["coalesced"])], "counter")
+    lines += _samples("mcp_config_cache_invalidations_total", "Config cache entries invalidated.",
+                    [({}, cache["invalidations"])], "counter")
+
+    sync = config_sync.info()
+    if sync["enabled"]:
+        lines += _samples("mcp_config_sync_api_calls_total", "API calls made by config sync.", [
+            ({"kind": "log"}, sync["log_requests"]), ({"kind": "fetch"}, sync["fetch_calls"]),
+        ], "counter")
+        lines += _samples("mcp_config_sync_changes_total", "Config log changes seen by config sync.",
+                        [({}, sync["changes"])], "counter")
+        lines += _samples("mcp_config_sync_objects_fetched_total", "Changed objects re-fetched by config sync.",
+                        [({}, sync["objects_fetched"])], "counter")
+        lines += _samples("mcp_config_sync_entries_dropped_total", "Cache entries config sync left to a full reload.",
+                        [({}, sync["entries_dropped"])], "counter")
+        lines += _samples("mcp_config_sync_errors_total", "Failed config sync polls and updates.",
+                        [({}, sync["errors"])], "counter")
+
+    stats = executor_stats()
+    lines += _samples("mcp_executor_queue_depth", "Calls waiting for a firewall slot or a worker thread.",
+                    [({}, stats["queue_depth"])])
+    lines += _samples("mcp_executor_max_queue_depth", "Highest queue depth since start.", [({}, stats["max_queue_depth"])])
+    lines += _samples("mcp_executor_running", "Calls executing on worker threads.", [({}, stats["running"])])
+    lines += _samples("mcp_executor_workers", "Executor worker threads.", [({}, stats["max_workers"])])
+    lines += _samples("mcp_executor_calls_total", "Executor calls by outcome.", [
+        ({"result": "completed"}, stats["completed"]), ({"result": "failed"}, stats["failed"]),
+    ], "counter")
+    lines += _samples("mcp_executor_wait_seconds_total", "Total time calls spent queued.",
+                    [({}, stats["total_wait_seconds"])], "counter")
+    lines += _samples("mcp_executor_firewall_queue_depth", "Queued calls per firewall.", (
+        ({"firewall": key}, device["waiting"] + device["pending"]) for key, device in stats["firewalls"].items()
+    ))
+    lines += _samples("mcp_op_show_calls_total", "Show commands sent to firewalls.",
+                    [({}, stats["op_reads"]["calls"])], "counter")
+    lines += _samples("mcp_op_show_coalesced_total", "Show commands that joined an in-flight call.",
+                    [({}, stats["op_reads"]["coalesced"])], "counter")
+
+    jobs = job_tracker.info()
+    lines += _samples("mcp_jobs_outstanding", "Tracked PAN-OS jobs not finished yet.", [({}, jobs["outstanding"])])
+    lines += _samples("mcp_jobs_tracked_total", "PAN-OS jobs tracked since start.", [({}, jobs["tracked"])], "counter")
+    lines += _samples("mcp_jobs_poll_api_calls_total", "API calls made polling jobs.", [({}, jobs["api_calls"])], "counter")
+
+    pools = transport_stats()
+    for field in ("requests", "connections_opened", "connections_reused", "tls_sessions_resumed", "errors"):
+        lines += _samples(f"panos_http_{field}_total", f"HTTP connection pool {field.replace('_', ' ')}.", (
+            ({"endpoint": endpoint}, pool[field]) for endpoint, pool in pools.items()
+        ), "counter")
+    return "\n".join(lines) + "\n"
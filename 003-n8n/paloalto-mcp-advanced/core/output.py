@@ -0,0 +1,213 @@
+"""
+Structured, size-bounded rendering of operational command output.
+
+Op responses such as `show session all` or `show routing route` can be
+megabytes of XML. shape_output() converts the response to JSON-friendly data
+and returns one page of rows, selected by an XPath relative to <result>.
+Each row can be narrowed to the requested fields, and the page is trimmed to
+a byte budget. A cursor is returned so the client can ask for the next page.
+iter_rows() yields the same rows from an incremental parse, for streaming
+(core.stream) without building the whole tree.
+"""
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional, Tuple
+
+# Output configuration - env
+OP_MAX_ROWS = int(os.getenv("MCP_OP_MAX_ROWS", "100"))
+OP_MAX_BYTES = int(os.getenv("MCP_OP_MAX_BYTES", "20000"))
+
+# Plain child paths ("a/b/entry") can be matched while parsing; anything else needs the full tree
+_SIMPLE_PATH = re.compile(r"[\w.:-]+(?:/[\w.:-]+)*")
+_FEED_BYTES = 64 * 1024
+
+
+def element_to_data(elem: ET.Element):
+    """
+    Convert an element to dicts/lists/strings.
+
+    Attributes become "@name" keys, repeated child tags become lists and
+    leaf text is returned as a string (under "#text" when attributes exist).
+    """
+    attrs = {f"@{key}": value for key, value in elem.attrib.items()}
+    children = list(elem)
+    if not children:
+        text = (elem.text or "").strip()
+        if not attrs:
+            return text or None
+        if text:
+            attrs["#text"] = text
+        return attrs
+    data, repeated = attrs, set()
+    for child in children:
+        value = element_to_data(child)
+        if child.tag not in data:
+            data[child.tag] = value
+            continue
+        if child.tag not in repeated:
+            data[child.tag] = [data[child.tag]]
+            repeated.add(child.tag)
+        data[child.tag].append(value)
+    return data
+
+
+def _pick(data, field: str):
+    for part in field.split("/"):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def select_fields(row, fields: Optional[List[str]]):
+    """Keep only the given fields of a row ("a/b" reaches into nested values)."""
+    if not fields or not isinstance(row, dict):
+        return row
+    return {field: _pick(row, field) for field in fields}
+
+
+def find_rows(root: ET.Element) -> Tuple[Optional[str], List[ET.Element]]:
+    """
+    Locate the largest group of repeated sibling elements under root,
+    e.g. ("entry", [...]) for `show session all`.
+    """
+    best_path, best_rows = None, []
+    stack = [(root, "")]
+    while stack:
+        node, path = stack.pop()
+        groups: dict = {}
+        for child in node:
+            groups.setdefault(child.tag, []).append(child)
+        for tag, elements in groups.items():
+            child_path = f"{path}/{tag}" if path else tag
+            if len(elements) > 1 and len(elements) > len(best_rows):
+                best_path, best_rows = child_path, elements
+            if len(elements) == 1:
+                stack.append((elements[0], child_path))
+    return best_path, best_rows
+
+
+def _size(data) -> int:
+    return len(json.dumps(data, separators=(",", ":")))
+
+
+def shape_output(
+    root: ET.Element,
+    xpath: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    limit: int = OP_MAX_ROWS,
+    offset: int = 0,
+    max_bytes: int = OP_MAX_BYTES,
+) -> dict:
+    """
+    One bounded page of an op response.
+
+    Args:
+        root: Parsed <response> (or <result>) element
+        xpath: Rows to return, relative to <result> (e.g. "entry"); detected
+               automatically when the whole result does not fit in max_bytes
+        fields: Fields to keep per row
+        limit: Max rows per page
+        offset: Row offset, from a previous page's next_cursor
+        max_bytes: Budget for the serialized rows; rows beyond it are left for the next page
+
+    Returns:
+        dict: {"data": ...} for small results, otherwise
+              {"rows_xpath", "total", "offset", "returned", "rows", "next_cursor", "truncated"}
+    """
+    result = _result_of(root)
+
+    if xpath:
+        rows_xpath, rows = xpath, result.findall(xpath)
+    else:
+        rows_xpath, rows = find_rows(result)
+        if not rows:
+            data = select_fields(element_to_data(result), fields)
+            if _size(data) <= max_bytes:
+                return {"data": data, "truncated": False}
+            return {
+                "data": None,
+                "truncated": True,
+                "bytes": _size(data),
+                "hint": "output exceeds max_bytes and has no repeated rows; narrow it with xpath",
+            }
+        # More rows than a page can hold means paging anyway - skip converting everything
+        if not fields and len(rows) <= limit:
+            data = element_to_data(result)
+            if _size(data) <= max_bytes:
+                return {"data": data, "truncated": False}
+
+    offset = max(offset, 0)
+    page = [select_fields(element_to_data(row), fields) for row in rows[offset:offset + max(limit, 1)]]
+    truncated = False
+    # Always return at least one row so paging makes progress
+    while len(page) > 1 and _size(page) > max_bytes:
+        page.pop()
+        truncated = True
+    next_offset = offset + len(page)
+    return {
+        "rows_xpath": rows_xpath,
+        "total": len(rows),
+        "offset": offset,
+        "returned": len(page),
+        "rows": page,
+        "next_cursor": str(next_offset) if next_offset < len(rows) else None,
+        "truncated": truncated,
+    }
+
+
+def _result_of(root: ET.Element) -> ET.Element:
+    result = root.find("result") if root.tag == "response" else root
+    return root if result is None else result
+
+
+def _pull_rows(text: str, path: List[str]) -> Iterator[ET.Element]:
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[ET.Element] = []
+    base = 0
+    for i in range(0, len(text), _FEED_BYTES):
+        parser.feed(text[i:i + _FEED_BYTES])
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                if len(stack) == 2 and stack[0].tag == "response" and elem.tag == "result":
+                    base = 1
+                continue
+            if len(stack) - base - 1 == len(path) and [e.tag for e in stack[base + 1:]] == path:
+                yield elem
+                # Detach the row so rows already sent can be freed
+                stack[-2].remove(elem)
+            stack.pop()
+    parser.close()
+
+
+def iter_rows(text: str, xpath: Optional[str] = None) -> Tuple[Optional[str], Iterator[ET.Element]]:
+    """
+    Rows of an op response as an iterator, like shape_output() selects them.
+
+    A plain child path (e.g. "entry" or "routing-table/entry") is matched
+    while the XML is parsed incrementally, and each row is detached from the
+    tree once the next one is read, so memory does not grow with the row
+    count. Other XPaths, and row detection without an xpath, parse the full
+    response first.
+
+    Returns:
+        (rows xpath, row iterator); (None, empty iterator) if no repeated rows were found
+    """
+    if xpath and _SIMPLE_PATH.fullmatch(xpath.strip("/")):
+        return xpath, _pull_rows(text, xpath.strip("/").split("/"))
+    result = _result_of(ET.fromstring(text))
+    if xpath:
+        return xpath, iter(result.findall(xpath))
+    rows_xpath, rows = find_rows(result)
+    return rows_xpath, iter(rows)
+
+
+def truncate_text(text: str, max_bytes: int = OP_MAX_BYTES) -> str:
+    """Cut raw output to max_bytes with a marker saying how much was dropped."""
+    data = text.encode()
+    if len(data) <= max_bytes:
+        return text
+    return data[:max_bytes].decode(errors="ignore") + f"\n... [truncated {len(data) - max_bytes} bytes]"
@@ -0,0 +1,515 @@
+"""
+Compiled security policy model for offline evaluation of the cached rulebase.
+
+Each SecurityRule is compiled once:
+- zones become sets
+- addresses (objects, nested static groups, literals) become merged
+  interval sets
+- services become per-protocol port interval sets
+- application groups become flat application sets
+
+Rules are bucketed per zone pair. Each bucket keeps prefix indexes of its
+rules' source and destination addresses, so a flow only evaluates the rules
+whose addresses can contain it, in rulebase order.
+
+Values that cannot be resolved locally (fqdn objects, dynamic groups,
+regions, EDLs, unknown names) are tracked per rule so results can say when
+they are uncertain.
+"""
+import asyncio
+import bisect
+import ipaddress
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from core.cache import ConfigCache
+from core.config import (
+    get_address_groups, get_address_objects, get_application_groups, get_security_rules,
+    get_service_groups, get_service_objects,
+)
+from core.ipindex import BITS, PrefixTable
+from core.query import address_range
+
+POLICY_MODEL = "policy-model"
+APPLICATION_DEFAULT = "application-default"
+PROTOCOLS = {"tcp": "tcp", "6": "tcp", "udp": "udp", "17": "udp", "sctp": "sctp", "132": "sctp"}
+# Predefined services on every PAN-OS device
+PREDEFINED_SERVICES = {
+    "service-http": [("tcp", "80,8080")],
+    "service-https": [("tcp", "443")],
+}
+
+
+class IntervalSet:
+    """Sorted, merged integer intervals per IP version (or per protocol for ports)."""
+
+    def __init__(self, spans: Dict[object, List[Tuple[int, int]]] = None):
+        self.spans: Dict[object, List[Tuple[int, int]]] = {}
+        self._starts: Dict[object, List[int]] = {}
+        for key, intervals in (spans or {}).items():
+            merged = []
+            for first, last in sorted(intervals):
+                if merged and first <= merged[-1][1] + 1:
+                    if last > merged[-1][1]:
+                        merged[-1] = (merged[-1][0], last)
+                else:
+                    merged.append((first, last))
+            self.spans[key] = merged
+            self._starts[key] = [first for first, _ in merged]
+
+    def contains(self, key, value: int) -> bool:
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        i = bisect.bisect_right(starts, value) - 1
+        return i >= 0 and value <= self.spans[key][i][1]
+
+    def covers(self, other: "IntervalSet") -> bool:
+        """True if every interval of other lies inside this set."""
+        for key, intervals in other.spans.items():
+            mine = self.spans.get(key)
+            starts = self._starts.get(key)
+            if not mine:
+                if intervals:
+                    return False
+                continue
+            for first, last in intervals:
+                i = bisect.bisect_right(starts, first) - 1
+                if i < 0 or last > mine[i][1]:
+                    return False
+        return True
+
+    def intersects(self, other: "IntervalSet") -> bool:
+        for key, intervals in other.spans.items():
+            mine = self.spans.get(key)
+            if not mine:
+                continue
+            starts = self._starts[key]
+            for first, last in intervals:
+                i = bisect.bisect_right(starts, last) - 1
+                if i >= 0 and mine[i][1] >= first:
+                    return True
+        return False
+
+    def __bool__(self):
+        return any(self.spans.values())
+
+
+class IntervalIndex:
+    """
+    Keyed intervals answering "which intervals intersect [first, last]".
+
+    Intervals are grouped by size class (bit length of their size) and sorted
+    by start within each class. An interval of class c is shorter than 2**c,
+    so only starts in [first - 2**c, last] can intersect the query - one
+    bisected window per class instead of a scan over every interval.
+    """
+
+    def __init__(self, intervals: List[Tuple[object, int, int, int]]):
+        grouped: Dict[Tuple[int, int], list] = {}
+        for key, version, first, last in intervals:
+            grouped.setdefault((version, (last - first + 1).bit_length()), []).append((first, last, key))
+        self._classes = []
+        for (version, size_class), entries in sorted(grouped.items()):
+            entries.sort(key=lambda entry: entry[0])
+            self._classes.append((version, 1 << size_class, [entry[0] for entry in entries], entries))
+
+    def intersecting(self, version: int, first: int, last: int) -> set:
+        keys = set()
+        for class_version, size, starts, entries in self._classes:
+            if class_version != version:
+                continue
+            lo = bisect.bisect_left(starts, first - size + 1)
+            hi = bisect.bisect_right(starts, last)
+            for start, end, key in entries[lo:hi]:
+                if end >= first:
+                    keys.add(key)
+        return keys
+
+
+def parse_ports(value: Optional[str]) -> List[Tuple[int, int]]:
+    """"80,443,8000-8080" to [(80, 80), (443, 443), (8000, 8080)]."""
+    ports = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        ports.append((int(first), int(last or first)))
+    return ports
+
+
+@dataclass
+class RuleSide:
+    """One address side of a rule. spans is None for "any"."""
+    spans: Optional[IntervalSet]
+    negate: bool = False
+    unresolved: List[str] = field(default_factory=list)
+
+    def matches(self, version: int, value: int) -> bool:
+        hit = self.spans is None or self.spans.contains(version, value)
+        return hit != self.negate
+
+    @property
+    def is_any(self) -> bool:
+        return self.spans is None and not self.negate
+
+    @property
+    def exact(self) -> bool:
+        """Fully resolved, non-negated address list usable for index lookups."""
+        return self.spans is not None and not self.negate and not self.unresolved
+
+    def covers(self, other: "RuleSide") -> bool:
+        """True if every address matched by other is matched by this side."""
+        if self.spans is None:
+            return not self.negate
+        if other.spans is None or other.unresolved or self.negate != other.negate:
+            return False
+        if self.negate:
+            # not A contains not B when B contains A
+            return not self.unresolved and other.spans.covers(self.spans)
+        return self.spans.covers(other.spans)
+
+    def intersects(self, other: "RuleSide") -> bool:
+        """False only when the two sides provably share no address."""
+        if not self.exact or not other.exact:
+            return True
+        return self.spans.intersects(other.spans)
+
+
+@dataclass
+class CompiledRule:
+    position: int
+    name: str
+    action: str
+    disabled: bool
+    from_zones: Optional[FrozenSet[str]]      # None = any
+    to_zones: Optional[FrozenSet[str]]
+    source: RuleSide
+    destination: RuleSide
+    applications: Optional[FrozenSet[str]]    # None = any
+    services: Optional[IntervalSet]            # None = any, keyed by protocol
+    application_default: bool = False
+    unresolved: List[str] = field(default_factory=list)
+    unresolved_services: List[str] = field(default_factory=list)
+
+    def matches_zones(self, from_zone: Optional[str], to_zone: Optional[str]) -> bool:
+        return (
+            (self.from_zones is None or from_zone is None or from_zone in self.from_zones)
+            and (self.to_zones is None or to_zone is None or to_zone in self.to_zones)
+        )
+
+    def zone_pairs(self) -> List[Tuple[Optional[str], Optional[str]]]:
+        """(from, to) zone pairs this rule applies to, None standing for any."""
+        return [
+            (from_zone, to_zone)
+            for from_zone in (sorted(self.from_zones) if self.from_zones is not None else [None])
+            for to_zone in (sorted(self.to_zones) if self.to_zones is not None else [None])
+        ]
+
+    def covers(self, other: "CompiledRule") -> bool:
+        """True if every flow other matches is also matched by this rule."""
+        return (
+            _set_covers(self.from_zones, other.from_zones)
+            and _set_covers(self.to_zones, other.to_zones)
+            and _set_covers(self.applications, other.applications)
+            and self._services_cover(other)
+            and self.source.covers(other.source)
+            and self.destination.covers(other.destination)
+        )
+
+    def intersects(self, other: "CompiledRule") -> bool:
+        """False only when no flow can match both rules."""
+        return (
+            _set_intersects(self.from_zones, other.from_zones)
+            and _set_intersects(self.to_zones, other.to_zones)
+            and _set_intersects(self.applications, other.applications)
+            and (
+                self.services is None or other.services is None
+                or bool(self.unresolved_services) or bool(other.unresolved_services)
+                or self.services.intersects(other.services)
+            )
+            and self.source.intersects(other.source)
+            and self.destination.intersects(other.destination)
+        )
+
+    def _services_cover(self, other: "CompiledRule") -> bool:
+        if self.application_default:
+            # Same default ports when the applications are covered too
+            return other.application_default
+        if self.services is None:
+            return True
+        if other.services is None or other.unresolved_services:
+            return False
+        return self.services.covers(other.services)
+
+
+def _set_covers(mine: Optional[FrozenSet[str]], other: Optional[FrozenSet[str]]) -> bool:
+    return mine is None or (other is not None and other <= mine)
+
+
+def _set_intersects(mine: Optional[FrozenSet[str]], other: Optional[FrozenSet[str]]) -> bool:
+    return mine is None or other is None or not mine.isdisjoint(other)
+
+
+class ZonePairRules:
+    """Enabled rules for one zone pair, with source/destination prefix indexes."""
+
+    def __init__(self, rules: List[CompiledRule]):
+        self.rules = rules
+        self._indexes = []
+        for side in ("source", "destination"):
+            table, always = PrefixTable(), set()
+            for i, rule in enumerate(rules):
+                rule_side = getattr(rule, side)
+                # any / negated / partly unresolved sides can't be ruled out by address
+                if rule_side.spans is None or rule_side.negate or rule_side.unresolved:
+                    always.add(i)
+                    continue
+                for version, intervals in rule_side.spans.spans.items():
+                    for first, last in intervals:
+                        table.insert(i, (version, first, last))
+            self._indexes.append((table, always))
+        self._overlap_indexes = None
+
+    def candidates(self, source: Tuple[int, int], destination: Tuple[int, int]) -> List[CompiledRule]:
+        """Rules whose source and destination may contain the (version, address) pair, in order."""
+        found = None
+        for (table, always), (version, value) in zip(self._indexes, (source, destination)):
+            hits = table.covering(version, value, BITS[version]) | always
+            found = hits if found is None else found & hits
+        return [self.rules[i] for i in sorted(found)]
+
+    def covering_candidates(self, rule: CompiledRule) -> set:
+        """Positions of rules whose addresses may cover rule's addresses on both sides."""
+        found = None
+        for (table, always), side in zip(self._indexes, (rule.source, rule.destination)):
+            if side.exact and side.spans:
+                # A covering rule contains the first address of rule's side
+                version, intervals = next((v, i) for v, i in side.spans.spans.items() if i)
+                hits = table.covering(version, intervals[0][0], BITS[version]) | always
+            else:
+                # any / negated / unresolved sides are only covered by any or negated sides
+                hits = always
+            found = hits if found is None else found & hits
+        return {self.rules[i].position for i in found}
+
+    def overlapping_candidates(self, rule: CompiledRule) -> set:
+        """Positions of rules whose addresses may intersect rule's addresses on both sides."""
+        if self._overlap_indexes is None:
+            indexes = []
+            for side, (_, always) in zip(("source", "destination"), self._indexes):
+                intervals = [
+                    (i, version, first, last)
+                    for i, r in enumerate(self.rules) if i not in always
+                    for version, spans in getattr(r, side).spans.spans.items()
+                    for first, last in spans
+                ]
+                indexes.append(IntervalIndex(intervals))
+            self._overlap_indexes = indexes
+        found = None
+        for (_, always), index, side in zip(self._indexes, self._overlap_indexes, (rule.source, rule.destination)):
+            if side.exact:
+                hits = set(always)
+                for version, spans in side.spans.spans.items():
+                    for first, last in spans:
+                        hits |= index.intersecting(version, first, last)
+            else:
+                hits = set(range(len(self.rules)))
+            found = hits if found is None else found & hits
+        return {self.rules[i].position for i in found}
+
+
+def _zones(values) -> Optional[FrozenSet[str]]:
+    values = list(values or [])
+    return None if not values or "any" in values else frozenset(values)
+
+
+class PolicyModel:
+    def __init__(self, addresses: list, groups: list, services: list, service_groups: list,
+                 app_groups: list, rules: list):
+        self._address_spans = {addr.name: address_range(addr.type, addr.value) for addr in addresses}
+        self._group_members = {group.name: list(group.static_value or []) for group in groups}
+        self._dynamic_groups = {group.name for group in groups if group.dynamic_value}
+        self._services = {}
+        for service in services:
+            protocol = PROTOCOLS.get((service.protocol or "tcp").lower(), service.protocol)
+            self._services[service.name] = [(protocol, service.destination_port)]
+        self._services.update({name: ports for name, ports in PREDEFINED_SERVICES.items() if name not in self._services})
+        self._service_groups = {group.name: list(group.value or []) for group in service_groups}
+        self._app_groups = {group.name: list(group.value or []) for group in app_groups}
+        self.rules = [self._compile(position, rule) for position, rule in enumerate(rules)]
+        self._buckets: Dict[Tuple[Optional[str], Optional[str]], ZonePairRules] = {}
+        self._lock = threading.Lock()
+
+    # Resolution
+
+    def _resolve_addresses(self, entries) -> Tuple[Optional[IntervalSet], List[str]]:
+        entries = list(entries or [])
+        if not entries or "any" in entries:
+            return None, []
+        spans: Dict[int, list] = {}
+        unresolved = []
+
+        def add(entry: str, seen: frozenset):
+            if entry in self._group_members and entry not in seen:
+                if entry in self._dynamic_groups:
+                    unresolved.append(entry)
+                for member in self._group_members[entry]:
+                    add(member, seen | {entry})
+                return
+            span = self._address_spans.get(entry) if entry in self._address_spans else (
+                address_range("ip-range" if "-" in entry else "ip-netmask", entry)
+            )
+            if span is None:
+                unresolved.append(entry)
+                return
+            spans.setdefault(span[0], []).append((span[1], span[2]))
+
+        for entry in entries:
+            add(entry, frozenset())
+        return IntervalSet(spans), unresolved
+
+    def _resolve_services(self, entries) -> Tuple[Optional[IntervalSet], bool, List[str]]:
+        entries = list(entries or [])
+        if not entries or "any" in entries:
+            return None, False, []
+        if APPLICATION_DEFAULT in entries:
+            return None, True, []
+        ports: Dict[str, list] = {}
+        unresolved = []
+
+        def add(entry: str, seen: frozenset):
+            if entry in self._service_groups and entry not in seen:
+                for member in self._service_groups[entry]:
+                    add(member, seen | {entry})
+            elif entry in self._services:
+                for protocol, value in self._services[entry]:
+                    ports.setdefault(protocol, []).extend(parse_ports(value))
+            else:
+                unresolved.append(entry)
+
+        for entry in entries:
+            add(entry, frozenset())
+        return IntervalSet(ports), False, unresolved
+
+    def _resolve_applications(self, entries) -> Optional[FrozenSet[str]]:
+        entries = list(entries or [])
+        if not entries or "any" in entries:
+            return None
+        apps = set()
+
+        def add(entry: str, seen: frozenset):
+            if entry in self._app_groups and entry not in seen:
+                for member in self._app_groups[entry]:
+                    add(member, seen | {entry})
+            else:
+                apps.add(entry)
+
+        for entry in entries:
+            add(entry, frozenset())
+        return frozenset(apps)
+
+    def _compile(self, position: int, rule) -> CompiledRule:
+        source, source_unresolved = self._resolve_addresses(rule.source)
+        destination, destination_unresolved = self._resolve_addresses(rule.destination)
+        services, application_default, service_unresolved = self._resolve_services(rule.service)
+        return CompiledRule(
+            position=position,
+            name=rule.name,
+            action=rule.action or "allow",
+            disabled=bool(rule.disabled),
+            from_zones=_zones(rule.fromzone),
+            to_zones=_zones(rule.tozone),
+            source=RuleSide(source, bool(rule.negate_source), source_unresolved),
+            destination=RuleSide(destination, bool(rule.negate_destination), destination_unresolved),
+            applications=self._resolve_applications(rule.application),
+            services=services,
+            application_default=application_default,
+            unresolved=source_unresolved + destination_unresolved + service_unresolved,
+            unresolved_services=service_unresolved,
+        )
+
+    # Matching
+
+    def zone_pair_rules(self, from_zone: Optional[str], to_zone: Optional[str]) -> ZonePairRules:
+        """Enabled rules that apply to a zone pair, in rulebase order (built once per pair)."""
+        key = (from_zone, to_zone)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = ZonePairRules([r for r in self.rules if not r.disabled and r.matches_zones(from_zone, to_zone)])
+            with self._lock:
+                self._buckets[key] = bucket
+        return bucket
+
+    def match(self, flow: dict) -> dict:
+        """
+        First rule matching a flow.
+
+        Args:
+            flow: {"source", "destination", "source_zone", "destination_zone",
+                   "protocol", "port", "application"}; zones, protocol, port and
+                   application are optional and ignored when missing
+
+        Returns:
+            dict: {"rule", "action", "uncertain": [rule names skipped because of unresolved values]}
+        """
+        source = ipaddress.ip_address(str(flow["source"]).strip())
+        destination = ipaddress.ip_address(str(flow["destination"]).strip())
+        from_zone = flow.get("source_zone") or None
+        to_zone = flow.get("destination_zone") or None
+        protocol = PROTOCOLS.get(str(flow.get("protocol") or "").lower(), flow.get("protocol") or None)
+        port = int(flow["port"]) if flow.get("port") not in (None, "") else None
+        application = flow.get("application") or None
+        src_version, src_value = source.version, int(source)
+        dst_version, dst_value = destination.version, int(destination)
+
+        uncertain = []
+        bucket = self.zone_pair_rules(from_zone, to_zone)
+        for rule in bucket.candidates((src_version, src_value), (dst_version, dst_value)):
+            if application and rule.applications is not None and application not in rule.applications:
+                continue
+            if rule.services is not None and protocol and port is not None:
+                if not rule.services.contains(protocol, port):
+                    if rule.unresolved:
+                        uncertain.append(rule.name)
+                    continue
+            if not rule.source.matches(src_version, src_value) or not rule.destination.matches(dst_version, dst_value):
+                # Unresolved entries might have matched on the device
+                if rule.source.unresolved or rule.destination.unresolved:
+                    uncertain.append(rule.name)
+                continue
+            return {"rule": rule.name, "action": rule.action, "uncertain": uncertain}
+
+        # Predefined default rules at the end of every rulebase
+        if from_zone is not None and from_zone == to_zone:
+            return {"rule": "intrazone-default", "action": "allow", "uncertain": uncertain}
+        return {"rule": "interzone-default", "action": "deny", "uncertain": uncertain}
+
+
+_models: dict = {}
+_lock = threading.Lock()
+
+
+async def get_policy_model(fw, refresh: bool = False) -> PolicyModel:
+    """PolicyModel for fw's cached config, recompiled when any cached list changed."""
+    sources = (
+        await get_address_objects(fw, refresh=refresh),
+        await get_address_groups(fw, refresh=refresh),
+        await get_service_objects(fw, refresh=refresh),
+        await get_service_groups(fw, refresh=refresh),
+        await get_application_groups(fw, refresh=refresh),
+        await get_security_rules(fw, refresh=refresh),
+    )
+    key = ConfigCache.key(fw, POLICY_MODEL)
+    ids = tuple(id(source) for source in sources)
+    entry = _models.get(key)
+    if entry is not None and entry[0] == ids:
+        return entry[1]
+    # CPU-bound, keep it off the event loop
+    model = await asyncio.to_thread(PolicyModel, *sources)
+    with _lock:
+        # Holding the source lists keeps their ids from being reused while cached
+        _models[key] = (ids, model, sources)
+    return model
@@ -0,0 +1,96 @@
+"""
+Filtering and pagination of cached config objects for the list tools.
+
+Filters run against the cached object list, so paging through a large
+rulebase costs no extra API calls. Cursors are plain offsets into the
+filtered result.
+"""
+import fnmatch
+import ipaddress
+import os
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Query configuration - env
+LIST_PAGE_SIZE = int(os.getenv("MCP_LIST_PAGE_SIZE", "100"))
+
+
+def match_name(name: str, pattern: Optional[str]) -> bool:
+    """Case-insensitive glob match, e.g. "web-*"."""
+    return not pattern or fnmatch.fnmatchcase((name or "").lower(), pattern.lower())
+
+
+def parse_network(value: str):
+    """IP or CIDR string to an ip_network (host bits allowed)."""
+    return ipaddress.ip_network(value.strip(), strict=False)
+
+
+def network_span(value: str) -> Tuple[int, int, int]:
+    """(ip version, first, last) of an IP or CIDR string."""
+    network = parse_network(value)
+    return network.version, int(network.network_address), int(network.broadcast_address)
+
+
+@lru_cache(maxsize=262144)
+def address_range(addr_type: Optional[str], value: Optional[str]) -> Optional[Tuple[int, int, int]]:
+    """
+    (ip version, first, last) covered by an address object value, or None
+    for values without a fixed range (fqdn, ip-wildcard) or invalid values.
+    Memoized, since filters re-evaluate the same cached values on every call.
+    """
+    if not value:
+        return None
+    try:
+        if addr_type in (None, "ip-netmask"):
+            return network_span(value)
+        if addr_type == "ip-range":
+            first, last = (ipaddress.ip_address(part.strip()) for part in value.split("-", 1))
+            if first.version != last.version:
+                return None
+            return first.version, int(first), int(last)
+    except ValueError:
+        return None
+    return None
+
+
+def covers(span: Optional[Tuple[int, int, int]], query: Tuple[int, int, int]) -> bool:
+    """True if the (version, first, last) span contains the whole query span."""
+    return span is not None and span[0] == query[0] and span[1] <= query[1] and query[2] <= span[2]
+
+
+def has_value(values, wanted: Optional[str]) -> bool:
+    """Case-insensitive membership test on a list attribute (zones, tags, ...)."""
+    if not wanted:
+        return True
+    wanted = wanted.lower()
+    return any(str(v).lower() == wanted for v in values or [])
+
+
+def parse_cursor(cursor: Optional[str]) -> int:
+    if cursor in (None, ""):
+        return 0
+    if not str(cursor).isdigit():
+        raise ValueError(f"invalid cursor '{cursor}'")
+    return int(cursor)
+
+
+def paginate(items: list, cursor: Optional[str], limit: int = LIST_PAGE_SIZE) -> Tuple[list, int, Optional[str]]:
+    """
+    One page of items.
+
+    Returns:
+        (page, start offset, next cursor or None)
+    """
+    start = parse_cursor(cursor)
+    end = start + max(limit, 1)
+    page = items[start:end]
+    return page, start, (str(end) if end < len(items) else None)
+
+
+def page_footer(start: int, page: List, matched: int, next_cursor: Optional[str]) -> str:
+    if not page:
+        return f"No results at offset {start} ({matched} matching)."
+    footer = f"Showing {start + 1}-{start + len(page)} of {matched} matching."
+    if next_cursor:
+        footer += f" Next page: cursor={next_cursor}"
+    return footer
@@ -0,0 +1,221 @@
+"""
+Registry of named PAN-OS targets: firewalls, Panorama, device groups and vsys.
+
+Targets are read from the JSON file named by MCP_TARGETS_FILE:
+
+    {
+      "default": "edge-1",
+      "targets": {
+        "edge-1":    {"type": "firewall", "hostname": "10.0.0.1", "api_key_env": "EDGE1_KEY", "tags": ["edge"],
+                      "commit_admin": "automation"},
+        "edge-1-v2": {"type": "vsys", "firewall": "edge-1", "vsys": "vsys2"},
+        "pano":      {"type": "panorama", "hostname": "10.0.0.10", "api_key_env": "PANO_KEY"},
+        "branch":    {"type": "device-group", "panorama": "pano", "device_group": "Branch"},
+        "branch-07": {"type": "firewall", "panorama": "pano", "serial": "007951000012345", "tags": ["branch"]},
+        "edge-1-snap": {"type": "firewall", "snapshot": "snapshots/edge-1-running.xml.gz"}
+      }
+    }
+
+Without a file, FIREWALL_IP / FIREWALL_API_KEY form a single target named
+"default" (or MCP_SNAPSHOT_FILE does, for an offline server). Device objects
+are created on first use and cached per target. Firewall and Panorama targets
+with a "snapshot" file are offline and read-only (see core.snapshot).
+"""
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from panos.panorama import DeviceGroup
+
+from core.device import Firewall, Panorama
+from core.snapshot import load_snapshot
+
+logger = logging.getLogger("palo_mcp")
+
+# Registry configuration - env
+TARGETS_FILE = os.getenv("MCP_TARGETS_FILE", "")
+COMMIT_ADMIN = os.getenv("MCP_COMMIT_ADMIN", "")
+
+DEFAULT_TARGET = "default"
+TARGET_TYPES = ("firewall", "panorama", "device-group", "vsys")
+
+
+def _credentials(name: str, spec: dict) -> dict:
+    """api_key / api_username / api_password kwargs for a device target."""
+    creds = {}
+    api_key = spec.get("api_key") or (os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None)
+    if api_key:
+        creds["api_key"] = api_key
+    username = spec.get("username")
+    password = spec.get("password") or (os.getenv(spec["password_env"]) if spec.get("password_env") else None)
+    if username and password:
+        creds["api_username"] = username
+        creds["api_password"] = password
+    if not creds:
+        raise ValueError(f"Target '{name}' has no credentials (api_key, api_key_env or username/password)")
+    return creds
+
+
+class TargetRegistry:
+    def __init__(self, targets: Dict[str, dict], default: Optional[str] = None):
+        self._specs = {name: dict(spec) for name, spec in targets.items()}
+        self.default = default or (DEFAULT_TARGET if DEFAULT_TARGET in targets else next(iter(targets), None))
+        self._devices: dict = {}
+        self._lock = threading.RLock()
+        self._validate()
+
+    @classmethod
+    def from_file(cls, path: str) -> "TargetRegistry":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("targets") or {}, data.get("default"))
+
+    def _validate(self):
+        if not self._specs:
+            raise ValueError("No targets configured")
+        if self.default not in self._specs:
+            raise ValueError(f"Default target '{self.default}' is not defined")
+        for spec in self._specs.values():
+            spec.setdefault("type", "firewall")
+        for name, spec in self._specs.items():
+            kind = spec["type"]
+            if kind not in TARGET_TYPES:
+                raise ValueError(f"Target '{name}' has unknown type '{kind}' (expected one of {', '.join(TARGET_TYPES)})")
+            for ref in ("panorama", "firewall"):
+                if ref in spec and self._specs.get(spec[ref], {}).get("type") != ref:
+                    raise ValueError(f"Target '{name}' references unknown {ref} target '{spec[ref]}'")
+            if kind == "device-group" and not (spec.get("panorama") and spec.get("device_group")):
+                raise ValueError(f"Target '{name}' needs panorama and device_group")
+            if kind == "vsys" and not (spec.get("firewall") and spec.get("vsys")):
+                raise ValueError(f"Target '{name}' needs firewall and vsys")
+            if kind == "firewall" and spec.get("panorama") and not spec.get("serial"):
+                raise ValueError(f"Target '{name}' needs a serial to be reached through Panorama")
+            if spec.get("snapshot") and kind not in ("firewall", "panorama"):
+                raise ValueError(f"Target '{name}' can't have a snapshot, only firewall and panorama targets can")
+            if kind == "firewall" and spec.get("panorama") and spec.get("snapshot"):
+                raise ValueError(f"Target '{name}' needs either a snapshot or a panorama, not both")
+            if kind in ("firewall", "panorama") and not spec.get("panorama") and not spec.get("snapshot") \
+                    and not spec.get("hostname"):
+                raise ValueError(f"Target '{name}' needs a hostname or a snapshot")
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def spec(self, name: Optional[str] = None) -> dict:
+        name = name or self.default
+        if name not in self._specs:
+            raise ValueError(f"Unknown target '{name}' (available: {', '.join(self._specs)})")
+        return self._specs[name]
+
+    def select(self, names: Optional[Iterable[str]] = None, tags: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Target names matching an explicit list and/or tags (a target matches if it has any of the tags).
+        With neither, every firewall target is returned.
+        """
+        if names:
+            selected = list(dict.fromkeys(names))
+            for name in selected:
+                self.spec(name)  # raises on unknown names
+        elif tags:
+            selected = list(self._specs)
+        else:
+            selected = [name for name, spec in self._specs.items() if spec["type"] in ("firewall", "vsys")]
+        if tags:
+            wanted = set(tags)
+            selected = [name for name in selected if wanted & set(self._specs[name].get("tags") or [])]
+        return selected
+
+    def get(self, name: Optional[str] = None):
+        """Device object for a target (Firewall, Panorama or DeviceGroup), created on first use."""
+        name = name or self.default
+        spec = self.spec(name)
+        with self._lock:
+            device = self._devices.get(name)
+            if device is None:
+                device = self._devices[name] = self._build(name, spec)
+                logger.info(f"Initialized target '{name}' ({spec['type']})")
+            return device
+
+    def _build(self, name: str, spec: dict):
+        kind = spec["type"]
+        if kind == "device-group":
+            return self.get(spec["panorama"]).add(DeviceGroup(spec["device_group"]))
+        if kind == "vsys":
+            # Own Firewall object per vsys; the connection pool is still shared per host
+            return self._build(name, {**self._specs[spec["firewall"]], "vsys": spec["vsys"]})
+        if spec.get("snapshot"):
+            # Offline: API calls are answered from the snapshot, the hostname only names it
+            snapshot = load_snapshot(spec["snapshot"])
+            kwargs = {"api_key": "snapshot", "snapshot": snapshot}
+            if kind == "firewall" and spec.get("vsys"):
+                kwargs["vsys"] = spec["vsys"]
+            return (Panorama if kind == "panorama" else Firewall)(snapshot.name, **kwargs)
+        if spec.get("panorama"):
+            fw = Firewall(serial=spec["serial"], vsys=spec.get("vsys"))
+            return self.get(spec["panorama"]).add(fw)
+        device_class = Panorama if kind == "panorama" else Firewall
+        kwargs = {"use_http": bool(spec.get("use_http")), **_credentials(name, spec)}
+        if spec.get("port"):
+            kwargs["port"] = int(spec["port"])
+        if kind == "firewall" and spec.get("vsys"):
+            kwargs["vsys"] = spec["vsys"]
+        return device_class(spec["hostname"], **kwargs)
+
+    def commit_admin(self, name: Optional[str] = None) -> Optional[str]:
+        """
+        Admin whose changes a partial commit on the target includes: "commit_admin" or
+        "username" of the target or of the device it lives on, else MCP_COMMIT_ADMIN.
+        """
+        spec = self.spec(name)
+        while True:
+            admin = spec.get("commit_admin") or spec.get("username")
+            if admin:
+                return admin
+            parent = spec.get("firewall") or spec.get("panorama")
+            if not parent:
+                return COMMIT_ADMIN or None
+            spec = self._specs[parent]
+
+    def describe(self) -> List[dict]:
+        """Target definitions without credentials, plus whether each has been initialized."""
+        rows = []
+        for name, spec in self._specs.items():
+            if spec["type"] == "device-group":
+                location = f"{spec['panorama']} / device-group {spec['device_group']}"
+            elif spec["type"] == "vsys":
+                location = f"{spec['firewall']} / {spec['vsys']}"
+            elif spec.get("panorama"):
+                location = f"{spec['panorama']} / serial {spec['serial']}"
+            elif spec.get("snapshot"):
+                location = f"snapshot {spec['snapshot']} (offline)"
+                location += f" / {spec['vsys']}" if spec.get("vsys") else ""
+            else:
+                location = spec["hostname"] + (f":{spec['port']}" if spec.get("port") else "")
+                location += f" / {spec['vsys']}" if spec.get("vsys") else ""
+            rows.append({
+                "name": name,
+                "type": spec["type"],
+                "location": location,
+                "tags": list(spec.get("tags") or []),
+                "default": name == self.default,
+                "initialized": name in self._devices,
+            })
+        return rows
+
+
+def load_registry(path: str, hostname: str, api_key: str, snapshot_file: str = "") -> TargetRegistry:
+    """
+    Registry from a targets file, or a single "default" target: the snapshot_file
+    (offline) if set, else the firewall from the legacy env vars.
+    """
+    if path:
+        registry = TargetRegistry.from_file(path)
+        logger.info(f"Loaded {len(registry.names())} targets from {path}")
+        return registry
+    if snapshot_file:
+        snapshot = load_snapshot(snapshot_file)
+        logger.info(f"Offline mode: serving read-only tools from snapshot {snapshot.path}")
+        return TargetRegistry({DEFAULT_TARGET: {"type": snapshot.type, "snapshot": snapshot_file}})
+    return TargetRegistry({DEFAULT_TARGET: {"type": "firewall", "hostname": hostname, "api_key": api_key}})
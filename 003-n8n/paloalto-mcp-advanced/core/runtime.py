@@ -0,0 +1,240 @@
+"""
+Process-wide runtime shared by main.py and every tool module.
+
+main.py runs as __main__, so tool modules that imported names from `main`
+loaded it a second time as module `main`. That configured logging twice and
+built a second FastMCP server and target registry (with their own device
+objects) beside the ones __main__ was serving. The state now lives here:
+get_runtime() creates it once per process, and load_tools() hands it to each
+tool module as register(server, runtime).
+
+The runtime also carries the process-wide singletons (config cache and its
+sync, job tracker, change sets) so tools can reach them from one place. The executor
+and HTTP connection pools are module state of core.executor / core.transport,
+which are only ever imported under those names.
+"""
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import urllib3
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from core import metrics, tracing
+from core.cache import config_cache
+from core.changeset import change_sets
+from core.jobs import job_tracker
+from core.manifest import (
+    BASE_DIR, LAZY_TOOLS, MANIFEST_FILE, TOOLS_DIR, ModuleLoader, lazy_tool, load_manifest, source_hash, tool_modules,
+)
+from core.registry import TARGETS_FILE, TargetRegistry, load_registry
+from core.snapshot import SNAPSHOT_FILE
+from core.sync import config_sync
+
+LOG_DIR = os.path.join(BASE_DIR, "logs")
+
+SERVER_NAME = "Palo Alto Firewall Manager"
+
+
+def setup_logging() -> logging.Logger:
+    """The "palo_mcp" logger with console and file handlers, attached only once."""
+    logger = logging.getLogger("palo_mcp")
+    if logger.handlers:
+        return logger
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+
+    # File handler
+    file_handler = logging.FileHandler(os.path.join(LOG_DIR, "mcp_server.log"), encoding="utf-8")
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] [%(name)s] %(message)s"))
+
+    logger.addHandler(console_handler)
+    logger.addHandler(file_handler)
+    return logger
+
+
+def create_server() -> FastMCP:
+    """FastMCP server with the metrics / tracing middleware and the /metrics route."""
+    server = FastMCP(SERVER_NAME)
+
+    # Prometheus metrics - tool latency recorded by middleware, scraped from /metrics
+    if metrics.METRICS_ENABLED:
+        server.add_middleware(metrics.ToolMetricsMiddleware())
+
+        @server.custom_route("/metrics", methods=["GET"], include_in_schema=False)
+        async def metrics_endpoint(request: Request) -> PlainTextResponse:
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    # Per-call tracing (opt-in) - Chrome trace files under MCP_TRACE_DIR
+    if tracing.TRACING_ENABLED:
+        server.add_middleware(tracing.TracingMiddleware())
+    return server
+
+
+class Runtime:
+    """Server, target registry, logger and shared caches of the process."""
+
+    # Runtimes created in this process; anything but 1 means state is duplicated
+    instances = 0
+
+    def __init__(self, server: FastMCP, registry: TargetRegistry, logger: logging.Logger):
+        self.server = server
+        self.registry = registry
+        self.logger = logger
+        self.config_cache = config_cache
+        self.config_sync = config_sync
+        self.job_tracker = job_tracker
+        self.change_sets = change_sets
+        self.created = time.time()
+        self.stats = {
+            "init_seconds": 0.0,
+            "tools_seconds": 0.0,
+            "cold_start_seconds": None,
+            "tool_modules": 0,
+            "lazy_tools": 0,
+            "eager_modules": 0,
+            "tools_loaded": False,
+        }
+        # Imports manifest-registered tool modules on their first call
+        self.modules = ModuleLoader(self)
+        self._tools_lock = threading.Lock()
+        Runtime.instances += 1
+
+    def get_firewall(self, target: Optional[str] = None):
+        """
+        Device object for a registry target (Firewall, Panorama or DeviceGroup).
+        Without a target, the registry's default target is used.
+        """
+        try:
+            return self.registry.get(target)
+        except Exception as e:
+            self.logger.error(f"Failed to connect to target '{target or self.registry.default}': {str(e)}")
+            raise Exception(f"Failed to connect to target '{target or self.registry.default}': {str(e)}")
+
+    def load_tools(self) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Register the tools of every module in tools/ subdirectories (objects, op, security_policies).
+        Each module should have a register(server, runtime) function.
+
+        Modules with an up-to-date entry in the tool manifest are registered from
+        it and imported on their first call; the rest are imported now. Loading
+        twice is a no-op.
+
+        Returns:
+            (registered module names, [(module name, error), ...])
+        """
+        with self._tools_lock:
+            if self.stats["tools_loaded"]:
+                return [], []
+            started = time.perf_counter()
+            if BASE_DIR not in sys.path:
+                sys.path.insert(0, BASE_DIR)
+
+            if not os.path.isdir(TOOLS_DIR):
+                self.logger.error(f"Tools directory not found: {TOOLS_DIR}")
+                return [], []
+
+            manifest = load_manifest() if LAZY_TOOLS else None
+            if LAZY_TOOLS and manifest is None:
+                self.logger.warning(f"No tool manifest at {MANIFEST_FILE}, importing all tools (python -m core.manifest)")
+            entries = manifest["modules"] if manifest else {}
+
+            registered = []
+            errors = []
+            for module_name, path in tool_modules().items():
+                try:
+                    entry = entries.get(module_name)
+                    if entry is not None and entry["hash"] == source_hash(path):
+                        for tool in entry["tools"]:
+                            self.server.add_tool(lazy_tool(tool, module_name, self.modules))
+                            self.stats["lazy_tools"] += 1
+                    else:
+                        if manifest is not None:
+                            self.logger.info(f"  {module_name} has no up-to-date entry in the tool manifest, importing it")
+                        module = importlib.import_module(module_name)
+                        if not hasattr(module, "register"):
+                            continue
+                        module.register(self.server, self)
+                        self.stats["eager_modules"] += 1
+                    registered.append(module_name)
+                except Exception as e:
+                    errors.append((module_name, str(e)))
+
+            self.stats["tools_loaded"] = True
+            self.stats["tool_modules"] = len(registered)
+            self.stats["tools_seconds"] = time.perf_counter() - started
+            self.stats["cold_start_seconds"] = process_age()
+
+        # Log summary
+        self.logger.info(
+            f"Loaded {len(registered)} MCP tool modules in {self.stats['tools_seconds']:.3f}s "
+            f"({self.stats['lazy_tools']} tools from the manifest, {self.stats['eager_modules']} modules imported):"
+        )
+        for m in registered:
+            self.logger.info(f"  ✓ {m}")
+
+        if errors:
+            self.logger.error(f"Failed to load {len(errors)} modules:")
+            for mod, err in errors:
+                self.logger.error(f"  ✗ {mod} → {err}")
+        if self.stats["cold_start_seconds"] is not None:
+            self.logger.info(f"Cold start: {self.stats['cold_start_seconds']:.3f}s from process start to tools registered")
+        return registered, errors
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process started (from /proc, so Linux only), or None."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the "(comm)" one; starttime is field 22 of the full line
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+_runtime: Optional[Runtime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> Runtime:
+    """The process's runtime, created on first call."""
+    global _runtime
+    if _runtime is not None:
+        return _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            started = time.perf_counter()
+            logger = setup_logging()
+
+            # Disable CERT warnings
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+            # Firewall Configuration - env
+            firewall_ip = os.getenv("FIREWALL_IP", "1.2.3.4")
+            api_key = os.getenv("FIREWALL_API_KEY", "api-key")
+            if not api_key:
+                raise ValueError("FIREWALL_API_KEY environment variable is required")
+
+            # Target registry - MCP_TARGETS_FILE, or the single firewall above (or MCP_SNAPSHOT_FILE) as "default"
+            registry = load_registry(TARGETS_FILE, firewall_ip, api_key, SNAPSHOT_FILE)
+            runtime = Runtime(create_server(), registry, logger)
+            runtime.stats["init_seconds"] = time.perf_counter() - started
+            _runtime = runtime
+    return _runtime
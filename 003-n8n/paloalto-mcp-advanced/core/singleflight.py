@@ -0,0 +1,41 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several callers ask for the same thing at the same time (parallel n8n
+branches listing the same rulebase, for example), only the first one runs
+the call and the rest await its result. Nothing is cached: once the call
+finishes, the next caller starts a new one.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable]):
+        """
+        Result of func(), shared with every concurrent caller using the same key.
+        Exceptions are shared the same way.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["calls"] += 1
+            future = self._calls[key] = asyncio.ensure_future(func())
+            future.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one cancelled caller doesn't cancel the call for the others
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # mark retrieved; callers already got it
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
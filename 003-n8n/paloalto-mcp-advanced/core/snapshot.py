@@ -0,0 +1,222 @@
+"""
+Config snapshots: a target's full configuration saved to disk, and offline
+targets that answer read-only API calls from a snapshot.
+
+export_snapshot() pulls the running (or candidate) config and `show system
+info` in two API calls and writes them gzip-compressed:
+
+    <snapshot version="1" target="edge-1" type="firewall" source="running" created="..." hostname="10.0.0.1">
+      <system>...</system>
+      <config>...</config>
+    </snapshot>
+
+A target with "snapshot": "<file>" in the targets file (or the single default
+target when MCP_SNAPSHOT_FILE is set) is offline. Its xapi clients answer
+config get/show and `show system info` from the snapshot instead of sending
+them, so list, lookup and analysis tools work unchanged and the firewall's
+management plane sees no requests. Everything else (config changes, commits,
+other op commands) fails with an error naming the snapshot.
+
+Snapshot files are parsed once per process, however many targets (e.g. vsys)
+use them, and the parsed config stays in memory. The last
+MCP_SNAPSHOT_CACHE_SIZE distinct responses are kept serialized.
+"""
+import gzip
+import logging
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+from typing import Dict, Optional
+from xml.sax.saxutils import quoteattr
+
+from panos.panorama import Panorama
+
+logger = logging.getLogger("palo_mcp")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Snapshot configuration - env
+SNAPSHOT_DIR = os.getenv("MCP_SNAPSHOT_DIR", os.path.join(BASE_DIR, "snapshots"))
+SNAPSHOT_FILE = os.getenv("MCP_SNAPSHOT_FILE", "")
+SNAPSHOT_CACHE_SIZE = int(os.getenv("MCP_SNAPSHOT_CACHE_SIZE", "128"))
+
+SNAPSHOT_VERSION = "1"
+SOURCES = ("running", "candidate")
+SYSTEM_INFO_CMD = "<show><system><info></info></system></show>"
+
+
+class _Response:
+    """Minimal urllib-style response for pan-python's response parsing."""
+
+    headers = {"content-type": "application/xml; charset=utf-8"}
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def read(self) -> bytes:
+        return self._body
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+
+def _error(message: str) -> bytes:
+    return f'<response status="error"><msg><line>{message}</line></msg></response>'.encode()
+
+
+class Snapshot:
+    def __init__(self, path: str, root: ET.Element):
+        if root.tag != "snapshot" or root.find("config") is None:
+            raise ValueError(f"{path} is not a config snapshot")
+        self.path = path
+        self.name = os.path.basename(path)
+        self.target = root.get("target")
+        self.type = root.get("type", "firewall")
+        self.source = root.get("source")
+        self.created = root.get("created")
+        self.hostname = root.get("hostname")
+        self.config = root.find("config")
+        self.system = root.find("system")
+        # Answers are immutable, so recent distinct requests are served without re-serializing
+        self._respond = lru_cache(maxsize=SNAPSHOT_CACHE_SIZE)(self._answer)
+
+    def find(self, xpath: str) -> list:
+        """Nodes matching an absolute config XPath ("|" unions and [@name='...'] predicates)."""
+        found = []
+        for part in xpath.split("|"):
+            path = part.strip()
+            if path.startswith("/config"):
+                path = path[len("/config"):]
+            path = path.strip("/")
+            found.extend(self.config.findall("./" + path) if path else [self.config])
+        return found
+
+    def _answer(self, qtype: Optional[str], action: Optional[str], xpath: Optional[str], cmd: Optional[str]) -> bytes:
+        if qtype == "config" and action in ("get", "show"):
+            try:
+                nodes = self.find(xpath or "/config")
+            except SyntaxError:
+                return _error(f"XPath not supported offline: {xpath}")
+            body = "".join(ET.tostring(node, encoding="unicode") for node in nodes)
+            return (
+                f'<response status="success"><result total-count="{len(nodes)}" count="{len(nodes)}">'
+                f"{body}</result></response>"
+            ).encode()
+        if qtype == "op" and self.system is not None:
+            try:
+                command = ET.fromstring(cmd or "")
+            except ET.ParseError:
+                command = None
+            if command is not None and command.tag == "show" and command.find("system/info") is not None:
+                return (
+                    f'<response status="success"><result>{ET.tostring(self.system, encoding="unicode")}'
+                    f"</result></response>"
+                ).encode()
+        request = f"{qtype}/{action}" if action else qtype
+        return _error(f"{request} is not available offline, target is served from snapshot {self.name}")
+
+    def respond(self, query: dict) -> bytes:
+        return self._respond(query.get("type"), query.get("action"), query.get("xpath"), query.get("cmd"))
+
+    def attach(self, xapi):
+        """Answer an xapi client's requests from this snapshot instead of the network."""
+
+        def api_request(query: dict):
+            return _Response(self.respond(query))
+
+        # PanXapi calls self.__api_request(), i.e. the name-mangled attribute below
+        xapi._PanXapi__api_request = api_request
+        return xapi
+
+    def info(self) -> dict:
+        return {
+            "path": self.path,
+            "target": self.target,
+            "type": self.type,
+            "source": self.source,
+            "created": self.created,
+            "hostname": self.hostname,
+        }
+
+
+_snapshots: Dict[str, Snapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def load_snapshot(path: str) -> Snapshot:
+    """Snapshot at path (gzip-compressed or plain XML), parsed on first use."""
+    path = os.path.abspath(path)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(path)
+        if snapshot is None:
+            started = time.perf_counter()
+            with open(path, "rb") as f:
+                compressed = f.read(2) == b"\x1f\x8b"
+                f.seek(0)
+                root = ET.parse(gzip.GzipFile(fileobj=f) if compressed else f).getroot()
+            snapshot = _snapshots[path] = Snapshot(path, root)
+            logger.info(
+                f"Loaded {snapshot.source} config snapshot of '{snapshot.target}' from {path} "
+                f"in {time.perf_counter() - started:.3f}s"
+            )
+    return snapshot
+
+
+def snapshot_path(target: str, source: str, name: Optional[str] = None) -> str:
+    """File under SNAPSHOT_DIR for a new snapshot; name is reduced to a file name."""
+    name = os.path.basename(name or "") or f"{target}-{source}-{time.strftime('%Y%m%d-%H%M%S')}"
+    if not name.endswith((".xml.gz", ".xml")):
+        name += ".xml.gz"
+    return os.path.join(SNAPSHOT_DIR, name)
+
+
+def export_snapshot(device, target: str, source: str = "running", name: Optional[str] = None) -> dict:
+    """
+    Save device's running or candidate config and system info to a snapshot file.
+    Blocking - call through run_blocking().
+
+    Returns:
+        {"path", "xml_bytes", "file_bytes", "seconds"}
+    """
+    if source not in SOURCES:
+        raise ValueError(f"source must be one of {', '.join(SOURCES)}")
+    started = time.perf_counter()
+    xapi = device.xapi
+    xapi.op(SYSTEM_INFO_CMD)
+    system = xapi.xml_result() or ""
+    if source == "running":
+        xapi.show("/config")
+    else:
+        xapi.get("/config")
+    config = xapi.xml_result() or ""
+    if not config.startswith("<config"):
+        raise ValueError(f"{source} config of '{target}' was empty")
+
+    attrs = {
+        "version": SNAPSHOT_VERSION,
+        "target": target,
+        "type": "panorama" if isinstance(device, Panorama) else "firewall",
+        "source": source,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "hostname": getattr(device, "hostname", None) or getattr(device, "serial", None) or "",
+    }
+    header = "<snapshot " + " ".join(f"{key}={quoteattr(value)}" for key, value in attrs.items()) + ">"
+    xml_bytes = 0
+    path = snapshot_path(target, source, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written next to the target and renamed, so readers never see a partial file
+    partial = path + ".partial"
+    with (gzip.open(partial, "wb") if path.endswith(".gz") else open(partial, "wb")) as f:
+        for chunk in (header, system, config, "</snapshot>"):
+            data = chunk.encode("utf-8")
+            xml_bytes += len(data)
+            f.write(data)
+    os.replace(partial, path)
+    return {
+        "path": path,
+        "xml_bytes": xml_bytes,
+        "file_bytes": os.path.getsize(path),
+        "seconds": time.perf_counter() - started,
+    }
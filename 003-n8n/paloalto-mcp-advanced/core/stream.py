@@ -0,0 +1,60 @@
+"""
+Chunked delivery of large tool results as MCP progress notifications.
+
+With stream=True, the list tools and run_op_command format their rows from
+a generator and send them in chunks of MCP_STREAM_CHUNK_ROWS rows. Each
+chunk is the message of a progress notification on the tool call, so the
+client sees the first rows while the rest are still being formatted. Only
+one chunk of formatted text exists at a time. The tool result itself is
+then just a summary with the paging footer.
+
+Progress notifications are only sent when the client asked for them (a
+progressToken in the request's _meta). Without one, the tools return their
+normal single response.
+"""
+import os
+from typing import Iterable, Iterator, List, Optional
+
+# Streaming configuration - env
+STREAM_CHUNK_ROWS = int(os.getenv("MCP_STREAM_CHUNK_ROWS", "50"))
+
+
+def can_stream(ctx) -> bool:
+    """True if the calling client receives progress notifications for this request."""
+    request = getattr(ctx, "request_context", None) if ctx is not None else None
+    meta = getattr(request, "meta", None) or {}
+    return meta.get("progressToken") is not None
+
+
+def chunked(rows: Iterable[str], size: int = STREAM_CHUNK_ROWS) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def stream_rows(ctx, rows: Iterable[str], total: Optional[int] = None, separator: str = "\n") -> dict:
+    """
+    Send formatted rows to the client in chunks, one progress notification each.
+
+    Args:
+        ctx: FastMCP context of the tool call
+        rows: Formatted rows, typically a generator
+        total: Row count if known up front (progress total)
+        separator: Joins the rows of a chunk
+
+    Returns:
+        {"rows": rows sent, "chunks": notifications sent, "bytes": message bytes sent}
+    """
+    sent = {"rows": 0, "chunks": 0, "bytes": 0}
+    for chunk in chunked(rows, max(STREAM_CHUNK_ROWS, 1)):
+        message = separator.join(chunk)
+        sent["rows"] += len(chunk)
+        sent["chunks"] += 1
+        sent["bytes"] += len(message.encode())
+        await ctx.report_progress(sent["rows"], total, message)
+    return sent
@@ -0,0 +1,359 @@
+"""
+Incremental config sync from the PAN-OS config log.
+
+Every configuration change is written to the config log with a sequence
+number and the XPath it touched (`full-path`, or the CLI-style `path` on
+older releases). With MCP_CONFIG_SYNC_INTERVAL set, each config cache load
+records the newest config log seqno. A background task then asks each
+device for the config log entries after that position. It maps each entry
+to the cached object type, vsys / device group and object name, and
+re-fetches only those objects by XPath. The new objects replace the old
+ones in a copy of the cached list. Rule moves re-read the rule order
+(names only).
+
+A quiet poll costs one small config log job per device (enqueue plus
+action=get polls, awaited between requests without holding an executor
+thread), so a large mirror stays current for kilobytes per interval instead
+of a full reload per TTL. New cache entries continue from the position the
+poller last saw on their device; only the first load per device asks the
+device for its newest seqno. Changes
+the sync can't place on a single object (renames, clones, whole containers)
+drop the affected entries, which reload on the next read. So does a backlog
+of more than MCP_CONFIG_SYNC_MAX_CHANGES entries. If polling fails, entries
+expire after MCP_CACHE_TTL as before.
+"""
+import asyncio
+import logging
+import os
+import re
+import shlex
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+from panos.panorama import DeviceGroup, Panorama
+
+from core.cache import config_cache, device_id
+from core.config import (
+    ADDRESS_GROUPS, ADDRESS_OBJECTS, APPLICATION_GROUPS, FETCH_BATCH, SECURITY_RULES, SERVICE_GROUPS,
+    SERVICE_OBJECTS, fetch_names, fetch_objects,
+)
+from core.device import api_device
+from core.executor import run_blocking
+
+logger = logging.getLogger("palo_mcp")
+
+# Config sync configuration - env
+SYNC_INTERVAL = float(os.getenv("MCP_CONFIG_SYNC_INTERVAL", "0"))
+SYNC_MAX_CHANGES = int(os.getenv("MCP_CONFIG_SYNC_MAX_CHANGES", "500"))
+SYNC_LOG_TIMEOUT = float(os.getenv("MCP_CONFIG_SYNC_LOG_TIMEOUT", "30"))
+
+# Seconds between action=get requests while a config log job runs
+LOG_POLL_INTERVAL = 0.5
+
+# Config node name -> cached object type
+CONTAINERS = {
+    "address": ADDRESS_OBJECTS,
+    "address-group": ADDRESS_GROUPS,
+    "service": SERVICE_OBJECTS,
+    "service-group": SERVICE_GROUPS,
+    "application-group": APPLICATION_GROUPS,
+}
+RULEBASES = ("rulebase", "pre-rulebase")
+# Commands that change objects in place; anything else (rename, clone, ...) drops the entry
+OBJECT_COMMANDS = ("set", "edit", "delete", "override", "move")
+
+_SEGMENT = re.compile(r"[^/\[]+(?:\[[^\]]*\])*")
+_PREDICATE = re.compile(r"^([\w-]+)\[@name='([^']*)'\]$")
+
+
+def _scope_of(fw) -> str:
+    """Config log scope of a cached entry's target: vsys, device group or "shared" (Panorama)."""
+    if isinstance(fw, DeviceGroup):
+        return fw.name
+    if isinstance(fw, Panorama):
+        return "shared"
+    return fw.vsys or "vsys1"
+
+
+def parse_change(tokens: List[Tuple[str, Optional[str]]]) -> Optional[Tuple[str, str, Optional[str]]]:
+    """
+    (scope, object type, object name or None) of a config node path given as
+    (node, entry name) pairs, or None if it isn't a cached object type.
+    """
+    scope = None
+    for i, (node, name) in enumerate(tokens):
+        if node in ("vsys", "device-group") and name:
+            scope = name
+        elif node == "shared" and scope is None:
+            scope = "shared"
+        elif node in CONTAINERS:
+            return scope or "vsys1", CONTAINERS[node], name
+        elif node in RULEBASES:
+            rest = [n for n, _ in tokens[i + 1:i + 3]]
+            if rest == ["security", "rules"]:
+                name = tokens[i + 2][1] if len(tokens) > i + 2 else None
+                return scope or "vsys1", SECURITY_RULES, name
+            return None
+    return None
+
+
+def xpath_tokens(xpath: str) -> List[Tuple[str, Optional[str]]]:
+    """/config/.../address/entry[@name='h1'] as [(..., None), ("address", "h1")]."""
+    tokens: List[Tuple[str, Optional[str]]] = []
+    for segment in _SEGMENT.findall(xpath):
+        match = _PREDICATE.match(segment)
+        if match and match.group(1) == "entry" and tokens and tokens[-1][1] is None:
+            tokens[-1] = (tokens[-1][0], match.group(2))
+        else:
+            tokens.append((segment, None))
+    return tokens
+
+
+def path_tokens(path: str) -> List[Tuple[str, Optional[str]]]:
+    """CLI-style path ("vsys vsys1 address h1") as [("vsys", "vsys1"), ("address", "h1")]."""
+    try:
+        words = shlex.split(path)
+    except ValueError:
+        words = path.split()
+    tokens = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        named = word in ("vsys", "device-group") or word in CONTAINERS or (word == "rules" and i > 0)
+        if named and i + 1 < len(words):
+            tokens.append((word, words[i + 1]))
+            i += 2
+        else:
+            tokens.append((word, None))
+            i += 1
+    return tokens
+
+
+def start_log_job(fw, nlogs: int, query: Optional[str] = None) -> str:
+    """
+    Enqueue a config log query and return its job id.
+    Blocking - call through run_blocking().
+    """
+    qs = {"type": "log", "log-type": "config", "nlogs": nlogs}
+    if query:
+        qs["query"] = query
+    xapi = api_device(fw).xapi
+    xapi.ad_hoc(qs=qs, modify_qs=True)
+    job = (xapi.element_root.findtext("result/job") or "").strip()
+    if not job:
+        raise ValueError("No job id in config log query response")
+    return job
+
+
+def get_log_job(fw, job: str) -> Optional[ET.Element]:
+    """
+    One status request for a config log job: the response if it finished, else None.
+    Blocking - call through run_blocking().
+    """
+    xapi = api_device(fw).xapi
+    xapi.ad_hoc(qs={"type": "log", "action": "get", "job-id": job}, modify_qs=True)
+    root = xapi.element_root
+    return root if (root.findtext("result/job/status") or "").strip() == "FIN" else None
+
+
+def parse_changes(root: ET.Element) -> List[dict]:
+    """
+    Entries of a finished config log job.
+
+    Returns:
+        [{"seqno", "cmd", "change": (scope, object type, name) or None}, ...]
+    """
+    changes = []
+    for entry in root.iterfind("result/log/logs/entry"):
+        seqno = entry.findtext("seqno")
+        if not seqno or not seqno.isdigit():
+            continue
+        full_path = (entry.findtext("full-path") or "").strip()
+        tokens = xpath_tokens(full_path) if full_path.startswith("/config") else path_tokens(entry.findtext("path") or "")
+        changes.append({
+            "seqno": int(seqno),
+            "cmd": (entry.findtext("cmd") or "").strip().lower(),
+            "change": parse_change(tokens),
+        })
+    return changes
+
+
+class ConfigSync:
+    def __init__(self, interval: float = SYNC_INTERVAL, max_changes: int = SYNC_MAX_CHANGES,
+                 log_timeout: float = SYNC_LOG_TIMEOUT):
+        self.interval = interval
+        self.max_changes = max_changes
+        self.log_timeout = log_timeout
+        self._poller: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        # Newest config log seqno seen per device id, from the last poll or first load
+        self._positions: Dict[str, int] = {}
+        # Devices whose config log can't be read (e.g. offline snapshots), warned about once
+        self._unavailable: set = set()
+        self.stats = {
+            "polls": 0,
+            "log_queries": 0,
+            "log_requests": 0,
+            "fetch_calls": 0,
+            "changes": 0,
+            "objects_fetched": 0,
+            "entries_updated": 0,
+            "entries_dropped": 0,
+            "errors": 0,
+        }
+
+    def _count(self, **deltas):
+        with self._lock:
+            for field, delta in deltas.items():
+                self.stats[field] += delta
+
+    async def query_log(self, fw, nlogs: int, query: Optional[str] = None) -> ET.Element:
+        """
+        Run a config log job to completion, sleeping between status requests
+        instead of holding an executor thread.
+
+        Raises:
+            TimeoutError: The job didn't finish within log_timeout seconds
+        """
+        self._count(log_queries=1, log_requests=1)
+        job = await run_blocking(fw, start_log_job, fw, nlogs, query)
+        deadline = time.monotonic() + self.log_timeout
+        while True:
+            self._count(log_requests=1)
+            root = await run_blocking(fw, get_log_job, fw, job)
+            if root is not None:
+                return root
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Config log job {job} did not finish within {self.log_timeout:g}s")
+            await asyncio.sleep(LOG_POLL_INTERVAL)
+
+    async def read_changes(self, fw, after: int) -> List[dict]:
+        """Config log entries with seqno above after, at most max_changes + 1 of them."""
+        return parse_changes(await self.query_log(fw, self.max_changes + 1, f"(seqno geq {after + 1})"))
+
+    async def position(self, fw) -> Optional[int]:
+        """
+        Config log position to sync a new cache entry from, or None if the device has no config log access.
+
+        Any seqno at or below the device's current one is safe (changes in
+        between are re-applied), so the last position the poller saw is used
+        when there is one.
+        """
+        device = device_id(fw)
+        if device in self._positions:
+            return self._positions[device]
+        try:
+            root = await self.query_log(fw, 1)
+        except Exception as e:
+            if device not in self._unavailable:
+                self._unavailable.add(device)
+                logger.warning(f"Config sync unavailable for {device}, using the cache TTL: {str(e)}")
+            return None
+        seqno = root.findtext("result/log/logs/entry/seqno")
+        position = int(seqno) if seqno and seqno.isdigit() else 0
+        self._positions.setdefault(device, position)
+        return position
+
+    def watch(self):
+        """Start the background poll if it isn't running (called when a cache entry is stored)."""
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._run())
+
+    async def _apply(self, key: tuple, entry: dict, changes: List[dict], position: int):
+        """Bring one cache entry up to position, re-fetching only the objects that changed."""
+        fw = entry["fw"]
+        scope, kind = _scope_of(fw), key[2]
+        names: Dict[str, None] = {}
+        reorder = False
+        for change in changes:
+            if change["seqno"] <= entry["position"] or change["change"] is None:
+                continue
+            change_scope, change_kind, name = change["change"]
+            if change_kind != kind or change_scope != scope:
+                continue
+            if name is None or change["cmd"] not in OBJECT_COMMANDS:
+                config_cache.drop(*key)
+                self._count(entries_dropped=1)
+                return
+            names[name] = None
+            reorder = reorder or change["cmd"] == "move"
+
+        if not names:
+            config_cache.update(key, entry, position)
+            return
+        fetched = await run_blocking(fw, fetch_objects, fw, kind, list(names))
+        order = await run_blocking(fw, fetch_names, fw, kind) if reorder else None
+        self._count(fetch_calls=-(-len(names) // FETCH_BATCH) + (1 if reorder else 0), objects_fetched=len(names))
+
+        value = []
+        for obj in entry["value"]:
+            if obj.name in fetched:
+                obj = fetched.pop(obj.name)
+                if obj is None:
+                    continue
+            value.append(obj)
+        # New objects go last, like a set on the firewall
+        value.extend(obj for obj in fetched.values() if obj is not None)
+        if order is not None:
+            rank = {name: i for i, name in enumerate(order)}
+            value.sort(key=lambda obj: rank.get(obj.name, len(rank)))
+        if config_cache.update(key, entry, position, value):
+            self._count(entries_updated=1)
+
+    async def _sync_device(self, device: str, entries: List[Tuple[tuple, dict]]):
+        fw = entries[0][1]["fw"]
+        after = min(entry["position"] for _, entry in entries)
+        try:
+            changes = await self.read_changes(fw, after)
+        except Exception as e:
+            # Entries keep their position and expire after the cache TTL if this persists
+            self._count(errors=1)
+            logger.warning(f"Config sync on {device} failed: {str(e)}")
+            return
+        if len(changes) > self.max_changes:
+            logger.info(f"Config sync on {device}: more than {self.max_changes} changes, reloading on next read")
+            config_cache.drop(device)
+            # The newest seqno is unknown; the next load asks the device again
+            self._positions.pop(device, None)
+            self._count(changes=len(changes), entries_dropped=len(entries))
+            return
+        position = max([after] + [change["seqno"] for change in changes])
+        self._positions[device] = max(position, self._positions.get(device, 0))
+        self._count(changes=sum(1 for change in changes if change["seqno"] > after))
+        for key, entry in entries:
+            try:
+                await self._apply(key, entry, changes, position)
+            except Exception as e:
+                self._count(errors=1)
+                logger.warning(f"Config sync of {key} failed, reloading on next read: {str(e)}")
+                config_cache.drop(*key)
+
+    async def _run(self):
+        """Poll every device with synced cache entries until none are left."""
+        while True:
+            await asyncio.sleep(self.interval)
+            devices = config_cache.synced()
+            if not devices:
+                # Positions stop advancing while idle
+                self._positions.clear()
+                self._poller = None
+                return
+            self._count(polls=1)
+            await asyncio.gather(*(self._sync_device(device, entries) for device, entries in devices.items()))
+
+    def info(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "enabled": config_cache.sync is self,
+            "interval": self.interval,
+            "running": self._poller is not None and not self._poller.done(),
+        }
+
+
+config_sync = ConfigSync()
+if SYNC_INTERVAL > 0:
+    config_cache.sync = config_sync
@@ -0,0 +1,293 @@
+"""
+Opt-in per-call tracing, from MCP tool entry to the XML API round-trip.
+
+With MCP_TRACING enabled, every tool call gets a trace keyed by the
+sessionId / toolCallId arguments n8n sends. Spans are recorded for:
+- tool dispatch (the whole call, FastMCP middleware)
+- executor wait (queued for a firewall slot and a worker thread) and the
+  blocking call on the worker (core.executor)
+- the HTTP request and pan-python's XML parse of the response (xapi client)
+- response formatting in the tools that build large outputs
+
+The blocking call's time not covered by its HTTP / parse children is
+pan-os-python building objects from the parsed XML.
+
+Finished traces are written as Chrome trace files (JSON, open in
+chrome://tracing or Perfetto) under MCP_TRACE_DIR/<sessionId>/<toolCallId>.json,
+and the most recent ones are kept in memory for export_traces. Only the
+newest MCP_TRACE_MAX_FILES files are kept on disk. With tracing off, span()
+only reads a context variable.
+"""
+import asyncio
+import collections
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from fastmcp.server.middleware import Middleware
+
+logger = logging.getLogger("palo_mcp")
+
+# Tracing configuration - env
+TRACING_ENABLED = os.getenv("MCP_TRACING", "false").lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv(
+    "MCP_TRACE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "traces")
+)
+TRACE_KEEP = int(os.getenv("MCP_TRACE_KEEP", "200"))
+TRACE_MAX_FILES = int(os.getenv("MCP_TRACE_MAX_FILES", "1000"))
+
+_trace: contextvars.ContextVar = contextvars.ContextVar("mcp_trace", default=None)
+_parent: contextvars.ContextVar = contextvars.ContextVar("mcp_trace_span", default=None)
+
+
+def _safe(name: str) -> str:
+    """Client-supplied id as a single path component: no separators, no leading dots ("..")."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name).lstrip(".")[:128] or "_"
+
+
+class Trace:
+    """Spans of one tool call. Spans may be added from executor threads."""
+
+    def __init__(self, tool: str, session_id: Optional[str] = None, tool_call_id: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:16]
+        self.tool = tool
+        self.session_id = session_id
+        self.tool_call_id = tool_call_id
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+
+    def reserve(self) -> int:
+        """Id for a span that is still open, so its children can point at it."""
+        with self._lock:
+            self.spans.append(None)
+            return len(self.spans)
+
+    def finish(self, span_id: int, name: str, start: float, end: float, parent: Optional[int] = None,
+               thread: Optional[threading.Thread] = None, **attrs):
+        thread = thread or threading.current_thread()
+        with self._lock:
+            self.spans[span_id - 1] = {
+                "id": span_id,
+                "parent": parent,
+                "name": name,
+                "start": start - self.start,
+                "duration": end - start,
+                "thread": thread.name,
+                "tid": thread.ident,
+                "attrs": attrs,
+            }
+
+    def finished(self) -> List[dict]:
+        with self._lock:
+            return [s for s in self.spans if s is not None]
+
+    @property
+    def duration(self) -> float:
+        return max((s["start"] + s["duration"] for s in self.finished()), default=0.0)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Total seconds per span name."""
+        totals: Dict[str, float] = collections.defaultdict(float)
+        for s in self.finished():
+            totals[s["name"]] += s["duration"]
+        return dict(totals)
+
+    def chrome_events(self, pid: int = 1) -> List[dict]:
+        """Chrome trace "complete" events, one thread lane per OS thread."""
+        spans = self.finished()
+        events = [{
+            "name": "process_name", "ph": "M", "pid": pid,
+            "args": {"name": f"{self.tool} {self.tool_call_id or self.id}"},
+        }]
+        for name, tid in {(s["thread"], s["tid"]) for s in spans}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        for s in spans:
+            events.append({
+                "name": s["name"],
+                "cat": s["name"].split(".")[0],
+                "ph": "X",
+                "ts": round((self.wall_start + s["start"]) * 1e6, 3),
+                "dur": round(s["duration"] * 1e6, 3),
+                "pid": pid,
+                "tid": s["tid"],
+                "args": {"span": s["id"], "parent": s["parent"], **s["attrs"]},
+            })
+        return events
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.id,
+            "tool": self.tool,
+            "session_id": self.session_id,
+            "tool_call_id": self.tool_call_id,
+            "started": self.wall_start,
+            "duration": self.duration,
+            "spans": self.finished(),
+        }
+
+
+def chrome_trace(traces: List[Trace]) -> dict:
+    """Chrome trace JSON object for traces; "otherData" keeps the plain span lists."""
+    events = []
+    for pid, trace in enumerate(traces, 1):
+        events += trace.chrome_events(pid)
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"traces": [trace.to_dict() for trace in traces]},
+    }
+
+
+def trace_path(trace: Trace) -> str:
+    return os.path.join(
+        TRACE_DIR, _safe(trace.session_id or "no-session"), f"{_safe(trace.tool_call_id or trace.id)}.json"
+    )
+
+
+def export_path(session_id: Optional[str] = None) -> str:
+    return os.path.join(TRACE_DIR, _safe(session_id or "all"), f"export-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+
+def write_trace(traces: List[Trace], path: str) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(traces), f)
+    return path
+
+
+_prune_lock = threading.Lock()
+
+
+def prune_traces(max_files: int = TRACE_MAX_FILES):
+    """Delete the oldest trace files beyond max_files, and session directories left empty."""
+    if max_files <= 0 or not os.path.isdir(TRACE_DIR):
+        return
+    with _prune_lock:
+        files = []
+        for entry in os.scandir(TRACE_DIR):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            for item in os.scandir(entry.path):
+                if item.name.endswith(".json") and item.is_file(follow_symlinks=False):
+                    files.append((item.stat().st_mtime, item.path))
+        if len(files) <= max_files:
+            return
+        files.sort()
+        for _, path in files[:len(files) - max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        for entry in os.scandir(TRACE_DIR):
+            if entry.is_dir(follow_symlinks=False):
+                try:
+                    os.rmdir(entry.path)
+                except OSError:
+                    pass    # not empty
+
+
+def _write_call_trace(trace: Trace) -> str:
+    path = write_trace([trace], trace_path(trace))
+    prune_traces()
+    return path
+
+
+_recent: collections.deque = collections.deque(maxlen=TRACE_KEEP)
+
+
+def recent_traces(session_id: Optional[str] = None, tool_call_id: Optional[str] = None) -> List[Trace]:
+    return [
+        trace for trace in list(_recent)
+        if (not session_id or trace.session_id == session_id)
+        and (not tool_call_id or trace.tool_call_id == tool_call_id)
+    ]
+
+
+def current() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Record the enclosed block as a span of the current trace, if any."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    parent = _parent.get()
+    span_id = trace.reserve()
+    token = _parent.set(span_id)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _parent.reset(token)
+        trace.finish(span_id, name, start, end, parent, **attrs)
+
+
+def record(name: str, start: float, end: float, thread: Optional[threading.Thread] = None, **attrs):
+    """Add an already-timed span (perf_counter start/end) to the current trace, if any."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.finish(trace.reserve(), name, start, end, _parent.get(), thread, **attrs)
+
+
+def instrument(xapi):
+    """Trace an xapi client's HTTP requests and XML response parsing."""
+    if not TRACING_ENABLED:
+        return xapi
+    send = xapi._PanXapi__api_request
+    parse = xapi._PanXapi__set_response
+
+    def api_request(query: dict):
+        if _trace.get() is None:
+            return send(query)
+        with span("http.request", type=query.get("type", ""), action=query.get("action", "")):
+            return send(query)
+
+    def set_response(response):
+        if _trace.get() is None:
+            return parse(response)
+        with span("xml.parse"):
+            return parse(response)
+
+    xapi._PanXapi__api_request = api_request
+    xapi._PanXapi__set_response = set_response
+    return xapi
+
+
+class TracingMiddleware(Middleware):
+    """Start a trace per tool call and write it out when the call returns."""
+
+    async def on_call_tool(self, context, call_next):
+        arguments = context.message.arguments or {}
+        trace = Trace(
+            context.message.name,
+            session_id=arguments.get("sessionId"),
+            tool_call_id=arguments.get("toolCallId"),
+        )
+        token = _trace.set(trace)
+        try:
+            with span("tool.dispatch", tool=trace.tool):
+                return await call_next(context)
+        finally:
+            _trace.reset(token)
+            _recent.append(trace)
+            # Off the event loop and off the firewall executor
+            written = asyncio.get_running_loop().run_in_executor(None, _write_call_trace, trace)
+            written.add_done_callback(_log_write_error)
+
+
+def _log_write_error(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Failed to write trace: {future.exception()}")
@@ -0,0 +1,210 @@
+"""
+Pooled keep-alive HTTP transport for the PAN-OS XML API.
+
+pan-python opens a fresh urllib connection (TCP + TLS handshake) for every
+API call. attach() swaps the request function of an xapi client for one that
+borrows a persistent connection from a per-endpoint pool, and resumes the
+last TLS session when a new connection has to be opened. Response parsing
+and error handling stay in pan-python.
+"""
+import http.client
+import os
+import queue
+import socket
+import ssl
+import threading
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+# Transport configuration - env
+HTTP_POOLING = os.getenv("MCP_HTTP_POOLING", "true").lower() in ("1", "true", "yes")
+HTTP_POOL_SIZE = int(os.getenv("MCP_HTTP_POOL_SIZE", "8"))
+
+# Errors that mean a kept-alive connection was closed by the firewall while idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class _Response:
+    """Minimal urllib-style response for pan-python's response parsing."""
+
+    def __init__(self, response: http.client.HTTPResponse, body: bytes):
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.msg
+        self._body = body
+
+    def read(self) -> bytes:
+        return self._body
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+    def info(self):
+        return self.headers
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS connection that resumes the pool's most recent TLS session."""
+
+    def __init__(self, *args, pool=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = pool
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port), self.timeout, self.source_address)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = self._context.wrap_socket(
+            sock, server_hostname=self.host, session=self._pool.tls_session
+        )
+        if self.sock.session_reused:
+            self._pool.count("tls_sessions_resumed")
+
+
+class ConnectionPool:
+    def __init__(self, scheme: str, host: str, port: Optional[int], timeout: Optional[float],
+                 ssl_context: Optional[ssl.SSLContext] = None, maxsize: int = HTTP_POOL_SIZE):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        # Unverified by default, same as pan-python without an ssl_context
+        self.ssl_context = ssl_context or ssl._create_unverified_context()
+        self.tls_session = None
+        self._idle = queue.LifoQueue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "tls_sessions_resumed": 0,
+            "stale_retries": 0,
+            "errors": 0,
+        }
+
+    def count(self, field: str, delta: int = 1):
+        with self._lock:
+            self.stats[field] += delta
+
+    def _new_connection(self):
+        self.count("connections_opened")
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return _HTTPSConnection(
+            self.host, self.port, timeout=self.timeout, context=self.ssl_context, pool=self
+        )
+
+    def _acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._new_connection(), False
+        self.count("connections_reused")
+        return conn, True
+
+    def _release(self, conn):
+        sock = getattr(conn, "sock", None)
+        if isinstance(sock, ssl.SSLSocket) and sock.session is not None:
+            # Session tickets arrive after the handshake, so save it once a response was read
+            self.tls_session = sock.session
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, path: str, body: bytes) -> _Response:
+        self.count("requests")
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        conn, reused = self._acquire()
+        while True:
+            try:
+                conn.request("POST", path, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    self.count("errors")
+                    raise
+                # Idle keep-alive connection was closed by the firewall - retry on a new one
+                self.count("stale_retries")
+                conn, reused = self._new_connection(), False
+            except Exception:
+                conn.close()
+                self.count("errors")
+                raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return _Response(response, data)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(uri: str, timeout: Optional[float], ssl_context=None) -> ConnectionPool:
+    """Shared pool for the scheme/host/port of an xapi uri."""
+    parts = urlsplit(uri)
+    key = (parts.scheme, parts.hostname, parts.port)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(
+                parts.scheme, parts.hostname, parts.port, timeout, ssl_context
+            )
+    return pool
+
+
+def attach(xapi):
+    """Route an xapi client's requests through the shared connection pool."""
+    if not HTTP_POOLING or xapi.use_get:
+        return xapi
+    pool = get_pool(xapi.uri, xapi.timeout, xapi.ssl_context)
+    path = urlsplit(xapi.uri).path or "/api/"
+
+    def api_request(query: dict):
+        # Same encoding as pan-python: the API key is appended without re-quoting
+        if "key" in query:
+            query = query.copy()
+            key = query.pop("key")
+            data = urlencode(query) + "&key=" + key
+        else:
+            data = urlencode(query)
+        try:
+            response = pool.request(path, data.encode())
+        except socket.timeout:
+            xapi.status_detail = "URLError: reason: timed out"
+            return False
+        except (OSError, http.client.HTTPException) as e:
+            xapi.status_detail = f"URLError: reason: {e}"
+            return False
+        if response.status >= 400:
+            # Matches urllib's HTTPError handling in pan-python
+            xapi.status_detail = f"URLError: code: {response.status} reason: {response.reason}"
+            return False
+        return response
+
+    # PanXapi calls self.__api_request(), i.e. the name-mangled attribute below
+    xapi._PanXapi__api_request = api_request
+    return xapi
+
+
+def transport_stats() -> dict:
+    with _pools_lock:
+        pools = dict(_pools)
+    return {
+        f"{pool.scheme}://{pool.host}{':' + str(pool.port) if pool.port else ''}": {
+            **pool.stats,
+            "idle": pool._idle.qsize(),
+        }
+        for pool in pools.values()
+    }
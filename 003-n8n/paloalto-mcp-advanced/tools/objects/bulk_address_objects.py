@@ -0,0 +1,251 @@
+"""
+Bulk Address Object Tools
+"""
+import ipaddress
+from panos import objects
+from core.bulk import (
+    BULK_CHUNK_SIZE, delete_action, format_results, parse_payload, push_in_chunks,
+    set_action, update_action,
+)
+from core.cache import config_cache
+from core.config import ADDRESS_OBJECTS, fetch_objects
+from core.executor import run_blocking
+from typing import List, Optional, Union
+
+
+def _check_value(value: str, addr_type: str) -> Optional[str]:
+    if addr_type == "ip-netmask":
+        try:
+            ipaddress.ip_network(value, strict=False)
+        except ValueError:
+            return f"invalid ip-netmask '{value}'"
+    return None
+
+
+def _merge_results(items: list, errors: dict, pushed: dict) -> list:
+    """(name, error) per payload item: local validation errors by index, then device results by name."""
+    return [
+        (item.get("name") or "<missing name>", errors.get(index) or pushed.get(item.get("name")))
+        for index, item in enumerate(items)
+    ]
+
+
+def register(server, runtime):
+    """Register the bulk address object tools with the MCP server."""
+
+    @server.tool()
+    async def bulk_create_address_objects(
+        payload: Union[str, List[dict]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        verbose: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Create many address objects using chunked multi-config API calls.
+
+        Args:
+            payload: List of objects, JSON array or CSV with columns name,ip_address,description,type
+                     (e.g., '[{"name": "Server1", "ip_address": "10.0.0.1"}]' or "name,ip_address\\nServer1,10.0.0.1")
+            chunk_size: Objects per API call (default: 500)
+            verbose: List every object in the result, not only failures
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: Summary with per-object failures
+        """
+        try:
+            if chunk_size < 1:
+                return "✗ Error: chunk_size must be at least 1"
+            items = parse_payload(payload, ["name", "ip_address", "description", "type"])
+            if not items:
+                return "✗ Error: payload contains no address objects"
+            fw = runtime.get_firewall(target)
+            errors, actions, seen = {}, [], set()
+            for index, item in enumerate(items):
+                name = item.get("name")
+                value = item.get("ip_address") or item.get("value")
+                addr_type = item.get("type") or "ip-netmask"
+                if not name or not value:
+                    errors[index] = "name and ip_address are required"
+                    continue
+                if name in seen:
+                    errors[index] = "duplicate name in payload"
+                    continue
+                seen.add(name)
+                error = _check_value(value, addr_type)
+                if error:
+                    errors[index] = error
+                    continue
+                addr = objects.AddressObject(
+                    name=name,
+                    value=value,
+                    type=addr_type,
+                    description=item.get("description") or None,
+                )
+                addr.parent = fw
+                actions.append(set_action(addr))
+
+            pushed = {"results": {}, "api_calls": 0}
+            if actions:
+                try:
+                    pushed = await push_in_chunks(fw, actions, chunk_size)
+                finally:
+                    config_cache.invalidate(fw, ADDRESS_OBJECTS)
+            results = _merge_results(items, errors, pushed["results"])
+            runtime.logger.info(f"Bulk created {sum(1 for _, e in results if not e)}/{len(results)} address objects")
+            return format_results("Created", "address object(s)", results, pushed["api_calls"], verbose)
+        except Exception as e:
+            runtime.logger.error(f"Failed to bulk create address objects: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def bulk_update_address_objects(
+        payload: Union[str, List[dict]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        verbose: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Update many existing address objects using chunked multi-config API calls.
+        Only the given fields are edited; empty cells leave the field unchanged.
+
+        Args:
+            payload: List of objects, JSON array or CSV with columns name,new_ip,new_description
+            chunk_size: Objects per API call (default: 500)
+            verbose: List every object in the result, not only failures
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: Summary with per-object failures
+        """
+        try:
+            if chunk_size < 1:
+                return "✗ Error: chunk_size must be at least 1"
+            items = parse_payload(payload, ["name", "new_ip", "new_description"])
+            if not items:
+                return "✗ Error: payload contains no address objects"
+            fw = runtime.get_firewall(target)
+            errors, changes, seen = {}, [], set()
+            for index, item in enumerate(items):
+                name = item.get("name")
+                new_ip = item.get("new_ip") or item.get("ip_address") or None
+                new_description = item.get("new_description") or item.get("description") or None
+                if not name:
+                    errors[index] = "name is required"
+                    continue
+                if not new_ip and not new_description:
+                    errors[index] = "provide new_ip or new_description"
+                    continue
+                if name in seen:
+                    errors[index] = "duplicate name in payload"
+                    continue
+                seen.add(name)
+                changes.append((index, name, new_ip, new_description))
+
+            # Existence and type come from the device, not the cache, which may be stale
+            current = await run_blocking(fw, fetch_objects, fw, ADDRESS_OBJECTS, [name for _, name, _, _ in changes])
+            actions = []
+            for index, name, new_ip, new_description in changes:
+                existing = current.get(name)
+                if existing is None:
+                    errors[index] = "not found"
+                    continue
+                error = _check_value(new_ip, existing.type) if new_ip else None
+                if error:
+                    errors[index] = error
+                    continue
+                # Edit only the given fields, so other fields changed on the device are left alone
+                addr = objects.AddressObject(
+                    name=name,
+                    value=new_ip,
+                    type=existing.type,
+                    description=new_description,
+                )
+                addr.parent = fw
+                if new_ip:
+                    actions.append(update_action(addr, "value"))
+                if new_description:
+                    actions.append(update_action(addr, "description"))
+
+            pushed = {"results": {}, "api_calls": 0}
+            if actions:
+                try:
+                    pushed = await push_in_chunks(fw, actions, chunk_size)
+                finally:
+                    config_cache.invalidate(fw, ADDRESS_OBJECTS)
+            results = _merge_results(items, errors, pushed["results"])
+            runtime.logger.info(f"Bulk updated {sum(1 for _, e in results if not e)}/{len(results)} address objects")
+            return format_results("Updated", "address object(s)", results, pushed["api_calls"], verbose)
+        except Exception as e:
+            runtime.logger.error(f"Failed to bulk update address objects: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def bulk_delete_address_objects(
+        payload: Union[str, List[str]],
+        chunk_size: int = BULK_CHUNK_SIZE,
+        verbose: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Delete many address objects using chunked multi-config API calls.
+
+        Args:
+            payload: List of names, JSON array or CSV/newline-separated names
+            chunk_size: Objects per API call (default: 500)
+            verbose: List every object in the result, not only failures
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: Summary with per-object failures
+        """
+        try:
+            if chunk_size < 1:
+                return "✗ Error: chunk_size must be at least 1"
+            items = parse_payload(payload, ["name"])
+            if not items:
+                return "✗ Error: payload contains no address object names"
+            fw = runtime.get_firewall(target)
+            names = {}
+            errors, actions = {}, []
+            for index, item in enumerate(items):
+                name = item.get("name")
+                if not name:
+                    errors[index] = "name is required"
+                elif name in names:
+                    errors[index] = "duplicate name in payload"
+                else:
+                    names[name] = index
+
+            # Existence comes from the device, not the cache, which may be stale
+            current = await run_blocking(fw, fetch_objects, fw, ADDRESS_OBJECTS, names)
+            for name, index in names.items():
+                if current.get(name) is None:
+                    errors[index] = "not found"
+                else:
+                    actions.append(delete_action(current[name]))
+
+            pushed = {"results": {}, "api_calls": 0}
+            if actions:
+                try:
+                    pushed = await push_in_chunks(fw, actions, chunk_size)
+                finally:
+                    config_cache.invalidate(fw, ADDRESS_OBJECTS)
+            results = _merge_results(items, errors, pushed["results"])
+            runtime.logger.info(f"Bulk deleted {sum(1 for _, e in results if not e)}/{len(results)} address objects")
+            return format_results("Deleted", "address object(s)", results, pushed["api_calls"], verbose)
+        except Exception as e:
+            runtime.logger.error(f"Failed to bulk delete address objects: {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -2,10 +2,14 @@
 Create Address Object Tool
 """
 from panos import objects
-from main import get_firewall, logger
+from core.executor import run_blocking
+from core.cache import config_cache
+from core.config import ADDRESS_OBJECTS
+from core.bulk import set_action
+from core.changeset import change_sets
 from typing import Optional
 
-def register(server):
+def register(server, runtime):
     """Register the create_address_object tool with the MCP server."""
     
     @server.tool()
@@ -13,6 +17,8 @@ def register(server):
         name: str,
         ip_address: str,
         description: str = "",
+        change_set_id: Optional[str] = None,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
@@ -25,6 +31,8 @@ def register(server):
             name: Name of the address object (e.g., "Server1")
             ip_address: IP address or CIDR (e.g., "192.168.1.10" or "192.168.1.0/24")
             description: Optional description for the address object
+            change_set_id: Stage the change in this change set instead of applying it (see begin_change_set)
+            target: Registry target name (default: the default target)
         
         Returns:
             str: Success or error message
@@ -33,7 +41,8 @@ def register(server):
             if not name or not ip_address:
                 return "✗ Error: name and ip_address are required"
             
-            fw = get_firewall()
+            change_set = change_sets.get(change_set_id, target) if change_set_id else None
+            fw = runtime.get_firewall(change_set.target if change_set else target)
             
             addr = objects.AddressObject(
                 name=name,
@@ -41,12 +50,19 @@ def register(server):
                 description=description
             )
             
+            if change_set:
+                addr.parent = fw
+                change_set.stage(set_action(addr), ADDRESS_OBJECTS, f"create address object '{name}' ({ip_address})")
+                runtime.logger.info(f"Staged address object {name} in change set {change_set.id}")
+                return f"✓ Staged creation of address object '{name}' in change set {change_set.id} ({len(change_set.changes)} change(s))"
+
             fw.add(addr)
-            addr.create()
+            await run_blocking(fw, addr.create)
+            config_cache.invalidate(fw, ADDRESS_OBJECTS)
             
-            logger.info(f"Created address object: {name} -> {ip_address}")
+            runtime.logger.info(f"Created address object: {name} -> {ip_address}")
             return f"✓ Successfully created address object '{name}' with IP {ip_address}"
         
         except Exception as e:
-            logger.error(f"Failed to create address object: {str(e)}")
+            runtime.logger.error(f"Failed to create address object: {str(e)}")
             return f"✗ Error: {str(e)}"
@@ -1,11 +1,16 @@
-from panos import objects
-from main import get_firewall, logger
+from core.executor import run_blocking
+from core.cache import config_cache
+from core.config import ADDRESS_OBJECTS, fetch_address_object, delete_object
+from core.bulk import delete_action
+from core.changeset import change_sets
 from typing import Optional
 
-def register(server):
+def register(server, runtime):
     @server.tool()
     async def delete_address_object(
         name: str,
+        change_set_id: Optional[str] = None,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
@@ -16,6 +21,8 @@ def register(server):
     
         Args:
             name: Name of the address object to delete
+            change_set_id: Stage the change in this change set instead of applying it (see begin_change_set)
+            target: Registry target name (default: the default target)
     
         Returns:
             str: Success or error message
@@ -24,14 +31,19 @@ def register(server):
         try:
             if not name:
                 return "✗ Error: name is required"
-            fw = get_firewall()
-            objects.AddressObject.refreshall(fw)
-            addr = fw.find(name, objects.AddressObject)
+            change_set = change_sets.get(change_set_id, target) if change_set_id else None
+            fw = runtime.get_firewall(change_set.target if change_set else target)
+            addr = await run_blocking(fw, fetch_address_object, fw, name)
             if addr is None:
                 return f"✗ Address object '{name}' not found"
-            addr.delete()
-            logger.info(f"Deleted address object: {name}")
+            if change_set:
+                change_set.stage(delete_action(addr), ADDRESS_OBJECTS, f"delete address object '{name}'")
+                runtime.logger.info(f"Staged address object deletion {name} in change set {change_set.id}")
+                return f"✓ Staged deletion of address object '{name}' in change set {change_set.id} ({len(change_set.changes)} change(s))"
+            await run_blocking(fw, delete_object, addr)
+            config_cache.invalidate(fw, ADDRESS_OBJECTS)
+            runtime.logger.info(f"Deleted address object: {name}")
             return f"✓ Successfully deleted address object '{name}'"
         except Exception as e:
-            logger.error(f"Failed: {str(e)}")
+            runtime.logger.error(f"Failed: {str(e)}")
             return f"✗ Error: {str(e)}"
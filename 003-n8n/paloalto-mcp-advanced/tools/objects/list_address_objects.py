@@ -1,36 +1,87 @@
-from panos import objects
-from main import get_firewall, logger
+from fastmcp import Context
+from core.config import get_address_objects
+from core.query import (
+    LIST_PAGE_SIZE, address_range, covers, has_value, match_name, network_span, page_footer, paginate,
+)
+from core.stream import can_stream, stream_rows
+from core.tracing import span
 from typing import Optional
 
-def register(server):
+def format_address(addr) -> str:
+    lines = [f"Name: {addr.name}", f"  Value: {addr.value}"]
+    if addr.description:
+        lines.append(f"  Description: {addr.description}")
+    if addr.tag:
+        lines.append(f"  Tags: {', '.join(addr.tag)}")
+    lines.append("")
+    return "\n".join(lines)
+
+def register(server, runtime):
     @server.tool()
     async def list_address_objects(
+        name: Optional[str] = None,
+        value: Optional[str] = None,
+        contains: Optional[str] = None,
+        tag: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = LIST_PAGE_SIZE,
+        refresh: bool = False,
+        stream: bool = False,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
-        toolCallId: Optional[str] = None
+        toolCallId: Optional[str] = None,
+        ctx: Context = None
     ) -> str:
         """
-        List all address objects on the Palo Alto firewall.
+        List address objects on the Palo Alto firewall, filtered and paginated.
+    
+        Args:
+            name: Name glob, case-insensitive (e.g., "web-*")
+            value: Value glob (e.g., "10.1.*")
+            contains: Only objects whose ip-netmask / ip-range covers this IP or CIDR (e.g., "10.1.2.3")
+            tag: Only objects with this tag
+            cursor: Cursor from the previous page
+            limit: Max objects per page (default: 100)
+            refresh: Bypass the config cache and read from the firewall (default: False)
+            stream: Send the page as progress notifications in chunks instead of in the result
+                    (needs a client that sends a progressToken)
+            target: Registry target name (default: the default target)
     
         Returns:
             str: List of address objects or error message
         """
         try:
-            fw = get_firewall()
-            addresses = objects.AddressObject.refreshall(fw)
+            query = network_span(contains) if contains else None
+            fw = runtime.get_firewall(target)
+            addresses = await get_address_objects(fw, refresh=refresh)
             if not addresses:
                 return "No address objects found."
-            lines = [f"Found {len(addresses)} object(s):\n"]
-            logger.info(f"Found {len(addresses)} object(s)")
-            
-            for addr in addresses:
-                lines.append(f"Name: {addr.name}")
-                lines.append(f"  Value: {addr.value}")
-                if addr.description:
-                    lines.append(f"  Description: {addr.description}")
-                lines.append("")
-            return "\n".join(lines)
+            # Skip unset filters: pan-os-python attribute access is not free on 50k objects
+            with span("filter"):
+                matched = [
+                    addr for addr in addresses
+                    if (not name or match_name(addr.name, name))
+                    and (not value or match_name(addr.value, value))
+                    and (not tag or has_value(addr.tag, tag))
+                    and (query is None or covers(address_range(addr.type, addr.value), query))
+                ]
+            page, start, next_cursor = paginate(matched, cursor, limit)
+            runtime.logger.info(f"Found {len(addresses)} object(s), {len(matched)} matching")
+            header = f"Found {len(addresses)} object(s), {len(matched)} matching"
+            if stream and can_stream(ctx):
+                with span("stream"):
+                    sent = await stream_rows(ctx, (format_address(addr) for addr in page), len(page))
+                return (
+                    f"{header}, {sent['rows']} streamed in {sent['chunks']} chunk(s).\n\n"
+                    f"{page_footer(start, page, len(matched), next_cursor)}"
+                )
+            with span("format"):
+                lines = [f"{header}:\n"]
+                lines.extend(format_address(addr) for addr in page)
+                lines.append(page_footer(start, page, len(matched), next_cursor))
+                return "\n".join(lines)
         except Exception as e:
-            logger.error(f"Failed: {str(e)}")
+            runtime.logger.error(f"Failed: {str(e)}")
             return f"✗ Error: {str(e)}"
@@ -0,0 +1,76 @@
+"""
+Lookup IP Tool
+"""
+import time
+from core.ipindex import get_ip_index
+from typing import Optional
+
+SIDES = ("any", "source", "destination")
+
+def register(server, runtime):
+    """Register the lookup_ip tool with the MCP server."""
+
+    @server.tool()
+    async def lookup_ip(
+        ip: str,
+        side: str = "any",
+        include_any: bool = False,
+        limit: int = 100,
+        refresh: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Find the address objects, address groups and security rules that cover an IP address or CIDR.
+
+        Args:
+            ip: IP address or CIDR (e.g., "10.1.2.3" or "10.1.2.0/24"); a CIDR matches objects covering all of it
+            side: Rule side to match: "any", "source" or "destination" (default: any)
+            include_any: Also list rules that match because of an 'any' source/destination (default: False)
+            limit: Max entries listed per section (default: 100)
+            refresh: Bypass the config cache and read from the firewall (default: False)
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: Matching objects, groups and rules (rules in rulebase order)
+        """
+        try:
+            if not ip:
+                return "✗ Error: ip is required"
+            if side not in SIDES:
+                return f"✗ Error: side must be one of {', '.join(SIDES)}"
+            fw = runtime.get_firewall(target)
+            index = await get_ip_index(fw, refresh=refresh)
+            started = time.perf_counter()
+            result = index.lookup(ip, side=side, include_any=include_any)
+            elapsed = time.perf_counter() - started
+            runtime.logger.info(f"Looked up {ip}: {len(result['addresses'])} objects, {len(result['rules'])} rules")
+
+            lines = [
+                f"✓ {ip}: {len(result['addresses'])} address object(s), {len(result['groups'])} group(s), "
+                f"{len(result['rules'])} rule(s) ({elapsed * 1e6:.0f} µs, "
+                f"index of {index.counts['indexed']} objects / {index.counts['rules']} rules)"
+            ]
+            sections = (
+                ("Address objects", [f"{name} ({value})" for name, value in result["addresses"]]),
+                ("Address groups", result["groups"]),
+                ("Security rules", [
+                    f"{name} [{'/'.join(sides)}] via {', '.join(via)}" for name, sides, via in result["rules"]
+                ]),
+            )
+            for title, entries in sections:
+                if not entries:
+                    continue
+                lines.append(f"\n{title}:")
+                lines.extend(f"  - {entry}" for entry in entries[:limit])
+                if len(entries) > limit:
+                    lines.append(f"  ... {len(entries) - limit} more")
+            if index.counts["dynamic_groups"]:
+                lines.append(f"\nNote: {index.counts['dynamic_groups']} dynamic address group(s) are not resolved")
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to look up {ip}: {str(e)}")
+            return f"✗ Error: {str(e)}"
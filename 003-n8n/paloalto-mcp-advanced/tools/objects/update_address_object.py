@@ -1,13 +1,18 @@
-from panos import objects
-from main import get_firewall, logger
+from core.executor import run_blocking
+from core.cache import config_cache
+from core.config import ADDRESS_OBJECTS, fetch_address_object
+from core.bulk import edit_action
+from core.changeset import change_sets
 from typing import Optional
 
-def register(server):
+def register(server, runtime):
     @server.tool()
     async def update_address_object(
         name: str,
         new_ip: Optional[str] = None,
         new_description: Optional[str] = None,
+        change_set_id: Optional[str] = None,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
@@ -20,6 +25,8 @@ def register(server):
             name: Name of the address object to update
             new_ip: New IP address or CIDR (optional)
             new_description: New description (optional)
+            change_set_id: Stage the change in this change set instead of applying it (see begin_change_set)
+            target: Registry target name (default: the default target)
     
         Returns:
             str: Success or error message
@@ -30,19 +37,26 @@ def register(server):
                 return "✗ Error: name is required"
             if new_ip is None and new_description is None:
                 return "✗ Error: provide new_ip or new_description"
-            fw = get_firewall()
-            objects.AddressObject.refreshall(fw)
-            addr = fw.find(name, objects.AddressObject)
+            change_set = change_sets.get(change_set_id, target) if change_set_id else None
+            fw = runtime.get_firewall(change_set.target if change_set else target)
+            addr = await run_blocking(fw, fetch_address_object, fw, name)
             if addr is None:
                 return f"✗ Address object '{name}' not found"
             if new_ip:
                 addr.value = new_ip
             if new_description is not None:
                 addr.description = new_description
-            addr.apply()
+            if change_set:
+                change_set.stage(edit_action(addr), ADDRESS_OBJECTS, f"update address object '{name}'")
+                runtime.logger.info(f"Staged address object update {name} in change set {change_set.id}")
+                return f"✓ Staged update of address object '{name}' in change set {change_set.id} ({len(change_set.changes)} change(s))"
+            try:
+                await run_blocking(fw, addr.apply)
+            finally:
+                config_cache.invalidate(fw, ADDRESS_OBJECTS)
             
-            logger.info(f"Updated address object: {name}")
+            runtime.logger.info(f"Updated address object: {name}")
             return f"✓ Successfully updated address object '{name}'"
         except Exception as e:
-            logger.error(f"Failed: {str(e)}")
+            runtime.logger.error(f"Failed: {str(e)}")
             return f"✗ Error: {str(e)}"
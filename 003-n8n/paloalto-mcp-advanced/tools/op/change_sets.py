@@ -0,0 +1,179 @@
+"""
+Change Set Tools
+"""
+import asyncio
+import time
+from core.changeset import (
+    COMMITTED, COMMITTING, DISCARDED, FAILED, OPEN, PUSHED, PUSHING, change_sets, push_change_set, start_commit,
+)
+from typing import Optional
+
+
+def _describe(change_set, verbose: bool = True) -> str:
+    age = time.time() - change_set.created
+    lines = [
+        f"Change set {change_set.id} on '{change_set.target}': {change_set.state}, "
+        f"{len(change_set.changes)} change(s), created {age:.0f}s ago"
+        + (f" - {change_set.description}" if change_set.description else "")
+    ]
+    if change_set.job_id:
+        job = change_set.job or {}
+        scope = f"partial for admin '{change_set.admin}'" if change_set.admin else "full"
+        lines.append(
+            f"Commit job {change_set.job_id} ({scope}): {job.get('status') or 'started'}"
+            + (f", result {job['result']}" if job.get("result") else "")
+            + (f", {job['progress']}%" if job.get("progress") is not None else "")
+        )
+        lines.extend(f"  {line}" for line in job.get("details") or [])
+    if change_set.error:
+        lines.append(f"Error: {change_set.error}")
+    if verbose:
+        lines.extend(f"  {i}. {change.summary}" for i, change in enumerate(change_set.changes, 1))
+    return "\n".join(lines)
+
+
+def register(server, runtime):
+    """Register the change set tools with the MCP server."""
+
+    @server.tool()
+    async def begin_change_set(
+        description: str = "",
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Start a change set. Pass its id as change_set_id to the create/update/delete tools to
+        stage changes instead of applying them, then apply and commit them all with commit_change_set.
+        A session that already has an open change set for the target gets that one back.
+
+        Args:
+            description: Optional note shown with the change set
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: The change set id
+        """
+        try:
+            name = target or runtime.registry.default
+            runtime.registry.spec(name)
+            change_set = change_sets.begin(name, sessionId, description)
+            runtime.logger.info(f"Change set {change_set.id} open on '{name}' ({len(change_set.changes)} staged)")
+            return f"✓ Change set {change_set.id} open on '{name}' ({len(change_set.changes)} change(s) staged)"
+        except Exception as e:
+            runtime.logger.error(f"Failed to begin change set: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def get_change_set(
+        change_set_id: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Show a change set's staged changes and commit status.
+
+        Args:
+            change_set_id: Change set id; without it, every change set of this session is listed
+
+        Returns:
+            str: State, commit job status and staged changes
+        """
+        try:
+            if change_set_id:
+                return _describe(change_sets.get(change_set_id))
+            found = change_sets.for_session(sessionId)
+            if not found:
+                return "No change sets."
+            return "\n".join(_describe(change_set, verbose=False) for change_set in found)
+        except Exception as e:
+            runtime.logger.error(f"Failed to get change set: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def discard_change_set(
+        change_set_id: str,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Drop an open change set without applying it.
+
+        Args:
+            change_set_id: Change set id
+
+        Returns:
+            str: Success or error message
+        """
+        try:
+            change_set = change_sets.get(change_set_id)
+            if change_set.state != OPEN:
+                return f"✗ Error: change set {change_set.id} is {change_set.state} and can't be discarded"
+            change_set.state = DISCARDED
+            runtime.logger.info(f"Discarded change set {change_set.id} ({len(change_set.changes)} changes)")
+            return f"✓ Discarded change set {change_set.id} ({len(change_set.changes)} change(s))"
+        except Exception as e:
+            runtime.logger.error(f"Failed to discard change set: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def commit_change_set(
+        change_set_id: str,
+        commit: bool = True,
+        wait: float = 30,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Apply a change set in one multi-config call and commit it.
+        The commit is partial, limited to the target's commit admin, when one is configured.
+
+        Args:
+            change_set_id: Change set id
+            commit: Commit after applying; False leaves the changes in candidate config (default: True)
+            wait: Seconds to wait for the commit job before returning; it keeps running
+                  afterwards, check it with get_change_set (default: 30)
+
+        Returns:
+            str: Change set state and commit job status
+        """
+        try:
+            change_set = change_sets.get(change_set_id)
+            if change_set.state in (COMMITTING, COMMITTED, FAILED):
+                return _describe(change_set)
+            if change_set.state == PUSHING:
+                return f"✗ Error: change set {change_set.id} is already being applied by another call"
+            if change_set.state not in (OPEN, PUSHED):
+                return f"✗ Error: change set {change_set.id} is {change_set.state}"
+            if not change_set.changes:
+                return f"✗ Error: change set {change_set.id} has no changes"
+            fw = runtime.get_firewall(change_set.target)
+
+            if change_set.state == OPEN:
+                try:
+                    await push_change_set(fw, change_set)
+                except Exception as e:
+                    # multi-config is all-or-nothing, so the candidate config is unchanged
+                    runtime.logger.error(f"Change set {change_set.id} rejected: {str(e)}")
+                    return f"✗ Error: change set {change_set.id} was rejected, nothing was applied: {str(e)}"
+                runtime.logger.info(f"Applied change set {change_set.id} ({len(change_set.changes)} changes)")
+            if not commit:
+                return f"✓ {_describe(change_set, verbose=False)}\nChanges are in candidate config, not committed."
+
+            await start_commit(fw, change_set, runtime.registry.commit_admin(change_set.target))
+            if change_set.task is not None and wait > 0:
+                # Shield so a client timeout doesn't cancel the background poller
+                await asyncio.wait({asyncio.shield(change_set.task)}, timeout=wait)
+            mark = "✗" if change_set.state == FAILED else "✓"
+            return f"{mark} {_describe(change_set, verbose=False)}"
+        except Exception as e:
+            runtime.logger.error(f"Failed to commit change set: {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -0,0 +1,40 @@
+from core.device import api_device
+from core.executor import run_blocking
+from core.snapshot import export_snapshot
+from typing import Optional
+
+def register(server, runtime):
+    @server.tool()
+    async def export_config_snapshot(
+        source: str = "running",
+        name: Optional[str] = None,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Save the firewall's full configuration to a compressed snapshot file, for offline analysis.
+        Args:
+            source (str): "running" or "candidate" config (default: running)
+            name (str): Snapshot file name under MCP_SNAPSHOT_DIR (default: <target>-<source>-<timestamp>.xml.gz)
+            target (str): Registry target name (default: the default target)
+        Returns:
+            str: Snapshot path and size, and how to serve it offline
+        """
+        try:
+            fw = runtime.get_firewall(target)
+            target_name = target or runtime.registry.default
+            result = await run_blocking(fw, export_snapshot, api_device(fw), target_name, source, name)
+            runtime.logger.info(f"Exported {source} config of '{target_name}' to {result['path']}")
+            return (
+                f"✓ Saved {source} config of '{target_name}' to {result['path']}\n"
+                f"  Size: {result['xml_bytes'] / 1024:.1f} KiB XML, {result['file_bytes'] / 1024:.1f} KiB on disk "
+                f"in {result['seconds']:.2f}s\n"
+                f"  Serve it offline with {{\"snapshot\": \"{result['path']}\"}} in the targets file, "
+                f"or MCP_SNAPSHOT_FILE={result['path']}"
+            )
+        except Exception as e:
+            runtime.logger.error(f"Failed to export config snapshot: {str(e)}")
+            return f"✗ Error: {str(e)}"
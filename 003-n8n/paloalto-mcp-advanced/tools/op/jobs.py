@@ -0,0 +1,139 @@
+"""
+Job Tools
+"""
+import time
+from core.executor import run_blocking
+from core.jobs import commit, job_tracker
+from typing import Optional
+
+
+def _format(job) -> str:
+    status = job.status
+    if job.finished is None:
+        state = status.get("status") or "started"
+    else:
+        state = "finished" if not job.error else "failed"
+    line = (
+        f"Job {job.id} on '{job.target}'"
+        + (f" ({job.kind}{': ' + job.description if job.description else ''})" if job.kind else "")
+        + f": {state}"
+        + (f", result {status['result']}" if status.get("result") else "")
+        + (f", {status['progress']}%" if status.get("progress") is not None else "")
+        + f", {(job.finished or time.time()) - job.started:.0f}s"
+    )
+    lines = [line]
+    lines.extend(f"  {detail}" for detail in status.get("details") or [])
+    lines.extend(f"  warning: {warning}" for warning in status.get("warnings") or [])
+    if job.error:
+        lines.append(f"  error: {job.error}")
+    return "\n".join(lines)
+
+
+def register(server, runtime):
+    """Register the job tools with the MCP server."""
+
+    @server.tool()
+    async def start_commit(
+        description: str = "",
+        partial: bool = True,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Start a commit and return its job id without waiting for it.
+        Follow it with get_job_status or wait_job.
+
+        Args:
+            description: Optional commit description
+            partial: Commit only the target's commit admin's changes, when one is configured (default: True)
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: The commit job id
+        """
+        try:
+            name = target or runtime.registry.default
+            fw = runtime.get_firewall(name)
+            admin = runtime.registry.commit_admin(name) if partial else None
+            job_id = await run_blocking(fw, commit, fw, admin, description or None)
+            if job_id is None:
+                return f"✓ Nothing to commit on '{name}'"
+            job_tracker.track(fw, name, job_id, "commit", description)
+            scope = f"partial for admin '{admin}'" if admin else "full"
+            runtime.logger.info(f"Started commit job {job_id} on '{name}' ({scope})")
+            return f"✓ Commit job {job_id} started on '{name}' ({scope})"
+        except Exception as e:
+            runtime.logger.error(f"Failed to start commit: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def get_job_status(
+        job_id: Optional[str] = None,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Status of a job (commit, software download, ...) without waiting.
+        Jobs not started by this server, e.g. from run_op_command, are tracked from now on.
+
+        Args:
+            job_id: Job id; without it, every tracked job is listed
+            target: Registry target name (default: the default target; all targets when listing)
+
+        Returns:
+            str: Job state, result, progress and details
+        """
+        try:
+            if not job_id:
+                jobs = job_tracker.jobs(target)
+                if not jobs:
+                    return "No tracked jobs."
+                return "\n".join(_format(job) for job in jobs)
+            name = target or runtime.registry.default
+            fw = runtime.get_firewall(name)
+            job = job_tracker.get(fw, job_id)
+            if job is None:
+                job = job_tracker.track(fw, name, str(int(job_id)))
+            return _format(job)
+        except Exception as e:
+            runtime.logger.error(f"Failed to get job status: {str(e)}")
+            return f"✗ Error: {str(e)}"
+
+    @server.tool()
+    async def wait_job(
+        job_id: str,
+        timeout: float = 60,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Wait for a job to finish, up to timeout seconds. The job keeps running after a timeout.
+
+        Args:
+            job_id: Job id
+            timeout: Max seconds to wait (default: 60)
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: Job state, result, progress and details
+        """
+        try:
+            name = target or runtime.registry.default
+            fw = runtime.get_firewall(name)
+            job = job_tracker.get(fw, job_id) or job_tracker.track(fw, name, str(int(job_id)))
+            await job_tracker.wait(job, timeout)
+            if job.finished is None:
+                return f"⚠ Still running after {timeout:.0f}s\n{_format(job)}"
+            return f"{'✓' if job.ok else '✗'} {_format(job)}"
+        except Exception as e:
+            runtime.logger.error(f"Failed to wait for job {job_id}: {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -0,0 +1,33 @@
+from typing import Optional
+
+def register(server, runtime):
+    @server.tool()
+    async def list_targets(
+        tag: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        List the firewalls, Panorama, device groups and vsys this server can manage.
+        Args:
+            tag: Only show targets with this tag
+        Returns:
+            str: One line per target name, type, location and tags
+        """
+        try:
+            rows = runtime.registry.describe()
+            if tag:
+                rows = [row for row in rows if tag in row["tags"]]
+            if not rows:
+                return "No targets found."
+            lines = [f"Targets ({len(rows)}):"]
+            for row in rows:
+                flags = " (default)" if row["default"] else ""
+                tags = f" [{', '.join(row['tags'])}]" if row["tags"] else ""
+                lines.append(f"- {row['name']}{flags}: {row['type']} {row['location']}{tags}")
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to list targets: {str(e)}")
+            return f"✗ Error: {str(e)}"
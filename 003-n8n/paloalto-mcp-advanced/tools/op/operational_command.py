@@ -1,14 +1,30 @@
-from main import get_firewall, logger
-from typing import Optional
+import itertools
+import json
+import xml.etree.ElementTree as ET
+from fastmcp import Context
+from core.executor import run_op
+from core.output import OP_MAX_BYTES, OP_MAX_ROWS, element_to_data, iter_rows, select_fields, shape_output, truncate_text
+from core.stream import can_stream, stream_rows
+from core.tracing import span
+from typing import List, Optional, Union
 
-def register(server):
+def register(server, runtime):
     @server.tool()
     async def run_op_command(
         command: str,
+        xpath: Optional[str] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        limit: int = OP_MAX_ROWS,
+        cursor: Optional[str] = None,
+        max_bytes: int = OP_MAX_BYTES,
+        output: str = "json",
+        stream: bool = False,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
-        toolCallId: Optional[str] = None
+        toolCallId: Optional[str] = None,
+        ctx: Context = None
     ) -> str:
         """
         Run an operational CLI command on the Palo Alto firewall.
@@ -18,24 +34,73 @@ def register(server):
                 - "show interface all"
                 - "show session info"
                 - "request system software info"
+            xpath (str): Rows to return, relative to <result> (e.g. "entry" for "show session all")
+            fields (str): Fields to keep per row (list or comma-separated, "a/b" for nested fields)
+            limit (int): Max rows per page (default: 100)
+            cursor (str): next_cursor from a previous call to get the next page
+            max_bytes (int): Size budget for the returned output (default: 20000)
+            output (str): "json" (structured, paginated) or "xml" (raw, truncated to max_bytes)
+            stream (bool): Send the rows as progress notifications, one JSON row per line in chunks,
+                           instead of in the result; limit then caps the streamed rows and max_bytes
+                           does not apply (needs a client that sends a progressToken)
+            target (str): Registry target name (default: the default target)
         Returns:
-            str: Raw XML or text output from the firewall
+            str: JSON page of the output, or raw XML
         """
         try:
             if not command:
                 return "✗ Error: command is required"
-            fw = get_firewall()
-            logger.info(f"Running operational command: {command}")
-            # Run op command
-            result = fw.op(
-                command,
-                xml=True
-            )
-            # result is a dict (XML parsed)
-            # Convert nicely to string for readability
-            output = result if isinstance(result, str) else str(result)
-            
-            return f"✓ Output for '{command}':\n\n{output}"
+            if output not in ("json", "xml"):
+                return "✗ Error: output must be 'json' or 'xml'"
+            if cursor is not None and not str(cursor).isdigit():
+                return f"✗ Error: invalid cursor '{cursor}'"
+            fw = runtime.get_firewall(target)
+            runtime.logger.info(f"Running operational command: {command}")
+            # Device groups run op commands on their Panorama
+            result = await run_op(fw, command)
+            text = result.decode() if isinstance(result, bytes) else str(result)
+            if output == "xml":
+                return f"✓ Output for '{command}':\n\n{truncate_text(text, max_bytes)}"
+
+            if isinstance(fields, str):
+                fields = [f.strip() for f in fields.split(',') if f.strip()]
+            if stream and can_stream(ctx):
+                offset = int(cursor or 0)
+                with span("stream"):
+                    rows_xpath, rows = iter_rows(text, xpath)
+                    skipped = sum(1 for _ in itertools.islice(rows, offset))
+                    page = (
+                        json.dumps(select_fields(element_to_data(row), fields or None), separators=(",", ":"))
+                        for row in itertools.islice(rows, max(limit, 1))
+                    )
+                    sent = await stream_rows(ctx, page)
+                    if rows_xpath is not None:
+                        # Count what is left without converting it
+                        total = skipped + sent["rows"] + sum(1 for _ in rows)
+                        next_offset = skipped + sent["rows"]
+                        summary = {
+                            "rows_xpath": rows_xpath,
+                            "total": total,
+                            "offset": offset,
+                            "returned": sent["rows"],
+                            "streamed_chunks": sent["chunks"],
+                            "next_cursor": str(next_offset) if next_offset < total else None,
+                            "truncated": False,
+                        }
+                        return f"✓ Output for '{command}' (rows streamed as progress notifications):\n\n{json.dumps(summary, indent=1)}"
+                # No repeated rows to stream: return the output as usual
+            with span("xml.parse"):
+                root = ET.fromstring(text)
+            with span("format"):
+                page = shape_output(
+                    root,
+                    xpath=xpath,
+                    fields=fields or None,
+                    limit=limit,
+                    offset=int(cursor or 0),
+                    max_bytes=max_bytes,
+                )
+                return f"✓ Output for '{command}':\n\n{json.dumps(page, indent=1)}"
         except Exception as e:
-            logger.error(f"Failed to run op command '{command}': {str(e)}")
+            runtime.logger.error(f"Failed to run op command '{command}': {str(e)}")
             return f"✗ Error: {str(e)}"
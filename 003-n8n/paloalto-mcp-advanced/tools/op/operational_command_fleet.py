@@ -0,0 +1,101 @@
+import json
+import time
+import xml.etree.ElementTree as ET
+from fastmcp import Context
+from core.executor import run_op
+from core.fleet import FLEET_CONCURRENCY, FLEET_TIMEOUT, fan_out
+from core.output import OP_MAX_BYTES, OP_MAX_ROWS, shape_output
+from typing import List, Optional, Union
+
+def _as_list(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [v.strip() for v in value if v.strip()]
+
+def register(server, runtime):
+    @server.tool()
+    async def run_op_command_fleet(
+        command: str,
+        targets: Optional[Union[str, List[str]]] = None,
+        tags: Optional[Union[str, List[str]]] = None,
+        xpath: Optional[str] = None,
+        fields: Optional[Union[str, List[str]]] = None,
+        limit: int = OP_MAX_ROWS,
+        max_bytes: int = OP_MAX_BYTES,
+        timeout: float = FLEET_TIMEOUT,
+        max_parallel: int = FLEET_CONCURRENCY,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None,
+        ctx: Context = None
+    ) -> str:
+        """
+        Run an operational CLI command on many firewalls in parallel.
+        Args:
+            command (str): Operational command, e.g. "show session info"
+            targets (str): Target names (list or comma-separated); default: all firewall targets
+            tags (str): Only targets with any of these tags (list or comma-separated)
+            xpath (str): Rows to return per device, relative to <result> (e.g. "entry")
+            fields (str): Fields to keep per row (list or comma-separated)
+            limit (int): Max rows per device (default: 100)
+            max_bytes (int): Size budget for all devices together, split evenly (default: 20000)
+            timeout (float): Seconds to wait for each device (default: 30)
+            max_parallel (int): Max devices queried at once (default: 32)
+        Returns:
+            str: Summary plus the JSON output (or error) of every device, in target order
+        """
+        try:
+            if not command:
+                return "✗ Error: command is required"
+            names = runtime.registry.select(_as_list(targets), _as_list(tags))
+            if not names:
+                return "✗ Error: no targets matched"
+            runtime.logger.info(f"Running operational command on {len(names)} targets: {command}")
+
+            async def on_result(result, finished, total):
+                # Progress notifications let the client show devices as they answer
+                if ctx is not None:
+                    status = "ok" if result.ok else result.error
+                    await ctx.report_progress(finished, total, f"{result.target}: {status}")
+
+            fields = _as_list(fields)
+            device_budget = max(max_bytes // len(names), 1)
+            started = time.perf_counter()
+            results = await fan_out(
+                names,
+                runtime.get_firewall,
+                lambda fw: run_op(fw, command),
+                concurrency=max_parallel,
+                timeout=timeout,
+                on_result=on_result,
+            )
+            elapsed = time.perf_counter() - started
+
+            ok = 0
+            device_lines = []
+            for r in results:
+                error = r.error
+                if r.ok:
+                    # One device's unparsable output must not lose the others' results
+                    try:
+                        text = r.value.decode() if isinstance(r.value, bytes) else str(r.value)
+                        page = shape_output(
+                            ET.fromstring(text), xpath=xpath, fields=fields or None,
+                            limit=limit, max_bytes=device_budget,
+                        )
+                        ok += 1
+                        device_lines.append(f"\n✓ {r.target} ({r.elapsed:.2f}s):\n{json.dumps(page)}")
+                        continue
+                    except Exception as e:
+                        error = f"could not shape output: {str(e)}"
+                device_lines.append(f"\n✗ {r.target} ({r.elapsed:.2f}s): {error}")
+            mark = "✓" if ok == len(results) else ("✗" if not ok else "⚠")
+            lines = [f"{mark} '{command}' succeeded on {ok}/{len(results)} targets in {elapsed:.2f}s"]
+            lines.extend(device_lines)
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to run fleet op command '{command}': {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -0,0 +1,88 @@
+from core.executor import executor_stats
+from core.cache import config_cache
+from core.jobs import job_tracker
+from core.runtime import Runtime
+from core.transport import transport_stats
+from typing import Optional
+
+def register(server, runtime):
+    @server.tool()
+    async def get_server_stats(
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Show MCP server runtime statistics (startup time, executor queue depth, running calls per firewall, config cache, job polling, connection reuse).
+        Returns:
+            str: Formatted statistics
+        """
+        try:
+            startup = runtime.stats
+            lines = ["Runtime:"]
+            lines.append(
+                f"  Startup: init {startup['init_seconds']:.3f}s, {startup['tool_modules']} tool modules "
+                f"loaded in {startup['tools_seconds']:.3f}s"
+            )
+            if startup["cold_start_seconds"] is not None:
+                lines.append(f"  Cold start: {startup['cold_start_seconds']:.3f}s from process start to tools registered")
+            lines.append(
+                f"  Tools: {startup['lazy_tools']} from the manifest ({runtime.modules.loaded} modules loaded on call), "
+                f"{startup['eager_modules']} modules imported at boot"
+            )
+            if Runtime.instances != 1:
+                lines.append(f"  Warning: {Runtime.instances} runtimes in this process")
+            stats = executor_stats()
+            lines.append("Executor:")
+            lines.append(f"  Workers: {stats['max_workers']} (per firewall: {stats['per_firewall_limit']})")
+            lines.append(f"  Queue depth: {stats['queue_depth']} (max {stats['max_queue_depth']})")
+            lines.append(f"  Running: {stats['running']}")
+            lines.append(f"  Completed: {stats['completed']}, failed: {stats['failed']}")
+            lines.append(f"  Total queue wait: {stats['total_wait_seconds']:.3f}s")
+            lines.append(
+                f"  Show commands: {stats['op_reads']['calls']} API calls, "
+                f"{stats['op_reads']['coalesced']} coalesced into in-flight calls"
+            )
+            for key, device in stats["firewalls"].items():
+                lines.append(
+                    f"  {key}: calls {device['calls']}, running {device['running']}, "
+                    f"queued {device['waiting'] + device['pending']}"
+                )
+            cache = config_cache.info()
+            lines.append("Config cache:")
+            lines.append(f"  Entries: {cache['entries']} (TTL {cache['ttl']:g}s, revalidate {cache['revalidate']})")
+            lines.append(
+                f"  Hits: {cache['hits']}, misses: {cache['misses']}, revalidated: {cache['revalidated']}, "
+                f"hit ratio: {cache['hit_ratio']:.1%}"
+            )
+            lines.append(f"  Loads: {cache['loads']}, coalesced into in-flight loads: {cache['coalesced']}")
+            lines.append(f"  Invalidations: {cache['invalidations']}")
+            sync = runtime.config_sync.info()
+            if sync["enabled"]:
+                lines.append(f"Config sync (every {sync['interval']:g}s, {'running' if sync['running'] else 'idle'}):")
+                lines.append(
+                    f"  Polls: {sync['polls']} ({sync['log_queries']} config log queries in {sync['log_requests']} requests, "
+                    f"{sync['fetch_calls']} fetch calls), errors: {sync['errors']}"
+                )
+                lines.append(
+                    f"  Changes: {sync['changes']}, objects fetched: {sync['objects_fetched']}, "
+                    f"entries updated: {sync['entries_updated']}, dropped for reload: {sync['entries_dropped']}"
+                )
+            jobs = job_tracker.info()
+            lines.append("Job tracker:")
+            lines.append(
+                f"  Tracked: {jobs['tracked']}, outstanding: {jobs['outstanding']}, finished: {jobs['finished']}"
+            )
+            lines.append(f"  Polls: {jobs['polls']} ({jobs['api_calls']} API calls, every {jobs['interval']:g}s)")
+            lines.append("HTTP connection pools:")
+            for endpoint, pool in transport_stats().items():
+                lines.append(
+                    f"  {endpoint}: requests {pool['requests']}, opened {pool['connections_opened']}, "
+                    f"reused {pool['connections_reused']}, TLS resumed {pool['tls_sessions_resumed']}, "
+                    f"idle {pool['idle']}, errors {pool['errors']}"
+                )
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to get server stats: {str(e)}")
+            return f"✗ Error: {str(e)}"
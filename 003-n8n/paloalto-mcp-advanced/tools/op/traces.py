@@ -0,0 +1,54 @@
+import asyncio
+from core.tracing import TRACING_ENABLED, export_path, recent_traces, trace_path, write_trace
+from typing import Optional
+
+# Top-level spans shown in the per-call breakdown
+BREAKDOWN = ("executor.wait", "executor.run", "http.request", "xml.parse", "filter", "format")
+
+def register(server, runtime):
+    @server.tool()
+    async def export_traces(
+        session: Optional[str] = None,
+        tool_call: Optional[str] = None,
+        limit: int = 20,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Export recent tool call traces (MCP_TRACING=true) as one Chrome trace file and summarize them.
+        Args:
+            session: sessionId whose calls to export (default: the calling session)
+            tool_call: Only the call with this toolCallId
+            limit: Max calls to summarize and export, most recent last (default: 20)
+        Returns:
+            str: Trace file path and per-call time breakdown
+        """
+        try:
+            if not TRACING_ENABLED:
+                return "✗ Error: tracing is disabled, set MCP_TRACING=true"
+            session = session or sessionId
+            # This call's own trace is only recorded once it returns
+            traces = recent_traces(session, tool_call)[-max(limit, 1):]
+            if not traces:
+                return f"No traces recorded for session '{session or '-'}'."
+            path = trace_path(traces[0]) if len(traces) == 1 else export_path(session)
+            await asyncio.to_thread(write_trace, traces, path)
+
+            lines = [f"✓ Wrote {len(traces)} trace(s) to {path}", ""]
+            for trace in traces:
+                totals = trace.breakdown()
+                parts = [f"{name} {totals[name] * 1000:.1f}ms" for name in BREAKDOWN if name in totals]
+                if "executor.run" in totals:
+                    # Rest of the blocking call: pan-os-python building objects from the parsed XML
+                    objects = totals["executor.run"] - totals.get("http.request", 0) - totals.get("xml.parse", 0)
+                    parts.append(f"objects {max(objects, 0) * 1000:.1f}ms")
+                lines.append(
+                    f"- {trace.tool} ({trace.tool_call_id or trace.id}): {trace.duration * 1000:.1f}ms"
+                    + (f" = {', '.join(parts)}" if parts else "")
+                )
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to export traces: {str(e)}")
+            return f"✗ Error: {str(e)}"
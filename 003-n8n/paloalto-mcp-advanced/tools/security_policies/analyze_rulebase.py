@@ -0,0 +1,67 @@
+from core.analysis import KINDS, get_rulebase_analysis
+from core.query import LIST_PAGE_SIZE, page_footer, paginate
+from typing import List, Optional, Union
+
+def register(server, runtime):
+    @server.tool()
+    async def analyze_rulebase(
+        kinds: Optional[Union[str, List[str]]] = None,
+        cursor: Optional[str] = None,
+        limit: int = LIST_PAGE_SIZE,
+        refresh: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Find shadowed, redundant, duplicate and overlapping security rules in the cached rulebase.
+        Args:
+            kinds: Finding kinds to list: shadowed, redundant, duplicate, overlap
+                   (list or comma-separated; default: all)
+            cursor: Cursor from the previous page
+            limit: Max findings per page (default: 100)
+            refresh: Bypass the config cache and read from the firewall (default: False)
+            target: Registry target name (default: the default target)
+        Returns:
+            str: Totals per kind, then one line per finding in rulebase order
+        """
+        try:
+            if isinstance(kinds, str):
+                kinds = kinds.split(',')
+            wanted = [k.strip().lower() for k in kinds or [] if k.strip()] or list(KINDS)
+            unknown = [k for k in wanted if k not in KINDS]
+            if unknown:
+                return f"✗ Error: unknown kinds {unknown}, expected {list(KINDS)}"
+
+            fw = runtime.get_firewall(target)
+            analysis = await get_rulebase_analysis(fw, refresh=refresh)
+            matched = [f for f in analysis["findings"] if f.kind in wanted]
+            page, start, next_cursor = paginate(matched, cursor, limit)
+
+            counts = analysis["counts"]
+            runtime.logger.info(f"Analyzed {analysis['analyzed']} rules in {analysis['seconds']:.2f}s")
+            output = [
+                f"Rulebase analysis: {analysis['analyzed']} enabled of {analysis['rules']} rules "
+                f"in {analysis['seconds']:.2f}s",
+                ", ".join(f"{counts[kind]} {kind}" for kind in KINDS),
+                "",
+            ]
+            for finding in page:
+                if finding.kind == "overlap":
+                    more = finding.related_count - len(finding.related)
+                    detail = f"partly matched first by {', '.join(finding.related)}" + (f" and {more} more" if more > 0 else "")
+                elif finding.kind == "shadowed":
+                    detail = f"never hit, fully covered by {finding.related[0]} with a different action"
+                elif finding.kind == "duplicate":
+                    detail = f"same match criteria and action as {finding.related[0]}"
+                else:
+                    detail = f"fully covered by {finding.related[0]} with the same action"
+                output.append(f"- #{finding.position + 1} {finding.rule} [{finding.kind}]: {detail}")
+            output.append("")
+            output.append(page_footer(start, page, len(matched), next_cursor))
+            return "\n".join(output)
+        except Exception as e:
+            runtime.logger.error(f"Failed to analyze rulebase: {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -0,0 +1,190 @@
+import time
+from panos.policies import SecurityRule
+from core.bulk import (
+    BULK_CHUNK_SIZE, format_results, move_action, multi_config, parse_payload, push_in_chunks, set_action,
+)
+from core.cache import config_cache
+from core.config import SECURITY_RULES, get_rulebase, get_security_rules
+from core.executor import run_blocking
+from typing import List, Optional, Union
+
+COLUMNS = [
+    "name", "source_zone", "destination_zone", "source_address",
+    "destination_address", "application", "action_type", "description",
+]
+ACTIONS = ("allow", "deny", "drop", "reset-client", "reset-server", "reset-both")
+LOCATIONS = ("top", "bottom", "before", "after")
+MAX_NAME_LENGTH = 63
+
+
+def _as_list(value) -> List[str]:
+    """Accept a list or a comma-separated string, like the single-rule tools."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _build_rule(item: dict):
+    """Validate one rule definition. Returns (SecurityRule, None) or (None, error)."""
+    name = (item.get("name") or "").strip()
+    if not name:
+        return None, "name is required"
+    if len(name) > MAX_NAME_LENGTH:
+        return None, f"name longer than {MAX_NAME_LENGTH} characters"
+    fields = {}
+    for column, attr in (
+        ("source_zone", "fromzone"),
+        ("destination_zone", "tozone"),
+        ("source_address", "source"),
+        ("destination_address", "destination"),
+    ):
+        fields[attr] = _as_list(item.get(column))
+        if not fields[attr]:
+            return None, f"{column} is required"
+    action_type = (item.get("action_type") or item.get("action") or "allow").strip()
+    if action_type not in ACTIONS:
+        return None, f"invalid action_type '{action_type}' (expected one of {', '.join(ACTIONS)})"
+    rule = SecurityRule(
+        name=name,
+        application=_as_list(item.get("application")) or ["any"],
+        action=action_type,
+        description=item.get("description") or None,
+        **fields,
+    )
+    return rule, None
+
+
+async def _place(fw, rules: list, location: str, ref_rule: Optional[str], chunk_size: int) -> tuple:
+    """
+    Move new rules into place as a block in payload order, each after the one before it.
+
+    Chunks are pushed in order and halved on failure like push_in_chunks(), but a
+    rule whose move fails is skipped as an anchor: the rules after it are placed
+    after the last rule that did move (or at location/ref_rule if none has yet).
+
+    Returns:
+        ({name: error} for rules that could not be moved, api_calls)
+    """
+    errors, calls = {}, 0
+    where, dst = location, ref_rule
+    start, size = 0, chunk_size
+    while start < len(rules):
+        chunk = rules[start:start + size]
+        actions = []
+        chunk_where, chunk_dst = where, dst
+        for rule in chunk:
+            actions.append(move_action(rule, chunk_where, chunk_dst))
+            chunk_where, chunk_dst = "after", rule.name
+        calls += 1
+        try:
+            await run_blocking(fw, multi_config, fw, actions)
+        except Exception as e:
+            if len(chunk) > 1:
+                size = len(chunk) // 2
+                continue
+            errors[chunk[0].name] = f"created but not moved: {e}"
+            start += 1
+            size = chunk_size
+            continue
+        where, dst = "after", chunk[-1].name
+        start += len(chunk)
+    return errors, calls
+
+
+def register(server, runtime):
+    @server.tool()
+    async def bulk_create_security_policies(
+        payload: Union[str, List[dict]],
+        location: Optional[str] = None,
+        ref_rule: Optional[str] = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        verbose: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Create many security policies using chunked multi-config API calls, optionally placing them as a block.
+
+        Args:
+            payload: List of rules, JSON array or CSV with columns
+                     name,source_zone,destination_zone,source_address,destination_address,application,action_type,description
+                     (multi-value fields can be comma-separated or JSON lists)
+            location: Where to place the new rules: top, bottom, before or after (default: bottom)
+            ref_rule: Existing rule name for location before/after
+            chunk_size: Rules per API call (default: 500)
+            verbose: List every rule in the result, not only failures
+            target: Registry target name (default: the default target)
+
+        Returns:
+            str: Summary with throughput (rules/sec) and per-rule failures
+        """
+        try:
+            if chunk_size < 1:
+                return "✗ Error: chunk_size must be at least 1"
+            if location and location not in LOCATIONS:
+                return f"✗ Error: location must be one of {', '.join(LOCATIONS)}"
+            if location in ("before", "after") and not ref_rule:
+                return f"✗ Error: ref_rule is required for location '{location}'"
+            items = parse_payload(payload, COLUMNS)
+            if not items:
+                return "✗ Error: payload contains no security policies"
+
+            started = time.perf_counter()
+            fw = runtime.get_firewall(target)
+            rulebase = get_rulebase(fw)
+            existing = {rule.name for rule in await get_security_rules(fw)}
+            if ref_rule and ref_rule not in existing:
+                return f"✗ Error: ref_rule '{ref_rule}' not found"
+
+            # Validate everything locally before touching the device
+            errors, rules, seen, names = {}, [], set(), []
+            for index, item in enumerate(items):
+                rule, error = _build_rule(item)
+                names.append(rule.name if rule is not None else (item.get("name") or "").strip() or "<missing name>")
+                if error is None and rule.name in existing:
+                    error = "already exists"
+                if error is None and rule.name in seen:
+                    error = "duplicate name in payload"
+                if error:
+                    errors[index] = error
+                    continue
+                seen.add(rule.name)
+                rule.parent = rulebase
+                rules.append(rule)
+
+            pushed = {"results": {}, "api_calls": 0}
+            moves = 0
+            if rules:
+                try:
+                    pushed = await push_in_chunks(fw, [set_action(r) for r in rules], chunk_size)
+                    # New rules land at the bottom; chain moves so the block keeps payload order
+                    created = [r for r in rules if not pushed["results"].get(r.name)]
+                    if created and location in ("top", "before", "after"):
+                        unplaced, moves = await _place(fw, created, location, ref_rule, chunk_size)
+                        pushed["results"].update(unplaced)
+                finally:
+                    config_cache.invalidate(fw, SECURITY_RULES)
+
+            elapsed = time.perf_counter() - started
+            results = [
+                (name, errors.get(index) or pushed["results"].get(name))
+                for index, name in enumerate(names)
+            ]
+            ok = sum(1 for _, error in results if not error)
+            runtime.logger.info(f"Bulk created {ok}/{len(results)} security policies in {elapsed:.2f}s")
+            summary = format_results(
+                "Created", "security policies", results, pushed["api_calls"] + moves, verbose
+            )
+            lines = summary.split("\n")
+            lines.insert(1, f"  Throughput: {ok / elapsed if elapsed else 0:.1f} rules/sec ({elapsed:.2f}s)")
+            if location and location != "bottom":
+                lines.insert(2, f"  Placement: {location}{' ' + ref_rule if ref_rule else ''} ({moves} move call(s))")
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to bulk create security policies: {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -1,8 +1,12 @@
-from panos.policies import Rulebase, SecurityRule
-from main import get_firewall, logger
+from panos.policies import SecurityRule
+from core.executor import run_blocking
+from core.cache import config_cache
+from core.config import SECURITY_RULES, get_rulebase
+from core.bulk import set_action
+from core.changeset import change_sets
 from typing import Optional
 
-def register(server):
+def register(server, runtime):
     @server.tool()
     async def create_security_policy(
         name: str,
@@ -13,6 +17,8 @@ def register(server):
         application: str = "any",
         action_type: str = "allow",
         description: str = "",
+        change_set_id: Optional[str] = None,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
@@ -30,15 +36,17 @@ def register(server):
             application: Application name (can be comma-separated for multiple, e.g., "dns,ssh", default: 'any')
             action_type: 'allow' or 'deny' (default: 'allow')
             description: Optional description
+            change_set_id: Stage the change in this change set instead of applying it (see begin_change_set)
+            target: Registry target name (default: the default target)
     
         Returns:
             str: Success or error message
         """
         try:
-            fw = get_firewall()
+            change_set = change_sets.get(change_set_id, target) if change_set_id else None
+            fw = runtime.get_firewall(change_set.target if change_set else target)
     
-            rulebase = Rulebase()
-            fw.add(rulebase)
+            rulebase = get_rulebase(fw)
     
             rule = SecurityRule(
                 name=name,
@@ -51,12 +59,19 @@ def register(server):
                 description=description,
             )
     
+            if change_set:
+                rule.parent = rulebase
+                change_set.stage(set_action(rule), SECURITY_RULES, f"create security policy '{name}'")
+                runtime.logger.info(f"Staged security policy {name} in change set {change_set.id}")
+                return f"✓ Staged creation of security policy '{name}' in change set {change_set.id} ({len(change_set.changes)} change(s))"
+
             rulebase.add(rule)
-            rule.create()
+            await run_blocking(fw, rule.create)
+            config_cache.invalidate(fw, SECURITY_RULES)
     
-            logger.info(f"Created security policy: {name}")
+            runtime.logger.info(f"Created security policy: {name}")
             return f"✓ Successfully created security policy '{name}'"
     
         except Exception as e:
-            logger.error(f"Failed to create security policy '{name}': {str(e)}")
+            runtime.logger.error(f"Failed to create security policy '{name}': {str(e)}")
             return f"✗ Error: {str(e)}"
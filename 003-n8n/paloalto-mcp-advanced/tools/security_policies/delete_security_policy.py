@@ -1,11 +1,16 @@
-from panos.policies import Rulebase, SecurityRule
-from main import get_firewall, logger
+from core.executor import run_blocking
+from core.cache import config_cache
+from core.config import SECURITY_RULES, fetch_security_rule, delete_object
+from core.bulk import delete_action
+from core.changeset import change_sets
 from typing import Optional
 
-def register(server):
+def register(server, runtime):
     @server.tool()
     async def delete_security_policy(
         name: str,
+        change_set_id: Optional[str] = None,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
@@ -15,24 +20,28 @@ def register(server):
         Delete a security policy by name.
         Args:
             name: Name of the security rule to delete
+            change_set_id: Stage the change in this change set instead of applying it (see begin_change_set)
+            target: Registry target name (default: the default target)
         Returns:
             str: Success or error message
         """
         try:
             if not name:
                 return "✗ Error: Rule name is required"
-            fw = get_firewall()
-            rulebase = Rulebase()
-            fw.add(rulebase)
-            # Pull existing rules
-            rulebase.refresh()
-            # Find rule
-            rule = rulebase.find(name, SecurityRule)
+            change_set = change_sets.get(change_set_id, target) if change_set_id else None
+            fw = runtime.get_firewall(change_set.target if change_set else target)
+            # Fetch only this rule by XPath
+            rule = await run_blocking(fw, fetch_security_rule, fw, name)
             if not rule:
                 return f"✗ Error: Security policy '{name}' not found"
-            rule.delete()
-            logger.info(f"Deleted security policy: {name}")
+            if change_set:
+                change_set.stage(delete_action(rule), SECURITY_RULES, f"delete security policy '{name}'")
+                runtime.logger.info(f"Staged security policy deletion {name} in change set {change_set.id}")
+                return f"✓ Staged deletion of security policy '{name}' in change set {change_set.id} ({len(change_set.changes)} change(s))"
+            await run_blocking(fw, delete_object, rule)
+            config_cache.invalidate(fw, SECURITY_RULES)
+            runtime.logger.info(f"Deleted security policy: {name}")
             return f"✓ Successfully deleted security policy '{name}'"
         except Exception as e:
-            logger.error(f"Failed to delete security policy '{name}': {str(e)}")
+            runtime.logger.error(f"Failed to delete security policy '{name}': {str(e)}")
             return f"✗ Error: {str(e)}"
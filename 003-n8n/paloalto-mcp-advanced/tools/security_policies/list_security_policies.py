@@ -1,37 +1,86 @@
-from panos.policies import Rulebase, SecurityRule
-from main import get_firewall, logger
+from fastmcp import Context
+from core.config import get_security_rules
+from core.query import LIST_PAGE_SIZE, has_value, match_name, page_footer, paginate
+from core.stream import can_stream, stream_rows
+from core.tracing import span
 from typing import Optional
 
-def register(server):
+def format_rule(rule) -> str:
+    return (
+        f"- {rule.name}: from {rule.fromzone} to {rule.tozone}, "
+        f"src {rule.source}, dst {rule.destination}, application {rule.application}, action {rule.action}"
+    )
+
+def register(server, runtime):
     @server.tool()
     async def list_security_policies(
+        name: Optional[str] = None,
+        zone: Optional[str] = None,
+        address: Optional[str] = None,
+        application: Optional[str] = None,
+        tag: Optional[str] = None,
+        action_type: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = LIST_PAGE_SIZE,
+        refresh: bool = False,
+        stream: bool = False,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
-        toolCallId: Optional[str] = None
+        toolCallId: Optional[str] = None,
+        ctx: Context = None
     ) -> str:
         """
-        List all security policies on the Palo Alto firewall.
+        List security policies on the Palo Alto firewall, filtered and paginated.
+        Args:
+            name: Rule name glob, case-insensitive (e.g., "allow-*")
+            zone: Only rules with this source or destination zone
+            address: Only rules with this address (object name or literal) in source or destination
+            application: Only rules with this application
+            tag: Only rules with this tag
+            action_type: Only rules with this action (e.g., 'allow', 'deny')
+            cursor: Cursor from the previous page
+            limit: Max rules per page (default: 100)
+            refresh: Bypass the config cache and read from the firewall (default: False)
+            stream: Send the page as progress notifications in chunks instead of in the result
+                    (needs a client that sends a progressToken)
+            target: Registry target name (default: the default target)
         Returns:
             str: A formatted list of rule names and key fields
         """
         try:
-            fw = get_firewall()
-            rulebase = Rulebase()
-            fw.add(rulebase)
-            rulebase.refresh()
-            rules = rulebase.findall(SecurityRule)
+            fw = runtime.get_firewall(target)
+            rules = await get_security_rules(fw, refresh=refresh)
             if not rules:
                 return "No security policies found."
+            with span("filter"):
+                matched = [
+                    rule for rule in rules
+                    if (not name or match_name(rule.name, name))
+                    and (not zone or has_value(rule.fromzone, zone) or has_value(rule.tozone, zone))
+                    and (not address or has_value(rule.source, address) or has_value(rule.destination, address))
+                    and (not application or has_value(rule.application, application))
+                    and (not tag or has_value(rule.tag, tag))
+                    and (not action_type or (rule.action or "").lower() == action_type.lower())
+                ]
+            page, start, next_cursor = paginate(matched, cursor, limit)
             
-            logger.info(f"Found {len(rules)} security policies")
-            output = ["Security Policies:\n"]
-            for rule in rules:
-                output.append(
-                    f"- {rule.name}: from {rule.fromzone} to {rule.tozone}, "
-                    f"src {rule.source}, dst {rule.destination}, application {rule.application}, action {rule.action}"
+            runtime.logger.info(f"Found {len(rules)} security policies, {len(matched)} matching")
+            header = f"Security Policies ({len(matched)} of {len(rules)} matching)"
+            if stream and can_stream(ctx):
+                with span("stream"):
+                    sent = await stream_rows(ctx, (format_rule(rule) for rule in page), len(page))
+                return (
+                    f"{header}, {sent['rows']} streamed in {sent['chunks']} chunk(s).\n\n"
+                    f"{page_footer(start, page, len(matched), next_cursor)}"
                 )
-            return "\n".join(output)
+            with span("format"):
+                output = [f"{header}:\n"]
+                output.extend(format_rule(rule) for rule in page)
+                output.append("")
+                output.append(page_footer(start, page, len(matched), next_cursor))
+                return "\n".join(output)
         except Exception as e:
-            logger.error(f"Failed to list security policies: {str(e)}")
+            runtime.logger.error(f"Failed to list security policies: {str(e)}")
             return f"✗ Error: {str(e)}"
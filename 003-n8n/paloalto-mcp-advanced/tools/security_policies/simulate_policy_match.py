@@ -0,0 +1,85 @@
+import time
+from collections import Counter
+from core.bulk import parse_payload
+from core.policy import get_policy_model
+from typing import List, Optional, Union
+
+COLUMNS = ["source", "destination", "source_zone", "destination_zone", "protocol", "port", "application"]
+ALIASES = {"from": "source_zone", "to": "destination_zone", "src": "source", "dst": "destination"}
+
+def _normalize(item: dict) -> dict:
+    return {ALIASES.get(key, key): value for key, value in item.items()}
+
+def register(server, runtime):
+    @server.tool()
+    async def simulate_policy_match(
+        flows: Union[str, List[dict]],
+        limit: int = 200,
+        refresh: bool = False,
+        target: Optional[str] = None,
+        sessionId: Optional[str] = None,
+        action: Optional[str] = None,
+        chatInput: Optional[str] = None,
+        toolCallId: Optional[str] = None
+    ) -> str:
+        """
+        Evaluate flows against the cached security rulebase locally (no API call per flow).
+        Args:
+            flows: List of flows, JSON array or CSV with columns
+                   source,destination,source_zone,destination_zone,protocol,port,application
+                   (e.g., '[{"source": "10.1.2.3", "destination": "8.8.8.8", "source_zone": "trust",
+                   "destination_zone": "untrust", "protocol": "tcp", "port": 443}]');
+                   zones, protocol/port and application are optional and not checked when missing
+            limit: Max flows listed individually in the result (default: 200)
+            refresh: Bypass the config cache and read from the firewall (default: False)
+            target: Registry target name (default: the default target)
+        Returns:
+            str: Matching rule and action per flow, plus totals per action
+        """
+        try:
+            items = [_normalize(item) for item in parse_payload(flows, COLUMNS)]
+            if not items:
+                return "✗ Error: flows contains no flows"
+            fw = runtime.get_firewall(target)
+            model = await get_policy_model(fw, refresh=refresh)
+
+            started = time.perf_counter()
+            results = []
+            for item in items:
+                try:
+                    results.append((item, model.match(item), None))
+                except (KeyError, ValueError) as e:
+                    results.append((item, None, f"invalid flow: {str(e)}"))
+            elapsed = time.perf_counter() - started
+
+            actions = Counter(match["action"] for _, match, _ in results if match)
+            errors = sum(1 for _, _, error in results if error)
+            uncertain = sum(1 for _, match, _ in results if match and match["uncertain"])
+            runtime.logger.info(f"Simulated {len(items)} flows in {elapsed * 1000:.1f}ms")
+            lines = [
+                f"✓ Simulated {len(items)} flow(s) against {len(model.rules)} rules in {elapsed * 1000:.1f}ms: "
+                + ", ".join(f"{name} {count}" for name, count in actions.most_common())
+                + (f", invalid {errors}" if errors else "")
+            ]
+            if uncertain:
+                lines.append(f"  ⚠ {uncertain} flow(s) passed rules with unresolved fqdn/dynamic/unknown values")
+            for index, (item, match, error) in enumerate(results[:limit], 1):
+                flow = (
+                    f"{item.get('source')} -> {item.get('destination')}"
+                    + (f" {item.get('protocol')}/{item.get('port')}" if item.get("port") else "")
+                    + (f" {item.get('application')}" if item.get("application") else "")
+                    + (f" [{item.get('source_zone')} -> {item.get('destination_zone')}]" if item.get("source_zone") else "")
+                )
+                if error:
+                    lines.append(f"{index}. {flow}: ✗ {error}")
+                    continue
+                line = f"{index}. {flow}: {match['action']} ({match['rule']})"
+                if match["uncertain"]:
+                    line += f" ⚠ unresolved in: {', '.join(match['uncertain'])}"
+                lines.append(line)
+            if len(results) > limit:
+                lines.append(f"... {len(results) - limit} more flow(s) not listed")
+            return "\n".join(lines)
+        except Exception as e:
+            runtime.logger.error(f"Failed to simulate policy match: {str(e)}")
+            return f"✗ Error: {str(e)}"
@@ -1,8 +1,28 @@
-from panos.policies import Rulebase, SecurityRule
-from main import get_firewall, logger
+from panos.policies import SecurityRule
+from core.executor import run_blocking
+from core.cache import config_cache
+from core.config import SECURITY_RULES, fetch_security_rule, get_rulebase
+from core.bulk import multi_config, update_action
+from core.changeset import change_sets
 from typing import Optional
 
-def register(server):
+def _members(value: Optional[str]):
+    return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+def _changed(old, new) -> bool:
+    # Member lists are unordered on PAN-OS
+    if isinstance(new, list):
+        return sorted(old or []) != sorted(new)
+    return (old or None) != new
+
+def _diff(current, wanted: dict) -> dict:
+    return {
+        param: (getattr(current, param), value)
+        for param, value in wanted.items()
+        if value is not None and _changed(getattr(current, param), value)
+    }
+
+def register(server, runtime):
     @server.tool()
     async def update_security_policy(
         name: str,
@@ -13,13 +33,16 @@ def register(server):
         application: Optional[str] = None,
         action_type: Optional[str] = None,
         description: Optional[str] = None,
+        dry_run: bool = False,
+        change_set_id: Optional[str] = None,
+        target: Optional[str] = None,
         sessionId: Optional[str] = None,
         action: Optional[str] = None,
         chatInput: Optional[str] = None,
         toolCallId: Optional[str] = None
     ) -> str:
         """
-        Update an existing security policy. Only provided fields will be updated.
+        Update an existing security policy. Only fields that differ from the current rule are sent.
         Args:
             name: Rule name (required)
             source_zone: New source zone (can be comma-separated for multiple, e.g., "trust,dmz")
@@ -29,40 +52,65 @@ def register(server):
             application: New application (can be comma-separated for multiple, e.g., "dns,ssh")
             action_type: New action (allow/deny)
             description: New description
+            dry_run: Return the computed diff and API edits without changing anything (default: False)
+            change_set_id: Stage the change in this change set instead of applying it (see begin_change_set)
+            target: Registry target name (default: the default target)
         Returns:
-            str: Success or error message
+            str: Changed fields, or success or error message
         """
         try:
             if not name:
                 return "✗ Error: Rule name is required"
-            fw = get_firewall()
-            rulebase = Rulebase()
-            fw.add(rulebase)
-            rulebase.refresh()
-            rule = rulebase.find(name, SecurityRule)
-            if not rule:
+            change_set = change_sets.get(change_set_id, target) if change_set_id else None
+            fw = runtime.get_firewall(change_set.target if change_set else target)
+
+            # Diff against the rule read from the firewall: a cached rule may be stale, and fields
+            # it wrongly shows as matching would not be sent. One targeted fetch, not the rulebase.
+            current = await run_blocking(fw, fetch_security_rule, fw, name)
+            if current is None:
                 return f"✗ Error: Security policy '{name}' not found"
-            # Update only provided fields
-            # These fields accept lists, so split on comma
-            if source_zone:
-                rule.fromzone = [zone.strip() for zone in source_zone.split(',')]
-            if destination_zone:
-                rule.tozone = [zone.strip() for zone in destination_zone.split(',')]
-            if source_address:
-                rule.source = [addr.strip() for addr in source_address.split(',')]
-            if destination_address:
-                rule.destination = [addr.strip() for addr in destination_address.split(',')]
-            if application:
-                rule.application = [app.strip() for app in application.split(',')]
-            
-            # These fields are single values
-            if action_type:
-                rule.action = action_type
-            if description:
-                rule.description = description
-            rule.apply()
-            logger.info(f"Updated security policy: {name}")
-            return f"✓ Successfully updated security policy '{name}'"
+
+            wanted = {
+                "fromzone": _members(source_zone),
+                "tozone": _members(destination_zone),
+                "source": _members(source_address),
+                "destination": _members(destination_address),
+                "application": _members(application),
+                "action": action_type or None,
+                "description": description or None,
+            }
+            changes = _diff(current, wanted)
+            if not changes:
+                return f"✓ Security policy '{name}' already matches, nothing to update"
+
+            # Fresh object carrying only the new values, so cached rules are never modified
+            rule = SecurityRule(name, **{param: new for param, (_, new) in changes.items()})
+            rule.parent = get_rulebase(fw)
+            edits = [update_action(rule, param) for param in changes]
+            diff = [f"  {param}: {old} → {new}" for param, (old, new) in changes.items()]
+
+            if dry_run:
+                lines = [f"Dry run: {len(changes)} field(s) of security policy '{name}' would change:"]
+                lines.extend(diff)
+                lines.append("API edits:")
+                lines.extend(f"  {edit.action} {edit.xpath}" + (f" {edit.element}" if edit.element else "") for edit in edits)
+                return "\n".join(lines)
+
+            if change_set:
+                for param, edit in zip(changes, edits):
+                    change_set.stage(edit, SECURITY_RULES, f"update security policy '{name}' {param}")
+                runtime.logger.info(f"Staged security policy update {name} in change set {change_set.id}")
+                return (
+                    f"✓ Staged update of security policy '{name}' in change set {change_set.id} "
+                    f"({len(change_set.changes)} change(s)):\n" + "\n".join(diff)
+                )
+            try:
+                # One request with only the changed members, applied atomically
+                await run_blocking(fw, multi_config, fw, edits)
+            finally:
+                config_cache.invalidate(fw, SECURITY_RULES)
+            runtime.logger.info(f"Updated security policy: {name} ({', '.join(changes)})")
+            return f"✓ Successfully updated security policy '{name}':\n" + "\n".join(diff)
         except Exception as e:
-            logger.error(f"Failed to update security policy '{name}': {str(e)}")
+            runtime.logger.error(f"Failed to update security policy '{name}': {str(e)}")
             return f"✗ Error: {str(e)}"